@@ -0,0 +1,26 @@
+"""_telemetry.py
+
+Shared telemetry hook for the itpm-tools scripts. Inside the repository,
+``span`` and ``traced`` come from tools/system-scripts/telemetry.py, so
+render and export timings land in the shared telemetry log. A standalone
+copy of these scripts falls back to no-op versions and records nothing.
+"""
+
+import contextlib
+import os
+import sys
+
+_SYSTEM_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'tools', 'system-scripts')
+if os.path.isdir(_SYSTEM_SCRIPTS):
+    sys.path.insert(0, _SYSTEM_SCRIPTS)
+
+try:
+    from telemetry import span, traced
+except ImportError:
+    def span(name, **attrs):
+        return contextlib.nullcontext()
+
+    def traced(name=None, **attrs):
+        return lambda func: func
+
+__all__ = ['span', 'traced']
@@ -26,6 +26,9 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# 仓库内运行时导出耗时写入 tools/system-scripts 的 telemetry 日志
+from _telemetry import traced
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -751,6 +754,7 @@ class CompleteEconomicIndicatorAnalyzer:
         
         return pd.DataFrame(correlation_data)
     
+    @traced()
     def export_to_excel(self, filename: str = None):
         """导出到Excel文件"""
         if filename is None:
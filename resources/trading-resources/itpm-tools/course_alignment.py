@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""course_alignment.py
+
+Bilingual alignment index for the course chapters. Each chapter is split
+into heading sections (course_corpus.iter_sections) and, inside every
+section, English text is paired with its Chinese counterpart:
+
+* ``English / 中文`` lines are paired directly at the slash;
+* the remaining monolingual lines are aligned with Gale–Church length-ratio
+  dynamic programming (1-1, 1-0, 0-1, 2-1, 1-2 and 2-2 beads), calibrated
+  on the inline pairs of the corpus itself.
+
+Pairs are stored as character offsets ``[en_start, en_end, zh_start, zh_end]``
+per file, so a side-by-side view or a search hit can fetch the translated
+counterpart without re-reading and re-aligning the chapter. Rebuilds only
+re-align chapters whose content hash changed.
+
+Usage:
+    python course_alignment.py build
+    python course_alignment.py show ptm/ptm-details/05.md --limit 5
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+from course_corpus import RESOURCES_DIR, detect_language, iter_chapter_files, iter_sections
+
+# Constants -------------------------------------------------------------------
+INDEX_PATH = os.path.join(RESOURCES_DIR, '.index', 'course_alignment.json')
+VERSION = 1
+
+# Gale & Church (1993) bead priors
+BEAD_PRIORS = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099 / 2, (0, 1): 0.0099 / 2,
+    (2, 1): 0.089 / 2, (1, 2): 0.089 / 2,
+    (2, 2): 0.011,
+}
+# Chinese characters per English character, and the variance of the
+# difference per English character; re-estimated from inline pairs on build
+DEFAULT_RATIO = 0.35
+DEFAULT_VARIANCE = 1.0
+
+_LIST_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+_TRIM_CHARS = ' \t*#'
+
+
+# Units -----------------------------------------------------------------------
+
+def _trim(text, start, end):
+    """Shrink ``[start, end)`` past surrounding whitespace and Markdown emphasis."""
+    while start < end and text[start] in _TRIM_CHARS:
+        start += 1
+    while end > start and text[end - 1] in _TRIM_CHARS:
+        end -= 1
+    return start, end
+
+
+def _inline_split(text, start, end):
+    """Split point of an ``English / 中文`` line, as two spans, or None."""
+    search_from = start
+    while True:
+        slash = text.find(' / ', search_from, end)
+        if slash < 0:
+            return None
+        left = _trim(text, start, slash)
+        right = _trim(text, slash + 3, end)
+        if (left[0] < left[1] and right[0] < right[1]
+                and detect_language(text[left[0]:left[1]]) == 'en'
+                and detect_language(text[right[0]:right[1]]) == 'zh'):
+            return left, right
+        search_from = slash + 3
+
+
+def section_units(text, section):
+    """Collect a section's inline pairs and its leftover monolingual lines.
+
+    Returns ``(pairs, en_units, zh_units)``; pairs are ``(en_span, zh_span)``
+    and units are ``(start, end)`` spans, all as offsets into *text*.
+    """
+    pairs, en_units, zh_units = [], [], []
+    offset = section.start
+    for line in text[section.start:section.end].splitlines(keepends=True):
+        line_start, line_end = offset, offset + len(line.rstrip('\r\n'))
+        offset += len(line)
+        marker = _LIST_MARKER_RE.match(line)
+        start, end = _trim(text, line_start + (marker.end() if marker else 0), line_end)
+        if start >= end:
+            continue
+        split = _inline_split(text, start, end)
+        if split:
+            pairs.append(split)
+        elif detect_language(text[start:end]) == 'zh':
+            zh_units.append((start, end))
+        else:
+            en_units.append((start, end))
+    return pairs, en_units, zh_units
+
+
+# Gale-Church -----------------------------------------------------------------
+
+def bead_cost(en_len, zh_len, bead, ratio, variance):
+    """-log P(bead) - log P(length difference | bead), as in Gale & Church."""
+    prior = -math.log(BEAD_PRIORS[bead])
+    if en_len == 0 and zh_len == 0:
+        return prior
+    mean = (en_len + zh_len / ratio) / 2
+    z = abs(ratio * en_len - zh_len) / math.sqrt(variance * mean)
+    probability = max(math.erfc(z / math.sqrt(2)), 1e-12)
+    return prior - math.log(probability)
+
+
+def gale_church(en_lengths, zh_lengths, ratio=DEFAULT_RATIO, variance=DEFAULT_VARIANCE):
+    """Align two length sequences; returns beads as ``(i0, i1, j0, j1)`` index ranges."""
+    n, m = len(en_lengths), len(zh_lengths)
+    inf = float('inf')
+    cost = [[inf] * (m + 1) for _ in range(n + 1)]
+    back = [[None] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0.0
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i == 0 and j == 0:
+                continue
+            best, best_bead = inf, None
+            for di, dj in BEAD_PRIORS:
+                if di > i or dj > j or cost[i - di][j - dj] == inf:
+                    continue
+                c = cost[i - di][j - dj] + bead_cost(
+                    sum(en_lengths[i - di:i]), sum(zh_lengths[j - dj:j]), (di, dj), ratio, variance)
+                if c < best:
+                    best, best_bead = c, (di, dj)
+            cost[i][j] = best
+            back[i][j] = best_bead
+    beads = []
+    i, j = n, m
+    while i or j:
+        di, dj = back[i][j]
+        beads.append((i - di, i, j - dj, j))
+        i, j = i - di, j - dj
+    beads.reverse()
+    return beads
+
+
+def estimate_length_model(pairs_lengths):
+    """Fit ``(ratio, variance)`` from ``[(en_len, zh_len), ...]`` of known pairs."""
+    pairs_lengths = [(en, zh) for en, zh in pairs_lengths if en > 0]
+    if len(pairs_lengths) < 10:
+        return DEFAULT_RATIO, DEFAULT_VARIANCE
+    ratio = sum(zh for _, zh in pairs_lengths) / sum(en for en, _ in pairs_lengths)
+    residuals = [(zh - ratio * en) / math.sqrt(en) for en, zh in pairs_lengths]
+    variance = sum(r * r for r in residuals) / len(residuals)
+    return ratio, max(variance, 0.1)
+
+
+# Building --------------------------------------------------------------------
+
+def align_text(text, ratio=DEFAULT_RATIO, variance=DEFAULT_VARIANCE):
+    """Alignment pairs ``[en_start, en_end, zh_start, zh_end]`` for a chapter, sorted by English offset."""
+    aligned = []
+    for section in iter_sections(text):
+        pairs, en_units, zh_units = section_units(text, section)
+        aligned.extend([en[0], en[1], zh[0], zh[1]] for en, zh in pairs)
+        if en_units and zh_units:
+            beads = gale_church([e - s for s, e in en_units], [e - s for s, e in zh_units], ratio, variance)
+            for i0, i1, j0, j1 in beads:
+                if i1 > i0 and j1 > j0:
+                    aligned.append([en_units[i0][0], en_units[i1 - 1][1], zh_units[j0][0], zh_units[j1 - 1][1]])
+    aligned.sort()
+    return aligned
+
+
+def update_index(index_path: str = INDEX_PATH, courses=None, force: bool = False) -> dict:
+    """Align new or changed chapters and rewrite the alignment index.
+
+    The length model is re-estimated from all inline pairs on every run that
+    re-aligns anything. Returns counts of ``aligned`` and ``reused`` files.
+    """
+    existing = {}
+    if not force and os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == VERSION:
+            existing = data['files']
+
+    texts = {}
+    digests = {}
+    for _, _, path in iter_chapter_files(courses):
+        rel_path = os.path.relpath(path, RESOURCES_DIR).replace(os.sep, '/')
+        with open(path, 'r', encoding='utf-8') as f:
+            texts[rel_path] = f.read()
+        digests[rel_path] = hashlib.sha1(texts[rel_path].encode('utf-8')).hexdigest()
+
+    stale = [p for p in texts if existing.get(p, {}).get('sha1') != digests[p]]
+    stats = {'aligned': len(stale), 'reused': len(texts) - len(stale)}
+    if not stale and set(existing) == set(texts):
+        return stats
+
+    # Calibrate on inline pairs across the whole corpus
+    lengths = []
+    for text in texts.values():
+        for section in iter_sections(text):
+            pairs, _, _ = section_units(text, section)
+            lengths.extend((en[1] - en[0], zh[1] - zh[0]) for en, zh in pairs)
+    ratio, variance = estimate_length_model(lengths)
+
+    files = {}
+    for rel_path, text in texts.items():
+        if rel_path in stale:
+            files[rel_path] = {'sha1': digests[rel_path], 'pairs': align_text(text, ratio, variance)}
+        else:
+            files[rel_path] = existing[rel_path]
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION, 'ratio': ratio, 'variance': variance, 'files': files}, f)
+    os.replace(tmp_path, index_path)
+    return stats
+
+
+# Lookup ----------------------------------------------------------------------
+
+class AlignmentIndex:
+    """Offset lookups over an index written by :func:`update_index`."""
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            self._files = json.load(f)['files']
+        self._by_zh = {}
+
+    def pairs(self, path: str) -> list:
+        """All ``[en_start, en_end, zh_start, zh_end]`` pairs of a chapter (relative path)."""
+        return self._files.get(path, {}).get('pairs', [])
+
+    def counterpart(self, path: str, offset: int):
+        """Span ``(start, end)`` in the other language for the text at *offset*, or None."""
+        pairs = self.pairs(path)
+        i = bisect.bisect_right(pairs, [offset, float('inf')]) - 1
+        if i >= 0 and pairs[i][0] <= offset < pairs[i][1]:
+            return pairs[i][2], pairs[i][3]
+        if path not in self._by_zh:
+            self._by_zh[path] = sorted((zs, ze, es, ee) for es, ee, zs, ze in pairs)
+        by_zh = self._by_zh[path]
+        i = bisect.bisect_right(by_zh, (offset, float('inf'))) - 1
+        if i >= 0 and by_zh[i][0] <= offset < by_zh[i][1]:
+            return by_zh[i][2], by_zh[i][3]
+        return None
+
+
+# Main ------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the bilingual alignment index.")
+    parser.add_argument('--index', default=INDEX_PATH, help="Path of the index file.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Create or incrementally update the index.")
+    build.add_argument('--force', action='store_true', help="Re-align every chapter.")
+    show = subparsers.add_parser('show', help="Print aligned pairs of one chapter.")
+    show.add_argument('path', help="Chapter path relative to trading-resources, e.g. ptm/ptm-details/05.md")
+    show.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        stats = update_index(args.index, force=args.force)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ Alignment index: {args.index}")
+        print(f"📄 aligned {stats['aligned']}, reused {stats['reused']} ({elapsed:.1f} ms)")
+        return
+
+    index = AlignmentIndex(args.index)
+    with open(os.path.join(RESOURCES_DIR, args.path), 'r', encoding='utf-8') as f:
+        text = f.read()
+    for en_start, en_end, zh_start, zh_end in index.pairs(args.path)[:args.limit]:
+        print(f"EN: {text[en_start:en_end]}")
+        print(f"ZH: {text[zh_start:zh_end]}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
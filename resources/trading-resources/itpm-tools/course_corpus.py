@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""course_corpus.py
+
+Shared helpers for the bilingual course corpus (PTM, PFTM, POTM, IPLT
+detail chapters): locating chapter files, splitting them into heading
+sections, separating English from Chinese, and tokenizing mixed text the
+same way for every tool that indexes it.
+"""
+
+import glob
+import os
+import re
+from dataclasses import dataclass, field
+
+# Constants -------------------------------------------------------------------
+RESOURCES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Course id -> chapter directory, relative to RESOURCES_DIR
+COURSES = {
+    'ptm': 'ptm/ptm-details',
+    'pftm': 'pftm/pftm-details',
+    'potm': 'potm/potm-details',
+    'iplt': 'iplt/iplt-details',
+}
+CHAPTER_PATTERN = '[0-9][0-9].md'
+
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+# Latin words/numbers, or runs of CJK ideographs
+_TOKEN_RE = re.compile(rf"([A-Za-z0-9]+)|([{_CJK_CHARS}]+)")
+_CJK_RE = re.compile(rf"[{_CJK_CHARS}]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+
+_ATX_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# "**Title**" on its own line, or as a list item: "- **Title**"
+_BOLD_HEADING_RE = re.compile(r'^(\s*)(?:[-*+]\s+)?\*\*([^*]+)\*\*\s*$')
+_NUMBERING_RE = re.compile(r'^(\d+(?:\.\d+)*)\.?\s')
+_LIST_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+# Bold headings sit below every ATX level
+_BOLD_BASE_LEVEL = 7
+INDENT_WIDTH = 4
+
+
+# Corpus ----------------------------------------------------------------------
+
+def iter_chapter_files(courses=None, resources_dir=RESOURCES_DIR):
+    """Yield ``(course, chapter, path)`` for every NN.md chapter, in course/chapter order."""
+    for course in sorted(courses or COURSES):
+        pattern = os.path.join(resources_dir, COURSES[course], CHAPTER_PATTERN)
+        for path in sorted(glob.glob(pattern)):
+            chapter = os.path.splitext(os.path.basename(path))[0]
+            yield course, chapter, path
+
+
+# Sections --------------------------------------------------------------------
+
+@dataclass
+class Section:
+    """A heading and the text under it, up to the next heading of any level."""
+    path: list = field(default_factory=list)  # heading titles, outermost first
+    level: int = 0
+    start: int = 0       # offset of the heading line (0 for a preamble)
+    body_start: int = 0  # offset just past the heading line
+    end: int = 0         # offset of the next heading, or end of text
+
+    @property
+    def title(self) -> str:
+        return self.path[-1] if self.path else ''
+
+
+def parse_heading(line: str):
+    """Return ``(level, title)`` if *line* is a heading in the corpus's styles, else None.
+
+    ``#``-headings keep their ATX level. Bold-only lines (``**1. Title**``)
+    and bold list items (``- **Title**``) rank below them, deeper for more
+    indentation or a longer ``1.2.3`` numbering.
+    """
+    match = _ATX_HEADING_RE.match(line)
+    if match:
+        return len(match.group(1)), match.group(2).strip()
+    match = _BOLD_HEADING_RE.match(line.rstrip('\n'))
+    if match:
+        title = match.group(2).strip()
+        indent = len(match.group(1).expandtabs(INDENT_WIDTH)) // INDENT_WIDTH
+        numbering = _NUMBERING_RE.match(title)
+        depth = numbering.group(1).count('.') if numbering else 0
+        return _BOLD_BASE_LEVEL + max(indent, depth), title
+    return None
+
+
+def iter_sections(text: str):
+    """Split *text* into :class:`Section` objects using :func:`parse_heading`.
+
+    Text before the first heading becomes a preamble section with an empty
+    path, if it contains anything but whitespace.
+    """
+    stack = []  # (level, title)
+    current = Section()
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        heading = parse_heading(line)
+        if heading is not None:
+            current.end = offset
+            if current.path or text[current.body_start:offset].strip():
+                yield current
+            level, title = heading
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, title))
+            current = Section([t for _, t in stack], level, offset, offset + len(line))
+        offset += len(line)
+    current.end = offset
+    if current.path or text[current.body_start:offset].strip():
+        yield current
+
+
+# Languages -------------------------------------------------------------------
+
+def detect_language(text: str) -> str:
+    """'zh' when CJK ideographs dominate *text*, 'en' otherwise.
+
+    One ideograph carries roughly a word, so it is weighted against three
+    Latin letters.
+    """
+    cjk = len(_CJK_RE.findall(text))
+    return 'zh' if cjk and cjk * 3 >= len(_LATIN_RE.findall(text)) else 'en'
+
+
+def split_bilingual(text: str) -> dict:
+    """Separate *text* into ``{'en': ..., 'zh': ...}``.
+
+    Lines in the ``English / 中文`` style are split on the slash; other lines
+    go to their dominant language whole. List markers are dropped.
+    """
+    parts = {'en': [], 'zh': []}
+    for line in text.splitlines():
+        line = _LIST_MARKER_RE.sub('', line).strip().strip('*').strip()
+        if not line:
+            continue
+        for segment in line.split(' / ') if ' / ' in line else [line]:
+            segment = segment.strip()
+            if segment:
+                parts[detect_language(segment)].append(segment)
+    return {lang: '\n'.join(lines) for lang, lines in parts.items()}
+
+
+# Tokenizing ------------------------------------------------------------------
+
+def is_cjk(text: str) -> bool:
+    """True when *text* starts with a CJK ideograph."""
+    return _CJK_RE.match(text) is not None
+
+
+def iter_tokens(text: str):
+    """Yield ``(token, start, end)`` for *text*.
+
+    English is split into lower-cased words; Chinese runs become overlapping
+    character bigrams (a lone ideograph stays a unigram). Offsets are
+    character offsets of the token's span in *text*.
+    """
+    for match in _TOKEN_RE.finditer(text):
+        word, run = match.groups()
+        start = match.start()
+        if word is not None:
+            yield word.lower(), start, match.end()
+        elif len(run) == 1:
+            yield run, start, start + 1
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2], start + i, start + i + 2
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokens of *text* in order (see :func:`iter_tokens`)."""
+    return [token for token, _, _ in iter_tokens(text)]
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""course_search.py
+
+Full-text search over the bilingual course chapters (PTM, PFTM, POTM, IPLT).
+
+English is indexed by word and Chinese by character bigram (see
+course_corpus.iter_tokens). The index is a single binary file holding a
+positional inverted index with varint-encoded postings; it is memory-mapped
+at query time and only the postings of the query terms are decoded.
+Ranking is BM25; quoted phrases and multi-character Chinese words are
+matched as phrases; results can be filtered by course and chapter.
+Rebuilds are incremental: files are re-read only when their mtime/size
+changed, and re-tokenized only when their content hash changed.
+
+Usage:
+    python course_search.py build
+    python course_search.py search '"credit spread" 信用利差' --course ptm --limit 5
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from dataclasses import dataclass
+
+from course_corpus import RESOURCES_DIR, is_cjk, iter_chapter_files, tokenize
+
+# Constants -------------------------------------------------------------------
+INDEX_PATH = os.path.join(RESOURCES_DIR, '.index', 'course_search.idx')
+
+MAGIC = b'CSIX'
+VERSION = 1
+# magic, version, meta offset/length, terms offset/length, directory offset, term count
+HEADER = struct.Struct('<4sIQQQQQQ')
+# postings offset, doc section length, position section length, document frequency
+DIR_ENTRY = struct.Struct('<QIII')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_QUERY_RE = re.compile(r'(course|chapter):(\S+)|"([^"]*)"|(\S+)')
+
+
+# Varint coding ---------------------------------------------------------------
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """Append *value* to *out* as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(buf) -> list[int]:
+    """Decode every varint in *buf* (bytes or memoryview)."""
+    values = []
+    value = shift = 0
+    for byte in bytes(buf):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def encode_postings(postings) -> tuple[bytes, bytes]:
+    """Encode ``[(doc_id, positions), ...]`` sorted by doc id.
+
+    Returns the doc section (doc-id deltas and term frequencies) and the
+    position section (position deltas per doc) separately, so ranking never
+    has to decode positions.
+    """
+    docs = bytearray()
+    positions = bytearray()
+    previous_doc = 0
+    for doc_id, doc_positions in postings:
+        encode_varint(doc_id - previous_doc, docs)
+        encode_varint(len(doc_positions), docs)
+        previous_doc = doc_id
+        previous_pos = 0
+        for pos in doc_positions:
+            encode_varint(pos - previous_pos, positions)
+            previous_pos = pos
+    return bytes(docs), bytes(positions)
+
+
+# Index file ------------------------------------------------------------------
+
+@dataclass
+class SearchHit:
+    """One ranked search result."""
+    path: str
+    course: str
+    chapter: str
+    score: float
+    doc_id: int
+
+
+class CourseSearchIndex:
+    """Read-only, memory-mapped view of an index file written by :func:`update_index`."""
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        self.index_path = index_path
+        self._file = open(index_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, meta_off, meta_len, terms_off, terms_len,
+         self._dir_off, term_count) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{index_path} is not a version {VERSION} course search index")
+        self.meta = json.loads(self._map[meta_off:meta_off + meta_len].decode('utf-8'))
+        self.docs = self.meta['docs']
+        terms_blob = self._map[terms_off:terms_off + terms_len].decode('utf-8')
+        self.terms = terms_blob.split('\n') if term_count else []
+        self._ordinals = {term: i for i, term in enumerate(self.terms)}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Postings -----------------------------------------------------------------
+
+    def _entry(self, term):
+        ordinal = self._ordinals.get(term)
+        if ordinal is None:
+            return None
+        return DIR_ENTRY.unpack_from(self._map, self._dir_off + ordinal * DIR_ENTRY.size)
+
+    def doc_frequency(self, term: str) -> int:
+        entry = self._entry(term)
+        return entry[3] if entry else 0
+
+    def postings(self, term: str) -> list[tuple[int, int]]:
+        """``[(doc_id, term_frequency), ...]`` for *term*."""
+        entry = self._entry(term)
+        if entry is None:
+            return []
+        offset, docs_len, _, _ = entry
+        values = decode_varints(self._map[offset:offset + docs_len])
+        result = []
+        doc_id = 0
+        for i in range(0, len(values), 2):
+            doc_id += values[i]
+            result.append((doc_id, values[i + 1]))
+        return result
+
+    def positions(self, term: str) -> dict[int, list[int]]:
+        """``{doc_id: [position, ...]}`` for *term*."""
+        entry = self._entry(term)
+        if entry is None:
+            return {}
+        offset, docs_len, positions_len, _ = entry
+        deltas = decode_varints(self._map[offset + docs_len:offset + docs_len + positions_len])
+        result = {}
+        cursor = 0
+        for doc_id, tf in self.postings(term):
+            doc_positions = []
+            pos = 0
+            for delta in deltas[cursor:cursor + tf]:
+                pos += delta
+                doc_positions.append(pos)
+            cursor += tf
+            result[doc_id] = doc_positions
+        return result
+
+    def terms_with_prefix(self, prefix: str) -> list[str]:
+        """Indexed terms starting with *prefix* (the term list is sorted)."""
+        start = bisect.bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    # Querying -----------------------------------------------------------------
+
+    def _phrase_docs(self, tokens, candidates):
+        """Docs in *candidates* where *tokens* occur at consecutive positions."""
+        per_token = [self.positions(token) for token in tokens]
+        matched = set()
+        for doc_id in candidates:
+            starts = set(per_token[0].get(doc_id, ()))
+            for offset, token_positions in enumerate(per_token[1:], start=1):
+                following = token_positions.get(doc_id, ())
+                starts &= {pos - offset for pos in following}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc_id)
+        return matched
+
+    def _bm25(self, term, scores, allowed):
+        n_docs = len(self.docs)
+        avgdl = self.meta['avgdl'] or 1.0
+        postings = self.postings(term)
+        if not postings:
+            return
+        idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc_id, tf in postings:
+            if allowed is not None and doc_id not in allowed:
+                continue
+            length = self.docs[doc_id]['length']
+            norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl))
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+
+    def search(self, query: str, course: str = None, chapter: str = None, limit: int = 10) -> list[SearchHit]:
+        """Rank chapters for *query* with BM25.
+
+        Bare words are OR-ed. ``"quoted phrases"`` and Chinese words longer
+        than two characters must occur as phrases. ``course:ptm`` and
+        ``chapter:05`` inside the query act like the keyword filters.
+        A lone Chinese character matches every bigram that starts with it.
+        """
+        terms, phrases = [], []
+        for match in _QUERY_RE.finditer(query):
+            key, value, quoted, bare = match.groups()
+            if key == 'course':
+                course = value
+            elif key == 'chapter':
+                chapter = value
+            else:
+                tokens = tokenize(quoted if quoted is not None else bare)
+                if len(tokens) > 1:
+                    phrases.append(tokens)
+                    terms.extend(tokens)
+                elif tokens:
+                    token = tokens[0]
+                    if len(token) == 1 and is_cjk(token):
+                        terms.extend(self.terms_with_prefix(token))
+                    else:
+                        terms.append(token)
+
+        allowed = None
+        if course or chapter:
+            chapter = chapter.zfill(2) if chapter else None
+            allowed = {
+                doc_id for doc_id, doc in enumerate(self.docs)
+                if (not course or doc['course'] == course.lower())
+                and (not chapter or doc['chapter'] == chapter)
+            }
+        for tokens in phrases:
+            candidates = set.intersection(*(
+                {doc_id for doc_id, _ in self.postings(token)} for token in set(tokens)
+            ))
+            if allowed is not None:
+                candidates &= allowed
+            allowed = self._phrase_docs(tokens, candidates)
+
+        scores = {}
+        for term in dict.fromkeys(terms):
+            self._bm25(term, scores, allowed)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            SearchHit(self.docs[doc_id]['path'], self.docs[doc_id]['course'],
+                      self.docs[doc_id]['chapter'], score, doc_id)
+            for doc_id, score in ranked
+        ]
+
+    def snippet_span(self, hit: SearchHit, query: str):
+        """``(offset, line)`` for the first query token found in the hit's chapter.
+
+        *offset* is the character offset of the token in the chapter and
+        *line* the stripped line containing it.
+        """
+        text = _QUERY_RE.sub(lambda m: '' if m.group(1) else m.group(0), query)
+        tokens = tokenize(text)
+        offset = 0
+        with open(os.path.join(RESOURCES_DIR, hit.path), 'r', encoding='utf-8') as f:
+            for line in f:
+                lowered = line.lower()
+                found = [lowered.find(token) for token in tokens if token in lowered]
+                if found:
+                    return offset + min(found), line.strip()
+                offset += len(line)
+        return None
+
+    def snippet(self, hit: SearchHit, query: str, width: int = 120) -> str:
+        """First line of the hit's chapter containing a query token, trimmed to *width*."""
+        span = self.snippet_span(hit, query)
+        if span is None:
+            return ''
+        line = span[1]
+        return line if len(line) <= width else line[:width - 1] + '…'
+
+
+# Building --------------------------------------------------------------------
+
+def _read_existing(index_path):
+    """Open the current index, or return None when it is missing or unreadable."""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        return CourseSearchIndex(index_path)
+    except (ValueError, OSError, struct.error):
+        return None
+
+
+def _write_index(index_path, docs, postings_by_term):
+    terms = sorted(postings_by_term)
+    body = bytearray()
+    directory = bytearray()
+    base = HEADER.size
+    for term in terms:
+        postings = sorted(postings_by_term[term].items())
+        docs_blob, positions_blob = encode_postings(postings)
+        directory += DIR_ENTRY.pack(base + len(body), len(docs_blob), len(positions_blob), len(postings))
+        body += docs_blob
+        body += positions_blob
+    total_tokens = sum(doc['length'] for doc in docs)
+    meta = json.dumps({
+        'docs': docs,
+        'avgdl': total_tokens / len(docs) if docs else 0.0,
+        'total_tokens': total_tokens,
+    }, ensure_ascii=False).encode('utf-8')
+    terms_blob = '\n'.join(terms).encode('utf-8')
+
+    meta_off = base + len(body)
+    terms_off = meta_off + len(meta)
+    dir_off = terms_off + len(terms_blob)
+    header = HEADER.pack(MAGIC, VERSION, meta_off, len(meta), terms_off, len(terms_blob), dir_off, len(terms))
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(body)
+        f.write(meta)
+        f.write(terms_blob)
+        f.write(directory)
+    os.replace(tmp_path, index_path)
+
+
+def update_index(index_path: str = INDEX_PATH, courses=None, force: bool = False) -> dict:
+    """Bring the index at *index_path* up to date with the chapter files.
+
+    Unchanged documents keep their postings from the existing index; only
+    new or modified chapters are tokenized. Returns counts of
+    ``unchanged``/``updated``/``added``/``removed`` documents and whether
+    the index file was ``written``.
+    """
+    existing = None if force else _read_existing(index_path)
+    old_docs = {doc['path']: (doc_id, doc) for doc_id, doc in enumerate(existing.docs)} if existing else {}
+
+    stats = {'unchanged': 0, 'updated': 0, 'added': 0, 'removed': 0, 'written': False}
+    docs = []
+    reuse = {}        # old doc id -> new doc id
+    fresh_text = {}   # new doc id -> chapter text
+    metadata_changed = False
+    for course, chapter, path in iter_chapter_files(courses):
+        rel_path = os.path.relpath(path, RESOURCES_DIR).replace(os.sep, '/')
+        st = os.stat(path)
+        old = old_docs.pop(rel_path, None)
+        doc = {'path': rel_path, 'course': course, 'chapter': chapter,
+               'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+        if old and old[1]['mtime_ns'] == st.st_mtime_ns and old[1]['size'] == st.st_size:
+            doc.update(sha1=old[1]['sha1'], length=old[1]['length'])
+            reuse[old[0]] = len(docs)
+            stats['unchanged'] += 1
+        else:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            doc['sha1'] = hashlib.sha1(raw).hexdigest()
+            metadata_changed = True
+            if old and old[1]['sha1'] == doc['sha1']:
+                # Touched but identical: keep the postings
+                doc['length'] = old[1]['length']
+                reuse[old[0]] = len(docs)
+                stats['unchanged'] += 1
+            else:
+                fresh_text[len(docs)] = raw.decode('utf-8', errors='replace')
+                stats['updated' if old else 'added'] += 1
+        docs.append(doc)
+    stats['removed'] = len(old_docs)
+
+    if existing and not fresh_text and not old_docs and not metadata_changed:
+        existing.close()
+        return stats
+
+    postings_by_term = {}
+    if existing:
+        for term in existing.terms:
+            for old_id, positions in existing.positions(term).items():
+                new_id = reuse.get(old_id)
+                if new_id is not None:
+                    postings_by_term.setdefault(term, {})[new_id] = positions
+        existing.close()
+    for doc_id, text in fresh_text.items():
+        tokens = tokenize(text)
+        docs[doc_id]['length'] = len(tokens)
+        for position, token in enumerate(tokens):
+            postings_by_term.setdefault(token, {}).setdefault(doc_id, []).append(position)
+
+    _write_index(index_path, docs, postings_by_term)
+    stats['written'] = True
+    return stats
+
+
+# Main ------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query the course full-text search index.")
+    parser.add_argument('--index', default=INDEX_PATH, help="Path of the index file.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Create or incrementally update the index.")
+    build.add_argument('--force', action='store_true', help="Rebuild from scratch.")
+
+    search = subparsers.add_parser('search', help="Query the index.")
+    search.add_argument('query')
+    search.add_argument('--course', choices=['ptm', 'pftm', 'potm', 'iplt'])
+    search.add_argument('--chapter')
+    search.add_argument('--limit', type=int, default=10)
+    search.add_argument('--translation', action='store_true',
+                        help="Also print the aligned translation of each snippet (needs course_alignment.py build).")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        stats = update_index(args.index, force=args.force)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ Index {'written' if stats['written'] else 'already up to date'}: {args.index}")
+        print(f"📄 unchanged {stats['unchanged']}, updated {stats['updated']}, "
+              f"added {stats['added']}, removed {stats['removed']} ({elapsed:.1f} ms)")
+        return
+
+    if not os.path.exists(args.index):
+        print(f"❌ Index not found at {args.index}. Run 'python course_search.py build' first.")
+        sys.exit(1)
+    alignment = None
+    if args.translation:
+        from course_alignment import INDEX_PATH as ALIGNMENT_PATH, AlignmentIndex
+        if os.path.exists(ALIGNMENT_PATH):
+            alignment = AlignmentIndex(ALIGNMENT_PATH)
+        else:
+            print("⚠️  No alignment index; run 'python course_alignment.py build' for translations.")
+    with CourseSearchIndex(args.index) as index:
+        started = time.perf_counter()
+        hits = index.search(args.query, course=args.course, chapter=args.chapter, limit=args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔍 {len(hits)} result(s) in {elapsed:.1f} ms")
+        for hit in hits:
+            print(f"{hit.score:7.3f}  {hit.path}")
+            print(f"         {index.snippet(hit, args.query)}")
+            span = index.snippet_span(hit, args.query) if alignment else None
+            counterpart = alignment.counterpart(hit.path, span[0]) if span else None
+            if counterpart:
+                with open(os.path.join(RESOURCES_DIR, hit.path), 'r', encoding='utf-8') as f:
+                    translated = f.read()[counterpart[0]:counterpart[1]]
+                print(f"      ↔  {translated}")
+
+
+if __name__ == '__main__':
+    main()
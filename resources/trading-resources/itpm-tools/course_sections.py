@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""course_sections.py
+
+Pipeline stage that splits every course chapter into heading sections once
+and writes them as a single section table, so merges, mind maps and
+indicator extraction can read precomputed sections instead of re-reading
+and re-splitting the raw Markdown.
+
+One row per (section, language):
+    course, chapter, path, section, heading_path, level, language,
+    text, indicators, start, end
+
+``start``/``end`` are character offsets of the section in the chapter file.
+``indicators`` lists the catalog indicators (English names) mentioned in
+the section. Chapters are parsed in a process pool, one task per file, and
+rows are streamed to JSONL, or to Parquet when pyarrow is installed.
+
+Usage:
+    python course_sections.py                      # JSONL into ../.index/
+    python course_sections.py --format parquet --workers 4
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from course_corpus import COURSES, RESOURCES_DIR, iter_chapter_files, iter_sections, split_bilingual
+
+# Constants -------------------------------------------------------------------
+OUTPUT_DIR = os.path.join(RESOURCES_DIR, '.index')
+CATALOG_PATTERN = os.path.join(RESOURCES_DIR, 'economicdataserieslist', '经济指标数据库_*.json')
+
+COLUMNS = ['course', 'chapter', 'path', 'section', 'heading_path', 'level',
+           'language', 'text', 'indicators', 'start', 'end']
+LANGUAGES = ('en', 'zh')
+
+# Abbreviation in a catalog name, e.g. "Non-Farm Payrolls (NFP)"
+_ABBREVIATION_RE = re.compile(r'\(([A-Z][A-Za-z0-9&/\- ]{1,11})\)')
+
+
+# Indicator catalog -----------------------------------------------------------
+
+def latest_catalog_path(pattern: str = CATALOG_PATTERN):
+    """Newest exported indicator database (经济指标数据库_YYYYMMDD_HHMMSS.json), or None."""
+    paths = sorted(glob.glob(pattern))
+    return paths[-1] if paths else None
+
+
+class IndicatorMatcher:
+    """Finds catalog indicators in text with one compiled regex pass.
+
+    English names and their parenthesised abbreviations match on Latin
+    word boundaries (case-insensitive for names, exact for abbreviations);
+    Chinese names match anywhere. Every alias maps back to ``name_en``.
+    """
+
+    def __init__(self, indicators):
+        aliases = {}
+        abbreviations = {}
+        for indicator in indicators:
+            name_en = indicator['name_en']
+            aliases[name_en.lower()] = name_en
+            bare = _ABBREVIATION_RE.sub('', name_en).strip()
+            if bare:
+                aliases.setdefault(bare.lower(), name_en)
+            if indicator.get('name_cn'):
+                aliases.setdefault(indicator['name_cn'].lower(), name_en)
+            for abbreviation in _ABBREVIATION_RE.findall(name_en):
+                abbreviations.setdefault(abbreviation, name_en)
+        self._aliases = aliases
+        self._abbreviations = abbreviations
+        # Longest alias first so "Core CPI" wins over "CPI"
+        names = sorted(aliases, key=len, reverse=True)
+        abbrs = sorted(abbreviations, key=len, reverse=True)
+        name_pattern = '|'.join(re.escape(name) for name in names) or '(?!)'
+        abbr_pattern = '|'.join(re.escape(abbr) for abbr in abbrs) or '(?!)'
+        self._names_re = re.compile(rf'(?<![A-Za-z0-9])(?:{name_pattern})(?![A-Za-z0-9])', re.IGNORECASE)
+        self._abbr_re = re.compile(rf'(?<![A-Za-z0-9])(?:{abbr_pattern})(?![A-Za-z0-9])')
+
+    @classmethod
+    def from_catalog(cls, path: str = None):
+        """Load the JSON database written by EconomicIndicatorExtractor.export_json_database."""
+        path = path or latest_catalog_path()
+        if not path:
+            return cls([])
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['indicators'])
+
+    def find(self, text: str) -> list[str]:
+        """Catalog names mentioned in *text*, in order of first mention."""
+        found = {}
+        for match in self._names_re.finditer(text):
+            found.setdefault(self._aliases[match.group(0).lower()], None)
+        for match in self._abbr_re.finditer(text):
+            found.setdefault(self._abbreviations[match.group(0)], None)
+        return list(found)
+
+
+# Chunking --------------------------------------------------------------------
+
+_matcher = None
+
+
+def _init_worker(catalog_path):
+    global _matcher
+    _matcher = IndicatorMatcher.from_catalog(catalog_path)
+
+
+def chunk_chapter(course: str, chapter: str, path: str) -> list[dict]:
+    """All section rows for one chapter file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rel_path = os.path.relpath(path, RESOURCES_DIR).replace(os.sep, '/')
+    rows = []
+    for number, section in enumerate(iter_sections(text)):
+        body = text[section.body_start:section.end]
+        by_language = split_bilingual(section.title + '\n' + body)
+        for language in LANGUAGES:
+            lang_text = by_language[language]
+            if not lang_text:
+                continue
+            rows.append({
+                'course': course,
+                'chapter': chapter,
+                'path': rel_path,
+                'section': number,
+                'heading_path': section.path,
+                'level': section.level,
+                'language': language,
+                'text': lang_text,
+                'indicators': _matcher.find(lang_text) if _matcher else [],
+                'start': section.start,
+                'end': section.end,
+            })
+    return rows
+
+
+def _chunk_task(args):
+    return chunk_chapter(*args)
+
+
+def iter_section_rows(courses=None, workers: int = None, catalog_path: str = None):
+    """Yield section rows course by course, chapter order preserved.
+
+    Each course directory is fanned out over a process pool; with
+    ``workers=1`` everything runs in-process.
+    """
+    catalog_path = catalog_path or latest_catalog_path()
+    workers = workers or os.cpu_count() or 1
+    for course in sorted(courses or COURSES):
+        tasks = list(iter_chapter_files([course]))
+        if workers == 1 or len(tasks) < 2:
+            _init_worker(catalog_path)
+            for task in tasks:
+                yield from _chunk_task(task)
+            continue
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init_worker, initargs=(catalog_path,)) as pool:
+            for rows in pool.map(_chunk_task, tasks):
+                yield from rows
+
+
+# Writers ---------------------------------------------------------------------
+
+def write_jsonl(rows, output_path: str) -> int:
+    """Stream *rows* to a JSON-lines file; returns the row count."""
+    count = 0
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def write_parquet(rows, output_path: str, batch_size: int = 2000) -> int:
+    """Stream *rows* to Parquet in row groups of *batch_size*; needs pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('course', pa.string()), ('chapter', pa.string()), ('path', pa.string()),
+        ('section', pa.int32()), ('heading_path', pa.list_(pa.string())),
+        ('level', pa.int16()), ('language', pa.string()), ('text', pa.string()),
+        ('indicators', pa.list_(pa.string())), ('start', pa.int64()), ('end', pa.int64()),
+    ])
+    count = 0
+    batch = []
+    tmp_path = output_path + '.tmp'
+    with pq.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def read_sections(path: str, columns=None):
+    """Yield section rows from a JSONL or Parquet table, keeping only *columns*."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        yield from pq.read_table(path, columns=columns).to_pylist()
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            yield {key: row[key] for key in columns} if columns else row
+
+
+# Main ------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export course chapters as a section table.")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--output', help="Output file (default: ../.index/course_sections.<format>).")
+    parser.add_argument('--course', action='append', choices=sorted(COURSES), help="Limit to a course (repeatable).")
+    parser.add_argument('--workers', type=int, help="Worker processes per course directory (default: CPU count).")
+    parser.add_argument('--catalog', help="Indicator JSON database (default: newest 经济指标数据库_*.json).")
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.join(OUTPUT_DIR, f'course_sections.{args.format}')
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        print('❌ Parquet output needs pyarrow: pip install pyarrow')
+        sys.exit(1)
+
+    started = time.perf_counter()
+    rows = iter_section_rows(args.course, workers=args.workers, catalog_path=args.catalog)
+    writer = write_parquet if args.format == 'parquet' else write_jsonl
+    count = writer(rows, output_path)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Wrote {count} section rows to {output_path} ({elapsed:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,9 @@ import os
 import glob
 from collections import defaultdict
 
+# 仓库内运行时导出耗时写入 tools/system-scripts 的 telemetry 日志
+from _telemetry import traced
+
 @dataclass
 class EconomicIndicator:
     """经济指标数据类"""
@@ -841,6 +844,7 @@ class EconomicIndicatorExtractor:
         return df[['英文名称', '中文名称', '主要分类', '子分类', '重要程度', 
                   '波动程度', '发布频率', '市场影响', '优先级评分']]
     
+    @traced()
     def export_to_excel(self, filename: str = None):
         """导出到Excel文件"""
         if filename is None:
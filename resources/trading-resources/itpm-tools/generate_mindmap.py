@@ -1,61 +1,193 @@
+import hashlib
+import json
 import re
 import os
 
+CACHE_FILE_NAME = '.pftm_mindmap_cache.json'
+CACHE_VERSION = 1
+CHAPTERS_DIR_NAME = 'pftm_mindmap_chapters'
+
+CHAPTER_HEADING_RE = re.compile(r'^(###|##\s+Chapter\b)')
+HORIZONTAL_RULE_RE = re.compile(r'^-{3,}$')
+
+
+def split_chapters(lines):
+    """
+    Splits the combined markdown into chapters. A chapter starts at a '###'
+    heading (detail files concatenated as-is) or at a '## Chapter NN' heading
+    (output of the merge_* scripts). Lines before the first boundary form a
+    preamble chunk. Returns a list of line lists.
+    """
+    chapters = [[]]
+    for line in lines:
+        if CHAPTER_HEADING_RE.match(line.strip()) and chapters[-1]:
+            chapters.append([])
+        chapters[-1].append(line)
+    return [chapter for chapter in chapters if chapter]
+
+
+def outline_fragment(lines):
+    """
+    Converts one chapter into outline entries (depth, text). Heading state
+    starts fresh for every chapter so fragments can be cached independently.
+    """
+    entries = []
+    last_heading_level = 0
+
+    for line in lines:
+        line = line.strip()
+        if not line or HORIZONTAL_RULE_RE.match(line):
+            continue
+
+        # Level 1 from '###' or '## Chapter NN'
+        if CHAPTER_HEADING_RE.match(line):
+            last_heading_level = 1
+            entries.append((0, line.lstrip('#').strip()))
+            continue
+
+        # Headings like **1. ...** or **1.1 ...**
+        match = re.match(r'\*\*(.*?)\*\*', line)
+        if match:
+            inner_content = match.group(1).strip()
+            content_match = re.match(r'([\d\.]+)\s+(.*)', inner_content)
+            if content_match:
+                prefix = content_match.group(1).strip()
+                content = content_match.group(2).strip()
+
+                level_prefix = prefix
+                if level_prefix.endswith('.'):
+                    level_prefix = level_prefix[:-1]
+
+                level = level_prefix.count('.') + 2
+                last_heading_level = level
+                entries.append((level - 1, f"**{prefix} {content}**"))
+                continue
+
+        # List items
+        if line.startswith('-'):
+            content = line[1:].strip()
+            entries.append((last_heading_level, content))
+            continue
+
+    return entries
+
+
+def fragment_markdown(entries):
+    """
+    Renders outline entries as an indented markdown list.
+    """
+    return ''.join(f"{'    ' * depth}- {text}\n" for depth, text in entries)
+
+
+def fragment_tree(entries):
+    """
+    Nests outline entries into {'title', 'children'} dicts for the JSON outline.
+    """
+    root = {'title': None, 'children': []}
+    stack = [(-1, root)]
+    for depth, text in entries:
+        node = {'title': text, 'children': []}
+        while stack[-1][0] >= depth:
+            stack.pop()
+        stack[-1][1]['children'].append(node)
+        stack.append((depth, node))
+    return root['children']
+
+
+def _count_nodes(nodes):
+    return sum(1 + _count_nodes(node['children']) for node in nodes)
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('fragments', {})
+
+
+def _write_if_changed(path, content):
+    """
+    Writes content only when it differs from what is on disk.
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
 def generate_mindmap(input_file, output_dir):
     """
     Parses a markdown file with a specific structure and generates a mind map
-    in markdown format.
+    in markdown format, plus a JSON outline for lazy loading: an index file
+    listing the chapters and one JSON file per chapter branch.
+
+    Work is done chapter by chapter. Each chapter's outline fragment is cached
+    by content hash, so only chapters that changed since the last run are
+    parsed again and only their JSON branches are rewritten.
+    Returns a dict with the number of reused and regenerated chapters.
     """
     output_file_path = os.path.join(output_dir, 'pftm_mindmap.md')
+    json_index_path = os.path.join(output_dir, 'pftm_mindmap.json')
+    chapters_dir = os.path.join(output_dir, CHAPTERS_DIR_NAME)
+    cache_path = os.path.join(output_dir, CACHE_FILE_NAME)
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    with open(input_file, 'r', encoding='utf-8') as f_in, \
-         open(output_file_path, 'w', encoding='utf-8') as f_out:
-        
-        f_out.write("# PFTM Combined Mind Map\n\n")
-        
-        last_heading_level = 0
-        
-        for line in f_in:
-            line = line.strip()
-            if not line:
-                continue
+    os.makedirs(chapters_dir, exist_ok=True)
 
-            # Level 1 from '###'
-            if line.startswith('###'):
-                level = 1
-                content = line.replace('###', '').strip()
-                last_heading_level = level
-                f_out.write(f"- {content}\n")
-                continue
+    with open(input_file, 'r', encoding='utf-8') as f_in:
+        chapters = split_chapters(f_in.readlines())
 
-            # Headings like **1. ...** or **1.1 ...**
-            match = re.match(r'\*\*(.*?)\*\*', line)
-            if match:
-                inner_content = match.group(1).strip()
-                content_match = re.match(r'([\d\.]+)\s+(.*)', inner_content)
-                if content_match:
-                    prefix = content_match.group(1).strip()
-                    content = content_match.group(2).strip()
-                    
-                    level_prefix = prefix
-                    if level_prefix.endswith('.'):
-                        level_prefix = level_prefix[:-1]
-
-                    level = level_prefix.count('.') + 2
-                    last_heading_level = level
-                    indent = '    ' * (level - 1)
-                    f_out.write(f"{indent}- **{prefix} {content}**\n")
-                    continue
-
-            # List items
-            if line.startswith('-'):
-                content = line[1:].strip()
-                indent = '    ' * last_heading_level
-                f_out.write(f"{indent}- {content}\n")
-                continue
+    cached_fragments = _load_cache(cache_path)
+    fragments = {}
+    markdown_parts = ["# PFTM Combined Mind Map\n\n"]
+    index = {'title': 'PFTM Combined Mind Map', 'chapters': []}
+    stats = {'reused': 0, 'regenerated': 0}
+
+    for position, chapter_lines in enumerate(chapters):
+        digest = hashlib.sha1(''.join(chapter_lines).encode('utf-8')).hexdigest()
+        fragment = cached_fragments.get(digest)
+        if fragment is None:
+            entries = outline_fragment(chapter_lines)
+            fragment = {'markdown': fragment_markdown(entries), 'tree': fragment_tree(entries)}
+            stats['regenerated'] += 1
+        else:
+            stats['reused'] += 1
+        fragments[digest] = fragment
+        markdown_parts.append(fragment['markdown'])
+
+        if not fragment['tree']:
+            continue
+        chapter_id = f"{position:02d}"
+        chapter_file = os.path.join(chapters_dir, f"{chapter_id}.json")
+        # Branch files are named by position, so rewrite when the content at that position changed
+        _write_if_changed(chapter_file, json.dumps(fragment['tree'], ensure_ascii=False, indent=2))
+        for branch in fragment['tree']:
+            index['chapters'].append({
+                'id': chapter_id,
+                'title': branch['title'],
+                'hash': digest,
+                'node_count': _count_nodes(branch['children']),
+                'href': f"{CHAPTERS_DIR_NAME}/{chapter_id}.json",
+            })
+
+    _write_if_changed(output_file_path, ''.join(markdown_parts))
+    _write_if_changed(json_index_path, json.dumps(index, ensure_ascii=False, indent=2))
+
+    # Drop cache entries and branch files that no longer correspond to a chapter
+    live_files = {entry['href'].rsplit('/', 1)[-1] for entry in index['chapters']}
+    for name in os.listdir(chapters_dir):
+        if name.endswith('.json') and name not in live_files:
+            os.remove(os.path.join(chapters_dir, name))
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'fragments': fragments}, f, ensure_ascii=False)
+
+    return stats
 
 def main():
     """
@@ -64,10 +196,10 @@ def main():
     # Using relative paths from the workspace root
     input_md_path = 'pftm/pftm_combined.md'
     output_dir_path = 'pftm_mindmap'
-    
+
     # Get the directory of the script
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Construct absolute paths
     abs_input_path = os.path.join(script_dir, '..', input_md_path)
     abs_output_dir = os.path.join(script_dir, '..', output_dir_path)
@@ -75,11 +207,12 @@ def main():
     # Normalize paths to handle '..'
     abs_input_path = os.path.normpath(abs_input_path)
     abs_output_dir = os.path.normpath(abs_output_dir)
-    
-    generate_mindmap(abs_input_path, abs_output_dir)
-    
+
+    stats = generate_mindmap(abs_input_path, abs_output_dir)
+
     output_file_name = os.path.join(output_dir_path, 'pftm_mindmap.md')
     print(f"Mind map generated in {output_file_name}")
+    print(f"Chapters regenerated: {stats['regenerated']}, reused from cache: {stats['reused']}")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -1,7 +1,16 @@
 import argparse
 import os
 import re
-from graphviz import Digraph
+
+import svg_mindmap
+
+# Render timings go to the shared telemetry log when run inside the repository
+from _telemetry import span
+
+# Styles for the built-in SVG renderer, mirroring the Graphviz attributes below
+SVG_NODE_STYLES = {'default': {'shape': 'box', 'style': 'rounded', 'fontname': 'SimHei', 'fontsize': '14'}}
+SVG_EDGE_STYLES = {'default': {'color': '#000000', 'penwidth': '1.0'}}
+SVG_GRAPH_ATTRS = {'rankdir': 'LR', 'splines': 'ortho'}
 
 def parse_markdown(file_path):
     """
@@ -47,9 +56,25 @@ def add_nodes_edges(graph, node, parent_id=None):
         add_nodes_edges(graph, child, parent_id=node_id)
 
 
-def create_mindmap(md_tree, output_file):
+def tree_to_nodes(md_tree):
+    """
+    Flattens the parsed tree into the node list used by svg_mindmap.
+    """
+    nodes = []
+    stack = [(md_tree, None)]
+    while stack:
+        node, parent_id = stack.pop()
+        node_id = f"node_{len(nodes)}"
+        nodes.append({'id': node_id, 'text': node['title'], 'parent_id': parent_id, 'level': node['level']})
+        for child in reversed(node['children']):
+            stack.append((child, node_id))
+    return nodes
+
+
+def create_mindmap(md_tree, output_file, renderer='graphviz'):
     """
     Creates a mind map from the markdown tree and saves it to a file.
+    The 'svg' renderer lays the tree out in-process and needs no Graphviz install.
     """
     # Determine the output format from the file extension
     output_dir = os.path.dirname(output_file)
@@ -60,6 +85,16 @@ def create_mindmap(md_tree, output_file):
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    if renderer == 'svg':
+        if output_format != 'svg':
+            print(f"Error: the svg renderer cannot produce '{output_format}' output.")
+            return
+        svg_mindmap.write_svg(output_file, tree_to_nodes(md_tree), SVG_NODE_STYLES, SVG_EDGE_STYLES, SVG_GRAPH_ATTRS)
+        print(f"Mind map successfully generated: {output_file}")
+        return
+
+    from graphviz import Digraph
+
     # Initialize the graph
     dot = Digraph('MindMap', comment='Markdown Mind Map')
     dot.attr('graph', rankdir='LR', splines='ortho')
@@ -84,6 +119,7 @@ def main():
     parser = argparse.ArgumentParser(description="Convert a Markdown file to a mind map image (PNG, JPG, PDF).")
     parser.add_argument("input_file", help="Path to the input Markdown file.")
     parser.add_argument("output_file", help="Path to the output image/PDF file. The extension determines the format (e.g., mindmap.png, mindmap.pdf).")
+    parser.add_argument("--renderer", choices=['graphviz', 'svg'], default='graphviz', help="'graphviz' (high quality, needs the dot binary) or 'svg' (fast, in-process, SVG output only).")
     args = parser.parse_args()
 
     if not os.path.exists(args.input_file):
@@ -91,7 +127,8 @@ def main():
         return
         
     md_tree = parse_markdown(args.input_file)
-    create_mindmap(md_tree, args.output_file)
+    with span('render_mindmap', file=os.path.basename(args.input_file), renderer=args.renderer):
+        create_mindmap(md_tree, args.output_file, renderer=args.renderer)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""svg_mindmap.py
+
+In-process mind-map renderer: a tidy-tree layout (Buchheim's linear-time
+variant of Walker's algorithm) plus a small SVG writer. It consumes the
+same node list and theme dicts as ``MarkdownMindMapConverter`` in
+translate-transform.py, so a quick SVG no longer needs the Graphviz binary
+or a subprocess per image. Graphviz remains the high-quality option for
+PNG/JPG/PDF output.
+"""
+
+import re
+import unicodedata
+from xml.sax.saxutils import escape, quoteattr
+
+# Constants -------------------------------------------------------------------
+# SVG user units are points, which matches Graphviz: ``fontsize`` is in points
+# and ``nodesep``/``ranksep``/``pad`` are in inches.
+POINTS_PER_INCH = 72.0
+DEFAULT_FONT_SIZE = 14.0
+LINE_HEIGHT = 1.25          # in em
+PADDING_X = 0.6             # in em, each side
+PADDING_Y = 0.4             # in em, each side
+LATIN_GLYPH_WIDTH = 0.55    # average advance of a proportional Latin glyph, in em
+CJK_GLYPH_WIDTH = 1.0       # full-width glyphs occupy a whole em
+
+ELLIPSE_SHAPES = {'ellipse', 'oval', 'circle', 'doublecircle'}
+OCTAGON_SHAPES = {'octagon', 'doubleoctagon'}
+BORDERLESS_SHAPES = {'plaintext', 'plain', 'none'}
+
+_BREAK_RE = re.compile(r'<BR\s*/?>|\\n', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+# Text measurement ------------------------------------------------------------
+
+def text_width(text: str, font_size: float) -> float:
+    """Estimate the rendered width of *text* without a font backend.
+
+    Wide and full-width characters (CJK ideographs, kana, hangul, full-width
+    punctuation) count as one em, everything else as an average Latin glyph.
+    """
+    if text.isascii():
+        return len(text) * LATIN_GLYPH_WIDTH * font_size
+    ems = 0.0
+    for ch in text:
+        if unicodedata.combining(ch):
+            continue
+        if unicodedata.east_asian_width(ch) in ('W', 'F'):
+            ems += CJK_GLYPH_WIDTH
+        else:
+            ems += LATIN_GLYPH_WIDTH
+    return ems * font_size
+
+
+def label_lines(label: str) -> list[str]:
+    """Split a converter label (``<BR/>`` breaks, ``<b>``/``<i>`` tags) into plain lines."""
+    lines = [_TAG_RE.sub('', part).strip() for part in _BREAK_RE.split(label or '')]
+    return [line for line in lines if line] or ['']
+
+
+# Layout ----------------------------------------------------------------------
+
+class _Node:
+    """Tree node carrying both the rendering attributes and Buchheim's layout state."""
+
+    __slots__ = ('key', 'lines', 'style', 'edge_style', 'hidden', 'children',
+                 'parent', 'number', 'width', 'height', 'breadth', 'depth',
+                 'prelim', 'mod', 'shift', 'change', 'thread', 'ancestor',
+                 'x', 'y')
+
+    def __init__(self, key, lines, style, edge_style, hidden=False):
+        self.key = key
+        self.lines = lines
+        self.style = style
+        self.edge_style = edge_style
+        self.hidden = hidden
+        self.children = []
+        self.parent = None
+        self.number = 1
+        self.width = self.height = self.breadth = 0.0
+        self.depth = 0
+        self.prelim = self.mod = self.shift = self.change = 0.0
+        self.thread = None
+        self.ancestor = self
+        self.x = self.y = 0.0
+
+    def add_child(self, child):
+        child.parent = self
+        child.number = len(self.children) + 1
+        self.children.append(child)
+
+    def left_sibling(self):
+        if self.parent is not None and self.number > 1:
+            return self.parent.children[self.number - 2]
+        return None
+
+
+def _next_left(v):
+    return v.children[0] if v.children else v.thread
+
+
+def _next_right(v):
+    return v.children[-1] if v.children else v.thread
+
+
+class TidyTreeLayout:
+    """Buchheim/Walker tidy tree with per-node breadths.
+
+    Siblings and cousins on the same level are kept ``node_gap`` apart edge to
+    edge; parents are centred over their children. Runs in O(n).
+    """
+
+    def __init__(self, node_gap: float):
+        self.node_gap = node_gap
+
+    def _separation(self, left, right):
+        return (left.breadth + right.breadth) / 2.0 + self.node_gap
+
+    def _first_walk(self, v):
+        w = v.left_sibling()
+        if not v.children:
+            v.prelim = w.prelim + self._separation(w, v) if w is not None else 0.0
+            return
+        default_ancestor = v.children[0]
+        for child in v.children:
+            self._first_walk(child)
+            default_ancestor = self._apportion(child, default_ancestor)
+        self._execute_shifts(v)
+        midpoint = (v.children[0].prelim + v.children[-1].prelim) / 2.0
+        if w is not None:
+            v.prelim = w.prelim + self._separation(w, v)
+            v.mod = v.prelim - midpoint
+        else:
+            v.prelim = midpoint
+
+    def _apportion(self, v, default_ancestor):
+        w = v.left_sibling()
+        if w is None:
+            return default_ancestor
+        vir = vor = v
+        vil = w
+        vol = v.parent.children[0]
+        sir = sor = v.mod
+        sil = vil.mod
+        sol = vol.mod
+        while _next_right(vil) is not None and _next_left(vir) is not None:
+            vil = _next_right(vil)
+            vir = _next_left(vir)
+            vol = _next_left(vol)
+            vor = _next_right(vor)
+            vor.ancestor = v
+            shift = (vil.prelim + sil) - (vir.prelim + sir) + self._separation(vil, vir)
+            if shift > 0:
+                ancestor = vil.ancestor if vil.ancestor.parent is v.parent else default_ancestor
+                self._move_subtree(ancestor, v, shift)
+                sir += shift
+                sor += shift
+            sil += vil.mod
+            sir += vir.mod
+            sol += vol.mod
+            sor += vor.mod
+        if _next_right(vil) is not None and _next_right(vor) is None:
+            vor.thread = _next_right(vil)
+            vor.mod += sil - sor
+        if _next_left(vir) is not None and _next_left(vol) is None:
+            vol.thread = _next_left(vir)
+            vol.mod += sir - sol
+            default_ancestor = v
+        return default_ancestor
+
+    @staticmethod
+    def _move_subtree(wl, wr, shift):
+        subtrees = wr.number - wl.number
+        wr.change -= shift / subtrees
+        wr.shift += shift
+        wl.change += shift / subtrees
+        wr.prelim += shift
+        wr.mod += shift
+
+    @staticmethod
+    def _execute_shifts(v):
+        shift = change = 0.0
+        for w in reversed(v.children):
+            w.prelim += shift
+            w.mod += shift
+            change += w.change
+            shift += w.shift + change
+
+    def run(self, root):
+        """Assign breadth-axis positions (``x``) and depths to every node under *root*."""
+        self._first_walk(root)
+        # Second walk, iteratively: x = prelim + sum of ancestors' mod
+        stack = [(root, 0.0, 0)]
+        while stack:
+            v, m, depth = stack.pop()
+            v.x = v.prelim + m
+            v.depth = depth
+            for child in v.children:
+                stack.append((child, m + v.mod, depth + 1))
+
+
+# Tree construction -----------------------------------------------------------
+
+def _style_for(styles, level):
+    return styles.get(level, styles.get('default', {}))
+
+
+def _measure(node, rankdir):
+    font_size = float(node.style.get('fontsize', DEFAULT_FONT_SIZE))
+    text_w = max(text_width(line, font_size) for line in node.lines)
+    text_h = len(node.lines) * font_size * LINE_HEIGHT
+    width = text_w + 2 * PADDING_X * font_size
+    height = text_h + 2 * PADDING_Y * font_size
+    shape = node.style.get('shape', 'box')
+    if shape in ELLIPSE_SHAPES or shape in OCTAGON_SHAPES:
+        # Circumscribe the text box
+        width *= 1.414
+        height *= 1.414
+    if shape in ('circle', 'doublecircle'):
+        width = height = max(width, height)
+    node.width, node.height = width, height
+    node.breadth = width if rankdir == 'TB' else height
+
+
+def build_tree(nodes, node_styles, edge_styles):
+    """Build a layout tree from ``MarkdownMindMapConverter`` node dicts.
+
+    Each dict needs ``id``, ``text``, ``parent_id`` and ``level``; an optional
+    ``attrs`` dict overrides the theme's node style. Several top-level nodes
+    hang off a hidden root so the whole forest is laid out together.
+    """
+    by_id = {}
+    roots = []
+    for item in nodes:
+        style = dict(_style_for(node_styles, item['level']))
+        if 'attrs' in item:
+            style.update(item['attrs'])
+        node = _Node(item['id'], label_lines(item['text']), style,
+                     _style_for(edge_styles, item['level']))
+        by_id[item['id']] = node
+        parent = by_id.get(item.get('parent_id'))
+        if parent is not None:
+            parent.add_child(node)
+        else:
+            roots.append(node)
+    if len(roots) == 1:
+        return roots[0]
+    root = _Node('__root__', [''], {}, {}, hidden=True)
+    for node in roots:
+        root.add_child(node)
+    return root
+
+
+def _iter_nodes(root):
+    stack = [root]
+    while stack:
+        v = stack.pop()
+        yield v
+        stack.extend(reversed(v.children))
+
+
+# SVG writer ------------------------------------------------------------------
+
+def _shape_svg(node, cx, cy):
+    style = node.style
+    shape = style.get('shape', 'box')
+    filled = 'filled' in style.get('style', '')
+    fill = style.get('fillcolor', style.get('color', '#FFFFFF')) if filled else 'none'
+    stroke = 'none' if shape in BORDERLESS_SHAPES else style.get('color', '#333333')
+    paint = f'fill="{fill}" stroke="{stroke}"'
+    w, h = node.width, node.height
+    if shape in ELLIPSE_SHAPES:
+        svg = f'<ellipse cx="{cx:.1f}" cy="{cy:.1f}" rx="{w / 2:.1f}" ry="{h / 2:.1f}" {paint}/>'
+        if shape == 'doublecircle':
+            svg += f'<ellipse cx="{cx:.1f}" cy="{cy:.1f}" rx="{w / 2 - 4:.1f}" ry="{h / 2 - 4:.1f}" fill="none" stroke="{stroke}"/>'
+        return svg
+    if shape in OCTAGON_SHAPES:
+        def octagon(inset):
+            hw, hh = w / 2 - inset, h / 2 - inset
+            dx, dy = hw * 0.3, hh * 0.3
+            points = [(-hw + dx, -hh), (hw - dx, -hh), (hw, -hh + dy), (hw, hh - dy),
+                      (hw - dx, hh), (-hw + dx, hh), (-hw, hh - dy), (-hw, -hh + dy)]
+            return ' '.join(f'{cx + px:.1f},{cy + py:.1f}' for px, py in points)
+        svg = f'<polygon points="{octagon(0)}" {paint}/>'
+        if shape == 'doubleoctagon':
+            svg += f'<polygon points="{octagon(4)}" fill="none" stroke="{stroke}"/>'
+        return svg
+    radius = min(h / 4, 8.0) if 'rounded' in style.get('style', '') else 0.0
+    return (f'<rect x="{cx - w / 2:.1f}" y="{cy - h / 2:.1f}" width="{w:.1f}" height="{h:.1f}" '
+            f'rx="{radius:.1f}" {paint}/>')
+
+
+def _text_svg(node, cx, cy, font_family):
+    style = node.style
+    font_size = float(style.get('fontsize', DEFAULT_FONT_SIZE))
+    family = style.get('fontname', font_family)
+    line_h = font_size * LINE_HEIGHT
+    top = cy - line_h * (len(node.lines) - 1) / 2
+    spans = ''.join(
+        f'<tspan x="{cx:.1f}" y="{top + i * line_h:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(node.lines)
+    )
+    return (f'<text text-anchor="middle" dominant-baseline="central" '
+            f'font-family={quoteattr(family)} font-size="{font_size:g}" '
+            f'fill="{style.get("fontcolor", "#333333")}">{spans}</text>')
+
+
+def _edge_svg(parent, child, rankdir, splines):
+    if rankdir == 'TB':
+        x1, y1 = parent.x, parent.y + parent.height / 2
+        x2, y2 = child.x, child.y - child.height / 2
+    else:
+        x1, y1 = parent.x + parent.width / 2, parent.y
+        x2, y2 = child.x - child.width / 2, child.y
+    if splines in ('line', 'false', 'none'):
+        path = f'M{x1:.1f},{y1:.1f} L{x2:.1f},{y2:.1f}'
+    elif splines in ('ortho', 'polyline'):
+        if rankdir == 'TB':
+            mid = (y1 + y2) / 2
+            path = f'M{x1:.1f},{y1:.1f} V{mid:.1f} H{x2:.1f} V{y2:.1f}'
+        else:
+            mid = (x1 + x2) / 2
+            path = f'M{x1:.1f},{y1:.1f} H{mid:.1f} V{y2:.1f} H{x2:.1f}'
+    elif rankdir == 'TB':
+        mid = (y1 + y2) / 2
+        path = f'M{x1:.1f},{y1:.1f} C{x1:.1f},{mid:.1f} {x2:.1f},{mid:.1f} {x2:.1f},{y2:.1f}'
+    else:
+        mid = (x1 + x2) / 2
+        path = f'M{x1:.1f},{y1:.1f} C{mid:.1f},{y1:.1f} {mid:.1f},{y2:.1f} {x2:.1f},{y2:.1f}'
+    style = child.edge_style
+    dash = ' stroke-dasharray="6,4"' if style.get('style') == 'dashed' else ''
+    dash = ' stroke-dasharray="2,3"' if style.get('style') == 'dotted' else dash
+    return (f'<path d="{path}" fill="none" stroke="{style.get("color", "#AAAAAA")}" '
+            f'stroke-width="{style.get("penwidth", "1.0")}"{dash}/>')
+
+
+def render_svg(nodes, node_styles, edge_styles, graph_attrs=None, font_family='sans-serif') -> str:
+    """Lay out *nodes* as a tidy tree and return the mind map as an SVG string.
+
+    :param nodes: node dicts as produced by ``MarkdownMindMapConverter``.
+    :param node_styles: theme ``node_styles`` (keyed by level, plus ``'default'``).
+    :param edge_styles: theme ``edge_styles`` (keyed by child level, plus ``'default'``).
+    :param graph_attrs: theme ``graph_attrs``; ``rankdir`` (TB/LR), ``nodesep``,
+                        ``ranksep``, ``pad``, ``splines`` and ``bgcolor`` are honoured.
+    :param font_family: fallback font for nodes without a ``fontname``.
+    """
+    graph_attrs = graph_attrs or {}
+    rankdir = 'LR' if graph_attrs.get('rankdir', 'TB') in ('LR', 'RL') else 'TB'
+    node_gap = float(graph_attrs.get('nodesep', 0.25)) * POINTS_PER_INCH
+    rank_gap = float(graph_attrs.get('ranksep', 0.5)) * POINTS_PER_INCH
+    pad = float(graph_attrs.get('pad', 0.1)) * POINTS_PER_INCH
+    splines = str(graph_attrs.get('splines', 'curved'))
+
+    root = build_tree(nodes, node_styles, edge_styles)
+    all_nodes = list(_iter_nodes(root))
+    for node in all_nodes:
+        if not node.hidden:
+            _measure(node, rankdir)
+    TidyTreeLayout(node_gap).run(root)
+
+    # Depth axis: every rank is as deep as its deepest node
+    rank_offset = 1 if root.hidden else 0
+    rank_sizes = {}
+    for node in all_nodes:
+        if node.hidden:
+            continue
+        size = node.height if rankdir == 'TB' else node.width
+        rank = node.depth - rank_offset
+        rank_sizes[rank] = max(rank_sizes.get(rank, 0.0), size)
+    rank_centers = {}
+    cursor = 0.0
+    for rank in sorted(rank_sizes):
+        rank_centers[rank] = cursor + rank_sizes[rank] / 2
+        cursor += rank_sizes[rank] + rank_gap
+
+    visible = [node for node in all_nodes if not node.hidden]
+    if not visible:
+        return '<svg xmlns="http://www.w3.org/2000/svg" width="0" height="0"/>\n'
+    min_breadth = min(node.x - node.breadth / 2 for node in visible)
+    max_breadth = max(node.x + node.breadth / 2 for node in visible)
+    for node in visible:
+        breadth_pos = node.x - min_breadth + pad
+        depth_pos = rank_centers[node.depth - rank_offset] + pad
+        if rankdir == 'TB':
+            node.x, node.y = breadth_pos, depth_pos
+        else:
+            node.x, node.y = depth_pos, breadth_pos
+    breadth_extent = max_breadth - min_breadth + 2 * pad
+    depth_extent = cursor - rank_gap + 2 * pad
+    width, height = (breadth_extent, depth_extent) if rankdir == 'TB' else (depth_extent, breadth_extent)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" height="{height:.0f}pt" '
+        f'viewBox="0 0 {width:.1f} {height:.1f}">',
+        f'<rect width="100%" height="100%" fill="{graph_attrs.get("bgcolor", "#FFFFFF")}"/>',
+        '<g class="edges">',
+    ]
+    for node in visible:
+        for child in node.children:
+            parts.append(_edge_svg(node, child, rankdir, splines))
+    parts.append('</g>')
+    parts.append('<g class="nodes">')
+    for node in visible:
+        body = _shape_svg(node, node.x, node.y) + _text_svg(node, node.x, node.y, font_family)
+        url = node.style.get('URL')
+        if url:
+            body = f'<a href={quoteattr(url)}>{body}</a>'
+        parts.append(f'<g id={quoteattr(str(node.key))}>{body}</g>')
+    parts.append('</g>')
+    parts.append('</svg>\n')
+    return '\n'.join(parts)
+
+
+def write_svg(output_path, nodes, node_styles, edge_styles, graph_attrs=None, font_family='sans-serif'):
+    """Render *nodes* via :func:`render_svg` and write the result to *output_path*."""
+    svg = render_svg(nodes, node_styles, edge_styles, graph_attrs, font_family)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(svg)
+    return output_path
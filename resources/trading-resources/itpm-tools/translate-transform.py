@@ -1,10 +1,12 @@
 import markdown
 import os
-from graphviz import Digraph
 from bs4 import BeautifulSoup
 import textwrap # 用于文本自动换行
 import sys # 用于获取当前系统信息，以便推荐字体
 
+import svg_mindmap # 纯 Python 的 SVG 渲染器，无需 Graphviz
+from _telemetry import span # 在仓库内运行时渲染耗时写入统一的 telemetry 日志
+
 class MarkdownMindMapConverter:
     """
     一个将 Markdown 文件转换为思维导图（PNG, JPG, PDF）的工具。
@@ -276,19 +278,24 @@ class MarkdownMindMapConverter:
             # 这里主要依赖标题和列表来构建层级，其他元素会自动找到最近的父级
         return nodes_data
 
-    def convert(self, md_filepath, output_format='png', layout_engine='dot', theme='default'):
+    def convert(self, md_filepath, output_format='png', layout_engine='dot', theme='default', renderer='graphviz'):
         """
         将 Markdown 文件转换为思维导图，并保存为指定格式。
         :param md_filepath: 输入的 Markdown 文件路径。
-        :param output_format: 输出文件格式 ('png', 'jpg', 'pdf')。
+        :param output_format: 输出文件格式 ('png', 'jpg', 'pdf', 'svg')。
         :param layout_engine: Graphviz 布局引擎 ('dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi')。
         :param theme: 思维导图主题 ('default', 'radial_bright' 等)。
+        :param renderer: 'graphviz'（高质量，调用 dot 进程）或 'svg'（进程内树形布局，仅输出 SVG）。
         """
         self.set_theme(theme) # 应用选择的主题
 
-        if output_format not in ['png', 'jpg', 'pdf']:
-            raise ValueError("不支持的输出格式。请选择 'png', 'jpg' 或 'pdf'。")
-        if layout_engine not in ['dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi']:
+        if output_format not in ['png', 'jpg', 'pdf', 'svg']:
+            raise ValueError("不支持的输出格式。请选择 'png', 'jpg', 'pdf' 或 'svg'。")
+        if renderer not in ['graphviz', 'svg']:
+            raise ValueError(f"不支持的渲染器: '{renderer}'。请选择 'graphviz' 或 'svg'。")
+        if renderer == 'svg' and output_format != 'svg':
+            raise ValueError("'svg' 渲染器只能输出 'svg' 格式。")
+        if renderer == 'graphviz' and layout_engine not in ['dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi']:
             raise ValueError(f"不支持的布局引擎: '{layout_engine}'。请从 'dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi' 中选择。")
 
         with open(md_filepath, 'r', encoding='utf-8') as f:
@@ -296,6 +303,23 @@ class MarkdownMindMapConverter:
 
         nodes_data = self._parse_markdown_to_structured_nodes(md_content)
 
+        # 构建输出文件路径
+        base_name = os.path.splitext(os.path.basename(md_filepath))[0]
+        output_filepath = os.path.join(self.output_dir, f"{base_name}.{output_format}")
+
+        if renderer == 'svg':
+            # 快速路径：进程内完成树形布局并直接写出 SVG，不依赖 Graphviz
+            print(f"正在生成思维导图: '{md_filepath}' (渲染器: 'svg', 主题: '{theme}')...")
+            svg_mindmap.write_svg(
+                output_filepath, nodes_data,
+                self.current_node_styles, self.current_edge_styles, self.current_graph_attrs,
+                font_family=self.default_font,
+            )
+            print(f"思维导图已保存到: {output_filepath}")
+            return output_filepath
+
+        from graphviz import Digraph # 仅在使用 Graphviz 渲染时才需要
+
         # 应用主题的 graph_attrs，并允许 layout_engine 覆盖
         current_graph_attrs = self.current_graph_attrs.copy()
         current_graph_attrs['engine'] = layout_engine # 强制设置引擎
@@ -347,10 +371,6 @@ class MarkdownMindMapConverter:
                 # dot.edge(parent_id, child_id, label=edge_label_text, **edge_style_attrs)
                 dot.edge(parent_id, child_id, **edge_style_attrs)
 
-        # 构建输出文件路径
-        base_name = os.path.splitext(os.path.basename(md_filepath))[0]
-        output_filepath = os.path.join(self.output_dir, f"{base_name}.{output_format}")
-
         print(f"正在生成思维导图: '{md_filepath}' (布局: '{layout_engine}', 主题: '{theme}')...")
         try:
             dot.render(output_filepath, view=False, format=output_format)
@@ -402,12 +422,15 @@ def batch_convert_pftm_files():
                 for layout in layouts:
                     try:
                         print(f"  - 生成 {format_type.upper()} (主题: {theme}, 布局: {layout})")
-                        converter.convert(
-                            md_filepath=md_file,
-                            output_format=format_type,
-                            layout_engine=layout,
-                            theme=theme
-                        )
+                        # 每次渲染一个 span，异常会记录在 span 上后继续抛出
+                        with span('render_mindmap', file=filename, format=format_type,
+                                  theme=theme, layout=layout):
+                            converter.convert(
+                                md_filepath=md_file,
+                                output_format=format_type,
+                                layout_engine=layout,
+                                theme=theme
+                            )
                         success_count += 1
                     except Exception as e:
                         print(f"  转换失败: {e}")
@@ -13,10 +13,17 @@ Quick Launcher for Financial Management System
 """
 
 import os
+import signal
 import sys
 import subprocess
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = PROJECT_ROOT / 'tools' / 'system-scripts'
+
+# 启动器与 README 更新器都在当前进程内导入运行，不再另起 Python 解释器
+sys.path.insert(0, str(SCRIPTS_DIR))
+
 def clear_screen():
     """清屏"""
     os.system('clear' if os.name != 'nt' else 'cls')
@@ -53,21 +60,23 @@ def print_banner():
 def launch_three_mode_system():
     """启动三模式系统"""
     print("\n🚀 启动三模式系统选择器...")
-    script_path = Path(__file__).parent / 'deployment' / 'scripts' / 'three_mode_launcher.py'
-    
-    if not script_path.exists():
-        print("❌ 三模式启动脚本不存在")
-        return False
-    
+    # three_mode_launcher 会注册自己的 SIGINT/SIGTERM 处理器，返回菜单前恢复
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
     try:
-        subprocess.run([sys.executable, str(script_path)], check=True)
+        import three_mode_launcher
+        three_mode_launcher.main([])
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ 启动失败: {e}")
+    except ImportError as e:
+        print(f"❌ 三模式启动脚本不存在: {e}")
         return False
+    except SystemExit as e:
+        return not e.code
     except KeyboardInterrupt:
         print("\n👋 用户取消启动")
         return True
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
 
 def update_readme():
     """更新README文档"""
@@ -84,25 +93,25 @@ def update_readme():
         optimization_details = "代码优化和功能改进"
     
     # 调用README更新器
-    script_path = Path(__file__).parent / 'deployment' / 'scripts' / 'auto_update_readme.py'
-    
-    if not script_path.exists():
-        print("❌ README更新脚本不存在")
+    try:
+        from auto_update_readme import ReadmeAutoUpdater
+    except ImportError as e:
+        print(f"❌ README更新脚本不存在: {e}")
         return False
     
     try:
-        subprocess.run([sys.executable, str(script_path), module_name, optimization_details], check=True)
+        ReadmeAutoUpdater().update_with_optimization(module_name, optimization_details)
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ 更新失败: {e}")
-        return False
     except KeyboardInterrupt:
         print("\n👋 用户取消更新")
         return True
+    except Exception as e:
+        print(f"❌ 更新失败: {e}")
+        return False
 
 def show_guide():
     """显示使用指南"""
-    guide_path = Path(__file__).parent / 'docs' / 'SYSTEM_LAUNCH_GUIDE.md'
+    guide_path = PROJECT_ROOT / 'docs' / 'SYSTEM_LAUNCH_GUIDE.md'
     
     if guide_path.exists():
         print("\n📋 正在打开系统启动与文档更新指南...")
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+多语言注释 / 代码分类
+每种语言由一行语法表描述（行注释、块注释、字符串定界符），编译为一个记号正则；
+在整个字节缓冲区上单遍扫描，块注释与字符串的状态自然跨行延续，
+不再逐行猜测 `//`、`*` 之类的前缀。
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# 行首或空白之后的 #（shell / YAML 中的 $#、${#var}、url#frag 不是注释）
+HASH = rb"(?<!\S)#"
+# 只有整行以 # 开头才是注释（Dockerfile、.env、.gitignore）
+HASH_AT_START = rb"^[ \t]*#"
+
+
+@dataclass(frozen=True)
+class Syntax:
+    """一种语言的词法表；注释开始符为正则片段，结束符与字符串定界符为字面字节"""
+    line: Tuple[bytes, ...] = ()
+    block: Tuple[Tuple[bytes, bytes], ...] = ()
+    # (定界符, 可否跨行, 是否支持反斜杠转义)
+    strings: Tuple[Tuple[bytes, bool, bool], ...] = ()
+    # 行首的三引号字符串视为文档注释（Python docstring）
+    docstrings: bool = False
+
+
+C_STRINGS = ((b'"', False, True), (b"'", False, True))
+C_LIKE = Syntax(line=(rb"//",), block=((rb"/\*", b"*/"),), strings=C_STRINGS)
+JS_LIKE = Syntax(line=(rb"//",), block=((rb"/\*", b"*/"),), strings=C_STRINGS + ((b"`", True, True),))
+CSS = Syntax(block=((rb"/\*", b"*/"),), strings=C_STRINGS)
+PYTHON = Syntax(line=(HASH,), strings=((b'"""', True, True), (b"'''", True, True)) + C_STRINGS, docstrings=True)
+SHELL = Syntax(line=(HASH,), strings=((b'"', False, True), (b"'", False, False)))
+CONFIG = Syntax(line=(HASH,), strings=((b'"', False, True), (b"'", False, False)))
+LINE_HASH = Syntax(line=(HASH_AT_START,))
+INI = Syntax(line=(rb"^[ \t]*[#;]",))
+SQL = Syntax(line=(rb"--",), block=((rb"/\*", b"*/"),), strings=((b"'", True, False), (b'"', False, False)))
+POWERSHELL = Syntax(line=(HASH,), block=((rb"<#", b"#>"),), strings=((b'"', True, False), (b"'", True, False)))
+BATCH = Syntax(line=(rb"^[ \t]*(?:@?[Rr][Ee][Mm](?!\S)|::)",))
+MARKUP = Syntax(block=((rb"<!--", b"-->"),))
+PRISMA = Syntax(line=(rb"//",), strings=((b'"', False, True),))
+
+LANGUAGES: Dict[str, Syntax] = {
+    **dict.fromkeys([".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"], JS_LIKE),
+    **dict.fromkeys([".c", ".h", ".cpp", ".hpp", ".java", ".go", ".rs", ".scss", ".less", ".jsonc"], C_LIKE),
+    ".css": CSS,
+    **dict.fromkeys([".py", ".pyi"], PYTHON),
+    **dict.fromkeys([".sh", ".bash", ".zsh"], SHELL),
+    **dict.fromkeys([".yml", ".yaml", ".toml", ".conf", ".r", ".rb", ".pl"], CONFIG),
+    **dict.fromkeys([".ini", ".cfg"], INI),
+    **dict.fromkeys([".env", ".example", ".dockerfile", ".gitignore", ".dockerignore"], LINE_HASH),
+    ".sql": SQL,
+    **dict.fromkeys([".ps1", ".psm1"], POWERSHELL),
+    **dict.fromkeys([".bat", ".cmd"], BATCH),
+    **dict.fromkeys([".md", ".markdown", ".html", ".htm", ".xml", ".svg", ".vue"], MARKUP),
+    ".prisma": PRISMA,
+}
+
+# 没有扩展名（或扩展名不代表语言）的文件按小写文件名前缀识别，如 Dockerfile.prod、.env.local
+FILENAME_PREFIXES: Tuple[Tuple[str, Syntax], ...] = (
+    ("dockerfile", LINE_HASH),
+    ("makefile", CONFIG),
+    (".env", LINE_HASH),
+)
+
+
+def syntax_for(path: str) -> Optional[Syntax]:
+    """按文件名选择语法表；没有注释语法的文件（JSON、CSV、纯文本等）返回 None"""
+    name = os.path.basename(path).lower()
+    for prefix, syntax in FILENAME_PREFIXES:
+        if name.startswith(prefix):
+            return syntax
+    return LANGUAGES.get(os.path.splitext(name)[1])
+
+
+class _Lexer:
+    """一种语法编译后的记号正则；第 i 个分组对应 kinds[i - 1]"""
+
+    def __init__(self, syntax: Syntax):
+        self.syntax = syntax
+        patterns, self.kinds = [], []
+        for opener, closer in syntax.block:
+            patterns.append(opener)
+            self.kinds.append(("block", closer, True, False))
+        for opener in syntax.line:
+            patterns.append(opener)
+            self.kinds.append(("line", b"\n", False, False))
+        # 较长的定界符（三引号）必须排在前面
+        for delimiter, multiline, escapes in sorted(syntax.strings, key=lambda s: -len(s[0])):
+            patterns.append(re.escape(delimiter))
+            self.kinds.append(("string", delimiter, multiline, escapes))
+        self.regex = re.compile(b"|".join(b"(" + p + b")" for p in patterns), re.MULTILINE)
+
+
+_LEXERS: Dict[Syntax, _Lexer] = {}
+
+
+def _lexer(syntax: Syntax) -> _Lexer:
+    lexer = _LEXERS.get(syntax)
+    if lexer is None:
+        lexer = _LEXERS[syntax] = _Lexer(syntax)
+    return lexer
+
+
+class _Tally:
+    """逐行汇总：一行只要含有代码即为代码行，否则含注释为注释行，否则为空行"""
+
+    def __init__(self):
+        self.total = self.code = self.comments = self.blank = 0
+        self.has_code = self.has_comment = False
+
+    def feed(self, text: bytes, comment: bool):
+        """text 属于代码（或注释）；其中的换行结束当前行"""
+        pieces = text.split(b"\n")
+        self._mark(pieces[0], comment)
+        for piece in pieces[1:]:
+            self.end_line()
+            self._mark(piece, comment)
+
+    def _mark(self, piece: bytes, comment: bool):
+        if piece.strip():
+            if comment:
+                self.has_comment = True
+            else:
+                self.has_code = True
+
+    def end_line(self):
+        self.total += 1
+        if self.has_code:
+            self.code += 1
+        elif self.has_comment:
+            self.comments += 1
+        else:
+            self.blank += 1
+        self.has_code = self.has_comment = False
+
+
+def _string_end(data, start: int, delimiter: bytes, multiline: bool, escapes: bool) -> int:
+    """字符串内容从 start 开始，返回结束定界符之后的位置；单行字符串遇到换行即结束"""
+    pos = start
+    while True:
+        end = data.find(delimiter, pos)
+        if not multiline:
+            newline = data.find(b"\n", pos)
+            if newline != -1 and (end == -1 or newline < end):
+                return newline
+        if end == -1:
+            return len(data)
+        if escapes:
+            backslashes = 0
+            while end - backslashes > start and data[end - backslashes - 1] == 0x5C:
+                backslashes += 1
+            if backslashes % 2:
+                pos = end + 1
+                continue
+        return end + len(delimiter)
+
+
+def classify(data, syntax: Syntax) -> Tuple[int, int, int, int]:
+    """单遍扫描 data（bytes 或 mmap），返回 (总行数, 代码行, 注释行, 空行)
+
+    总行数与 str.split('\\n') 一致；块注释、文档字符串内的空白行计为空行。
+    """
+    lexer = _lexer(syntax)
+    tally = _Tally()
+    pos, size = 0, len(data)
+    while pos < size:
+        m = lexer.regex.search(data, pos)
+        if m is None:
+            tally.feed(data[pos:], comment=False)
+            pos = size
+            break
+        tally.feed(data[pos:m.start()], comment=False)
+        kind, closer, multiline, escapes = lexer.kinds[m.lastindex - 1]
+        if kind == "line":
+            end = data.find(b"\n", m.end())
+            end = size if end == -1 else end
+            comment = True
+        elif kind == "block":
+            end = data.find(closer, m.end())
+            end = size if end == -1 else end + len(closer)
+            comment = True
+        else:
+            end = _string_end(data, m.end(), closer, multiline, escapes)
+            comment = syntax.docstrings and len(closer) == 3 and not tally.has_code
+        tally.feed(data[m.start():end], comment)
+        pos = end
+    tally.end_line()
+    return tally.total, tally.code, tally.comments, tally.blank
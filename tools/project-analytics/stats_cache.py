@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+增量统计缓存
+按 路径 + 大小 + mtime + inode 缓存每个文件的行数统计，重复运行时只重新读取变化的文件；
+git 模式下直接向 git 询问自上次统计以来变化的路径，其余文件连 stat 都不需要。
+"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from line_counter import COUNTER_VERSION, LineCount
+
+CACHE_VERSION = 1
+
+
+def file_key(st: os.stat_result) -> List[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class StatsCache:
+    """{相对路径: [大小, mtime_ns, inode, 总行数, 代码, 注释, 空行, 是否二进制]}"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries: Dict[str, list] = {}
+        self.tree: Optional[Dict[str, List[str]]] = None  # 上次遍历得到的目录与文件
+        self.commit: Optional[str] = None
+        self.pending: List[str] = []  # 上次统计时与 commit 不一致的文件
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    @property
+    def version(self) -> str:
+        return f"{CACHE_VERSION}.{COUNTER_VERSION}"
+
+    @classmethod
+    def load(cls, path) -> "StatsCache":
+        """读取缓存；文件不存在、损坏或统计规则版本变化时返回空缓存"""
+        cache = cls(path)
+        try:
+            with open(cache.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if data.get("version") != cache.version:
+            return cache
+        cache.entries = data.get("entries", {})
+        cache.tree = data.get("tree")
+        cache.commit = data.get("commit")
+        cache.pending = data.get("pending", [])
+        return cache
+
+    def get(self, rel_path: str) -> Optional[LineCount]:
+        """不检查文件状态，直接返回缓存结果（git 模式下未变化的文件）"""
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return None
+        self.hits += 1
+        return _to_count(entry)
+
+    def lookup(self, rel_path: str, st: os.stat_result) -> Optional[LineCount]:
+        """大小、mtime、inode 都未变化时返回缓存结果"""
+        entry = self.entries.get(rel_path)
+        if entry is None or entry[:3] != file_key(st):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _to_count(entry)
+
+    def store(self, rel_path: str, st: os.stat_result, count: LineCount):
+        self.entries[rel_path] = file_key(st) + [count.total, count.code, count.comments, count.blank,
+                                                 int(count.binary)]
+        self.dirty = True
+
+    def retain(self, rel_paths: Iterable[str]):
+        """删除已不存在（或不再统计）的文件"""
+        keep = set(rel_paths)
+        for rel_path in [p for p in self.entries if p not in keep]:
+            del self.entries[rel_path]
+            self.dirty = True
+
+    def update_tree(self, directories: Iterable[str], files: Iterable[str],
+                    state: Optional[Tuple[str, Set[str]]]):
+        """记录本次的目录树以及 git 状态 (HEAD, 与 HEAD 不一致的文件)，供下次 git 模式使用"""
+        tree = {"directories": sorted(directories), "files": sorted(files)}
+        commit, pending = (state[0], sorted(state[1])) if state else (None, [])
+        if (tree, commit, pending) != (self.tree, self.commit, self.pending):
+            self.tree, self.commit, self.pending = tree, commit, pending
+            self.dirty = True
+
+    def save(self):
+        """原子写入：先写临时文件再 os.replace，并发运行时不会留下半个文件"""
+        if not self.dirty:
+            return
+        data = {"version": self.version, "commit": self.commit, "pending": self.pending,
+                "tree": self.tree, "entries": self.entries}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _to_count(entry: list) -> LineCount:
+    total, code, comments, blank, binary = entry[3:8]
+    return LineCount(total, code, comments, blank, bool(binary))
+
+
+def git_output(root, *args) -> Optional[str]:
+    """在 root 下运行 git 命令；git 不可用或命令失败时返回 None"""
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def _paths(output: str) -> Set[str]:
+    return {os.path.normpath(path) for path in output.split("\0") if path}
+
+
+def git_state(root) -> Optional[Tuple[str, Set[str]]]:
+    """(HEAD, 与 HEAD 不一致的已跟踪文件 + 未跟踪文件)；git 不可用时返回 None
+
+    被 .gitignore 忽略的文件不在 git 的视野内，它们只在完整遍历时刷新。
+    """
+    head = git_output(root, "rev-parse", "HEAD")
+    dirty = git_output(root, "diff", "--name-only", "--relative", "-z", "HEAD")
+    untracked = git_output(root, "ls-files", "--others", "--exclude-standard", "-z")
+    if head is None or dirty is None or untracked is None:
+        return None
+    return head.strip(), _paths(dirty) | _paths(untracked)
+
+
+def git_changed_since(root, commit: str) -> Optional[Set[str]]:
+    """commit 与当前工作区之间内容不同的已跟踪文件"""
+    output = git_output(root, "diff", "--name-only", "--relative", "-z", commit)
+    return None if output is None else _paths(output)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+项目统计历史
+每次统计按 (时间, commit, 模块, 语言, 文件数, 行数) 追加到列式存储的历史文件：
+字符串列做字典编码、时间列做差分编码，按时间有序，区间查询用二分定位起点。
+回填模式用 git ls-tree 与常驻的 git cat-file --batch 逐个读取历史 blob，不需要检出。
+"""
+
+import json
+import os
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from stats_cache import git_output
+
+HISTORY_VERSION = 1
+TREND_DAYS = 90
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+SPARK_WIDTH = 30
+
+STRING_COLUMNS = ("commit", "module", "language")
+NUMBER_COLUMNS = ("files", "lines")
+
+# (模块, 语言, 文件数, 行数)
+Row = Tuple[str, str, int, int]
+
+
+class StatsHistory:
+    """列式历史记录：columns[列名][i] 为第 i 行；字符串列在内存中保存字典下标"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.timestamps: List[int] = []
+        self.columns: Dict[str, List[int]] = {name: [] for name in STRING_COLUMNS + NUMBER_COLUMNS}
+        self.dictionaries: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+
+    @classmethod
+    def load(cls, path) -> "StatsHistory":
+        """读取历史；文件不存在或格式不符时返回空历史"""
+        history = cls(path)
+        try:
+            with open(history.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return history
+        if data.get("version") != HISTORY_VERSION:
+            return history
+        timestamp = 0
+        for delta in data["columns"]["timestamp"]:
+            timestamp += delta
+            history.timestamps.append(timestamp)
+        for name in STRING_COLUMNS + NUMBER_COLUMNS:
+            history.columns[name] = data["columns"][name]
+        for name in STRING_COLUMNS:
+            history.dictionaries[name] = data["dictionaries"][name]
+            history._codes[name] = {value: code for code, value in enumerate(data["dictionaries"][name])}
+        return history
+
+    def save(self):
+        """原子写入（临时文件 + os.replace）"""
+        deltas, previous = [], 0
+        for timestamp in self.timestamps:
+            deltas.append(timestamp - previous)
+            previous = timestamp
+        data = {"version": HISTORY_VERSION, "dictionaries": self.dictionaries,
+                "columns": {"timestamp": deltas, **self.columns}}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _encode(self, name: str, value: str) -> int:
+        code = self._codes[name].get(value)
+        if code is None:
+            code = self._codes[name][value] = len(self.dictionaries[name])
+            self.dictionaries[name].append(value)
+        return code
+
+    def has_commit(self, commit: str) -> bool:
+        return commit in self._codes["commit"]
+
+    def snapshot(self, index: int) -> Tuple[int, int, List[Row]]:
+        """包含第 index 行的那次统计：(时间, commit 下标, 各行)"""
+        timestamp, commit = self.timestamps[index], self.columns["commit"][index]
+        rows = []
+        for i in range(bisect_left(self.timestamps, timestamp), bisect_right(self.timestamps, timestamp)):
+            if self.columns["commit"][i] == commit:
+                rows.append(self._row(i))
+        return timestamp, commit, rows
+
+    def _row(self, i: int) -> Row:
+        return (self.dictionaries["module"][self.columns["module"][i]],
+                self.dictionaries["language"][self.columns["language"][i]],
+                self.columns["files"][i], self.columns["lines"][i])
+
+    def append(self, timestamp: int, commit: str, rows: Iterable[Row]) -> bool:
+        """追加一次统计；与最近一次同一 commit 的结果完全相同时不重复记录，返回 False"""
+        rows = sorted(rows)
+        commit = commit or ""
+        if self.timestamps:
+            _, last_commit, last_rows = self.snapshot(len(self) - 1)
+            if self.dictionaries["commit"][last_commit] == commit and sorted(last_rows) == rows:
+                return False
+        # 回填的旧 commit 插入到对应时间位置，保持时间列有序
+        at = bisect_right(self.timestamps, timestamp)
+        commit_code = self._encode("commit", commit)
+        self.timestamps[at:at] = [timestamp] * len(rows)
+        self.columns["commit"][at:at] = [commit_code] * len(rows)
+        self.columns["module"][at:at] = [self._encode("module", row[0]) for row in rows]
+        self.columns["language"][at:at] = [self._encode("language", row[1]) for row in rows]
+        self.columns["files"][at:at] = [row[2] for row in rows]
+        self.columns["lines"][at:at] = [row[3] for row in rows]
+        return True
+
+    def series(self, metric: str = "lines", by: str = "module", days: Optional[float] = TREND_DAYS,
+               now: Optional[float] = None) -> Tuple[List[int], Dict[str, List[int]]]:
+        """按模块（或语言）汇总的时间序列，如"最近 90 天各模块行数"
+
+        返回 (各次统计的时间, {模块: 与时间一一对应的数值})；某次统计中没有出现的模块记为 0。
+        """
+        start = 0
+        if days is not None and self.timestamps:
+            now = self.timestamps[-1] if now is None else now
+            start = bisect_left(self.timestamps, now - days * 86400)
+        values, keys = self.columns[metric], self.columns[by]
+        commits = self.columns["commit"]
+        snapshots: Dict[Tuple[int, int], Dict[int, int]] = {}
+        for i in range(start, len(self.timestamps)):
+            totals = snapshots.setdefault((self.timestamps[i], commits[i]), defaultdict(int))
+            totals[keys[i]] += values[i]
+        names = self.dictionaries[by]
+        used = sorted({key for totals in snapshots.values() for key in totals})
+        return ([timestamp for timestamp, _ in snapshots],
+                {names[key]: [totals.get(key, 0) for totals in snapshots.values()] for key in used})
+
+
+def sparkline(values: List[int], width: int = SPARK_WIDTH) -> str:
+    """数值序列 -> ▁▂▃▅▇ 字符串；点数超过 width 时等距抽样"""
+    if not values:
+        return ""
+    if len(values) > width:
+        values = [values[round(i * (len(values) - 1) / (width - 1))] for i in range(width)]
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[round((value - low) * scale)] for value in values)
+
+
+def head_commit(root) -> Optional[str]:
+    output = git_output(root, "rev-parse", "HEAD")
+    return output.strip() if output else None
+
+
+def list_commits(root, since: Optional[str] = None, max_count: Optional[int] = None) -> List[Tuple[str, int]]:
+    """第一父提交链上的 (commit, 提交时间)，从旧到新"""
+    args = ["log", "--first-parent", "--format=%H %ct"]
+    if since:
+        args.append(f"--since={since}")
+    if max_count:
+        args.append(f"--max-count={max_count}")
+    output = git_output(root, *args) or ""
+    commits = [(sha, int(timestamp)) for sha, timestamp in (line.split() for line in output.splitlines())]
+    return commits[::-1]
+
+
+def list_tree(root, commit: str) -> Dict[str, str]:
+    """commit 中 root 之下的 {相对路径: blob}（不检出）"""
+    output = git_output(root, "ls-tree", "-r", "-z", commit) or ""
+    tree = {}
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        _, kind, sha = info.split()
+        if kind == "blob":
+            tree[os.path.normpath(path)] = sha
+    return tree
+
+
+class BlobReader:
+    """常驻的 git cat-file --batch 进程，按需流式读取 blob 内容"""
+
+    def __init__(self, root):
+        self.process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=root,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, sha: str) -> Optional[bytes]:
+        self.process.stdin.write(sha.encode() + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)  # 内容后的换行
+        return data
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,9 +3,16 @@
 const fs = require('fs');
 const path = require('path');
 
+// 增量缓存：路径 -> [大小, mtime, inode, 统计结果]，未变化的文件不再重新读取
+const CACHE_DIR = path.join(__dirname, '.cache');
+const CACHE_PATH = path.join(CACHE_DIR, 'stats-cache.node.json');
+const CACHE_VERSION = 1;
+
 class ProjectStatsCollector {
     constructor() {
         this.config = this.loadConfig();
+        this.cache = this.loadCache();
+        this.seenFiles = new Set();
         this.stats = {
             projectName: this.config.projectName,
             lastUpdated: new Date().toISOString(),
@@ -29,6 +36,39 @@ class ProjectStatsCollector {
         return JSON.parse(fs.readFileSync(configPath, 'utf8'));
     }
 
+    loadCache() {
+        try {
+            const data = JSON.parse(fs.readFileSync(CACHE_PATH, 'utf8'));
+            if (data.version === CACHE_VERSION) return data.entries;
+        } catch (error) {
+            // 缓存不存在或已损坏时重新统计
+        }
+        return {};
+    }
+
+    saveCache() {
+        // 删除本次未扫描到的文件，先写临时文件再重命名，避免留下不完整的缓存
+        Object.keys(this.cache).forEach(filePath => {
+            if (!this.seenFiles.has(filePath)) delete this.cache[filePath];
+        });
+        fs.mkdirSync(CACHE_DIR, { recursive: true });
+        const tmpPath = `${CACHE_PATH}.${process.pid}.tmp`;
+        fs.writeFileSync(tmpPath, JSON.stringify({ version: CACHE_VERSION, entries: this.cache }), 'utf8');
+        fs.renameSync(tmpPath, CACHE_PATH);
+    }
+
+    countLinesCached(filePath, stat) {
+        const key = path.resolve(filePath);
+        const entry = this.cache[key];
+        this.seenFiles.add(key);
+        if (entry && entry[0] === stat.size && entry[1] === stat.mtimeMs && entry[2] === stat.ino) {
+            return entry[3];
+        }
+        const lineCount = this.countLines(filePath);
+        this.cache[key] = [stat.size, stat.mtimeMs, stat.ino, lineCount];
+        return lineCount;
+    }
+
     isExcluded(filePath, excludePaths) {
         return excludePaths.some(excludePath => {
             const fullExcludePath = path.resolve(excludePath);
@@ -121,7 +161,7 @@ class ProjectStatsCollector {
             items.forEach(item => {
                 const fullPath = path.join(dirPath, item);
                 
-                if (this.isExcluded(fullPath, excludePaths)) {
+                if (path.resolve(fullPath) === CACHE_DIR || this.isExcluded(fullPath, excludePaths)) {
                     return;
                 }
 
@@ -159,7 +199,7 @@ class ProjectStatsCollector {
                 } else if (stat.isFile()) {
                     result.files++;
                     
-                    const lineCount = this.countLines(fullPath);
+                    const lineCount = this.countLinesCached(fullPath, stat);
                     result.lines.total += lineCount.total;
                     result.lines.code += lineCount.code;
                     result.lines.comments += lineCount.comments;
@@ -365,6 +405,7 @@ class ProjectStatsCollector {
     run() {
         console.log('🚀 开始项目量化统计...\n');
         this.collectStats();
+        this.saveCache();
         this.saveJSONStats();
         this.saveMarkdownStats();
         console.log('\n✅ 统计完成! 请查看生成的文件:');
@@ -8,14 +8,52 @@
 import os
 import json
 import time
+import argparse
 from pathlib import Path
 from collections import defaultdict
 import sys
 
+import line_counter
+import stats_cache
+import stats_history
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+
+# 路径排除匹配器（与目录结构生成器共用）与 telemetry 位于 tools/system-scripts
+sys.path.insert(0, str(PROJECT_ROOT / "tools" / "system-scripts"))
+from path_matcher import PathMatcher, TreeMatcher, compile_globs
+import telemetry
+
+# 增量缓存位于 .cache/ 下，该目录本身也在排除列表中
+CACHE_PATH = SCRIPT_DIR / ".cache" / "stats-cache.json"
+
+# 每次统计追加一条记录的历史文件（列式存储）
+HISTORY_PATH = SCRIPT_DIR / "project-stats-history.json"
+
+# 任何模块都不统计的目录名（配置中的 excludeDirs 可覆盖）
+DEFAULT_EXCLUDE_DIRS = [".git", "node_modules", "venv", ".venv", "__pycache__", ".cache"]
+
 class ProjectStatsCollector:
-    def __init__(self, config_path="quantification/stats-config.json"):
+    def __init__(self, config_path=SCRIPT_DIR / "stats-config.json", project_root=PROJECT_ROOT, max_workers=None,
+                 cache_path=CACHE_PATH, git_mode=False, history_path=HISTORY_PATH):
+        """
+        :param cache_path: 增量缓存文件，为 None 时每次重新统计全部文件
+        :param git_mode: 由 git 报告变化的文件，不再遍历目录、逐个 stat
+        :param history_path: 统计历史文件，为 None 时不记录历史
+        """
         self.config_path = config_path
+        self.project_root = Path(project_root)
+        self.max_workers = max_workers
+        self.cache = stats_cache.StatsCache.load(cache_path) if cache_path else None
+        self.git_mode = git_mode and self.cache is not None
+        self.history = stats_history.StatsHistory.load(history_path) if history_path else None
+        self.git_state = None
         self.config = self.load_config()
+        exclude_dirs = self.config.get("excludeDirs", DEFAULT_EXCLUDE_DIRS)
+        self.tree = TreeMatcher(self.project_root,
+                                PathMatcher(patterns=[f"{name.strip('/')}/" for name in exclude_dirs]),
+                                gitignore=self.config.get("respectGitignore", True))
         self.stats = {
             "projectName": self.config["projectName"],
             "lastUpdated": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
@@ -45,15 +83,6 @@ class ProjectStatsCollector:
             print(f"配置文件格式错误: {e}")
             sys.exit(1)
 
-    def is_excluded(self, file_path, exclude_paths):
-        """检查路径是否被排除"""
-        file_path = os.path.normpath(file_path)
-        for exclude_path in exclude_paths:
-            exclude_path = os.path.normpath(exclude_path)
-            if exclude_path in file_path:
-                return True
-        return False
-
     def get_file_extension(self, filename):
         """获取文件扩展名或特殊文件类型"""
         ext = Path(filename).suffix.lower()
@@ -79,149 +108,242 @@ class ProjectStatsCollector:
         return "other"
 
     def count_lines(self, file_path):
-        """统计文件行数"""
+        """统计文件行数（二进制文件计为 0 行）"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
-            if not content:
-                return {"total": 0, "code": 0, "comments": 0, "blank": 0}
-                
-            lines = content.split('\n')
-            total_lines = len(lines)
-            code_lines = 0
-            comment_lines = 0
-            blank_lines = 0
-            
-            ext = self.get_file_extension(os.path.basename(file_path))
-            is_code_file = ext in [".ts", ".tsx", ".js", ".jsx"]
-            
-            for line in lines:
-                trimmed_line = line.strip()
-                
-                if trimmed_line == "":
-                    blank_lines += 1
-                elif is_code_file and (
-                    trimmed_line.startswith("//") or 
-                    trimmed_line.startswith("/*") or 
-                    trimmed_line.startswith("*") or
-                    trimmed_line.endswith("*/")
-                ):
-                    comment_lines += 1
-                elif ext in [".md", ".html"]:
-                    code_lines += 1
-                else:
-                    code_lines += 1
-            
-            return {
-                "total": total_lines,
-                "code": code_lines,
-                "comments": comment_lines,
-                "blank": blank_lines
-            }
-        except Exception as e:
+            return line_counter.count_file(str(file_path)).as_dict()
+        except (OSError, ValueError) as e:
             print(f"警告: 无法读取文件 {file_path}: {e}")
             return {"total": 0, "code": 0, "comments": 0, "blank": 0}
 
+    @staticmethod
+    def is_under(rel_path, module_path):
+        return module_path == "." or rel_path == module_path or rel_path.startswith(module_path + os.sep)
+
+    def walk_roots(self, module_paths):
+        """去掉被其他路径包含的路径，保证每个目录只遍历一次"""
+        roots = sorted({os.path.normpath(path) for path in module_paths}, key=len)
+        unique = []
+        for root in roots:
+            if not any(self.is_under(root, parent) for parent in unique):
+                unique.append(root)
+        return unique
+
+    @staticmethod
+    def module_rules(module):
+        """模块的 (排除匹配器, includeFiles 正则)；未配置 includeFiles 时正则为 None"""
+        return PathMatcher.from_paths(module.get("excludePaths", [])), compile_globs(module.get("includeFiles", []))
+
+    def module_scopes(self, modules):
+        scopes = []
+        for module in modules.values():
+            excludes, _ = self.module_rules(module)
+            scopes.extend((os.path.normpath(path), excludes) for path in module["paths"])
+        return scopes
+
+    def is_wanted(self, rel_dir, scopes):
+        """至少有一个覆盖该目录的模块没有排除它"""
+        return any(self.is_under(rel_dir, path) and not excludes.hides(rel_dir, is_dir=True)
+                   for path, excludes in scopes)
+
+    def walk_tree(self, modules):
+        """一次遍历所有模块路径，返回项目根目录下的 (目录列表, 文件列表) 相对路径
+
+        excludeDirs、.gitignore 以及任何模块都排除的目录在遍历时直接剪枝，不再向下进入。
+        """
+        scopes = self.module_scopes(modules)
+        wanted = lambda rel_dir: self.is_wanted(rel_dir, scopes)
+
+        directories, files = [], []
+        for root in self.walk_roots(path for path, _ in scopes):
+            top = self.project_root / root
+            if not top.is_dir():
+                continue
+            for rel, dirs, names in self.tree.walk(root):
+                rel = os.path.normpath(rel) if rel else ""
+                dirs[:] = [d for d in dirs if wanted(os.path.join(rel, d))]
+                directories.extend(os.path.join(rel, d) for d in dirs)
+                files.extend(os.path.join(rel, name) for name in names)
+        return directories, files
+
+    def walked_dirs(self, rel_file, scopes, roots):
+        """文件若会被 walk_tree 遍历到，返回它所在的各级目录（不含遍历起点）；否则返回 None"""
+        root = next((root for root in roots if self.is_under(rel_file, root)), None)
+        if root is None or not self.tree.visible(rel_file):
+            return None
+        parts = Path(rel_file).parent.parts
+        start = 0 if root == "." else len(Path(root).parts)
+        directories = []
+        for depth in range(start, len(parts)):
+            rel_dir = os.path.join(*parts[:depth + 1])
+            if not self.is_wanted(rel_dir, scopes):
+                return None
+            directories.append(rel_dir)
+        return directories
+
+    def git_tree(self, modules):
+        """git 模式：在上次的目录树上应用 git 报告的变化
+
+        返回 (目录列表, 文件列表, 需要检查的文件)；没有可用的上次结果或 git 不可用时返回 None。
+        """
+        cache = self.cache
+        if not cache.tree or not cache.commit:
+            return None
+        changed = stats_cache.git_changed_since(self.project_root, cache.commit)
+        if changed is None or self.git_state is None:
+            return None
+        candidates = changed | self.git_state[1] | set(cache.pending)
+        # 排除规则本身变化时，上次的目录树不再可信
+        config_file = os.path.relpath(Path(self.config_path).resolve(), self.project_root)
+        if config_file in candidates or any(os.path.basename(path) == ".gitignore" for path in candidates):
+            return None
+
+        scopes = self.module_scopes(modules)
+        roots = self.walk_roots(path for path, _ in scopes)
+        directories, files = set(cache.tree["directories"]), set(cache.tree["files"])
+        for rel_file in candidates:
+            if not (self.project_root / rel_file).is_file():
+                files.discard(rel_file)
+                continue
+            parents = self.walked_dirs(rel_file, scopes, roots)
+            if parents is not None:
+                files.add(rel_file)
+                directories.update(parents)
+        directories = {d for d in directories if (self.project_root / d).is_dir()}
+        return directories, files, candidates
+
+    def module_members(self, module, directories, files):
+        """模块路径下未被排除的目录与文件（多个路径重叠时只计一次）
+
+        配置了 includeFiles 的模块只统计匹配的文件，以及包含这些文件的目录。
+        """
+        paths = [os.path.normpath(path) for path in module["paths"]]
+        excludes, includes = self.module_rules(module)
+
+        def member(rel_path, is_dir):
+            return any(self.is_under(rel_path, path) and not (is_dir and rel_path == path) for path in paths) \
+                and not excludes.hides(rel_path, is_dir)
+
+        module_files = {f for f in files if member(f, is_dir=False)
+                        and (includes is None or includes.fullmatch(f.replace(os.sep, "/")))}
+        module_dirs = {d for d in directories if member(d, is_dir=True)}
+        if includes is not None:
+            module_dirs &= {str(parent) for f in module_files for parent in Path(f).parents}
+        return module_dirs, module_files
+
     def scan_directory(self, dir_path, exclude_paths=None):
-        """扫描目录"""
-        if exclude_paths is None:
-            exclude_paths = []
-            
+        """扫描单个目录"""
+        module = {"paths": [dir_path], "excludePaths": exclude_paths or []}
+        directories, files = self.module_members(module, *self.walk_tree({"module": module}))
+        return self.aggregate(directories, files, self.count_all(files))
+
+    def count_cached(self, files, candidates=None):
+        """优先使用缓存，只重新统计变化的文件
+
+        :param candidates: git 模式下可能变化的文件；其余文件直接信任缓存，不做 stat
+        """
+        if self.cache is None:
+            return self.count_all(files)
+        counts, stats = {}, {}
+        for rel_file in files:
+            if candidates is not None and rel_file not in candidates:
+                cached = self.cache.get(rel_file)
+                if cached is not None:
+                    counts[rel_file] = cached
+                    continue
+            try:
+                st = os.stat(self.project_root / rel_file)
+            except OSError as e:
+                print(f"警告: 无法读取文件 {rel_file}: {e}")
+                counts[rel_file] = line_counter.LineCount()
+                continue
+            cached = self.cache.lookup(rel_file, st)
+            if cached is None:
+                stats[rel_file] = st
+            else:
+                counts[rel_file] = cached
+        for rel_file, count in self.count_all(stats).items():
+            counts[rel_file] = count
+            self.cache.store(rel_file, stats[rel_file], count)
+        self.cache.retain(files)
+        return counts
+
+    def count_all(self, files):
+        """并行统计一组相对路径文件，返回 {相对路径: LineCount}"""
+        absolute = {str(self.project_root / f): f for f in files}
+        counts = line_counter.count_files(absolute, self.max_workers)
+        return {absolute[path]: count for path, count in counts.items()}
+
+    def aggregate(self, directories, files, counts):
+        """按 counts（{相对路径: LineCount}）汇总一组文件"""
         result = {
-            "directories": 0,
+            "directories": len(directories),
             "files": 0,
             "lines": {"total": 0, "code": 0, "comments": 0, "blank": 0},
             "languages": defaultdict(lambda: {"files": 0, "lines": 0}),
             "fileTypes": defaultdict(lambda: {"files": 0, "lines": 0})
         }
-        
-        if not os.path.exists(dir_path) or self.is_excluded(dir_path, exclude_paths):
-            return result
-            
-        try:
-            for root, dirs, files in os.walk(dir_path):
-                # 过滤排除的目录
-                dirs[:] = [d for d in dirs if not self.is_excluded(os.path.join(root, d), exclude_paths)]
-                
-                # 统计目录数
-                result["directories"] += len(dirs)
-                
-                # 统计文件
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    if self.is_excluded(file_path, exclude_paths):
-                        continue
-                        
-                    result["files"] += 1
-                    
-                    # 统计行数
-                    line_count = self.count_lines(file_path)
-                    result["lines"]["total"] += line_count["total"]
-                    result["lines"]["code"] += line_count["code"]
-                    result["lines"]["comments"] += line_count["comments"]
-                    result["lines"]["blank"] += line_count["blank"]
-                    
-                    # 统计语言
-                    ext = self.get_file_extension(file)
-                    language = self.get_language_by_extension(ext, file)
-                    
-                    result["languages"][language]["files"] += 1
-                    result["languages"][language]["lines"] += line_count["total"]
-                    
-                    # 统计文件类型
-                    file_type = ext if ext else "no-extension"
-                    result["fileTypes"][file_type]["files"] += 1
-                    result["fileTypes"][file_type]["lines"] += line_count["total"]
-                    
-        except Exception as e:
-            print(f"警告: 扫描目录 {dir_path} 时出错: {e}")
-            
+        for file_path in sorted(files):
+            line_count = counts[file_path]
+            result["files"] += 1
+            result["lines"]["total"] += line_count.total
+            result["lines"]["code"] += line_count.code
+            result["lines"]["comments"] += line_count.comments
+            result["lines"]["blank"] += line_count.blank
+
+            # 统计语言
+            file = os.path.basename(file_path)
+            ext = self.get_file_extension(file)
+            language = self.get_language_by_extension(ext, file)
+            result["languages"][language]["files"] += 1
+            result["languages"][language]["lines"] += line_count.total
+
+            # 统计文件类型
+            file_type = ext if ext else "no-extension"
+            result["fileTypes"][file_type]["files"] += 1
+            result["fileTypes"][file_type]["lines"] += line_count.total
         return result
 
+    @telemetry.traced()
     def collect_stats(self):
-        """收集统计数据"""
+        """收集统计数据：一次遍历目录，所有文件并行统计一次，再按模块汇总"""
         print("🚀 开始收集项目统计数据...")
-        
-        for module_key, module in self.config["modules"].items():
-            print(f"正在扫描模块: {module['name']}")
-            
+        modules = self.config["modules"]
+
+        self.git_state = stats_cache.git_state(self.project_root) if self.cache is not None else None
+        tree = self.git_tree(modules) if self.git_mode else None
+        if tree is None:
+            if self.git_mode:
+                print("无可用的上次统计结果、git 不可用或排除规则有变化，改为完整遍历")
+            directories, files, candidates = *self.walk_tree(modules), None
+        else:
+            directories, files, candidates = tree
+        members = {key: self.module_members(module, directories, files) for key, module in modules.items()}
+        unique_files = sorted(set().union(*(module_files for _, module_files in members.values())))
+        counts = self.count_cached(unique_files, candidates)
+        if self.cache is not None:
+            print(f"共 {len(unique_files)} 个文件，缓存命中 {self.cache.hits} 个，重新统计 {self.cache.misses} 个")
+            self.cache.update_tree(directories, files, self.git_state)
+            self.cache.save()
+        else:
+            print(f"共 {len(unique_files)} 个文件")
+        binaries = sum(1 for count in counts.values() if count.binary)
+        if binaries:
+            print(f"跳过 {binaries} 个二进制文件的行数统计")
+
+        for module_key, module in modules.items():
+            print(f"正在汇总模块: {module['name']}")
+            result = self.aggregate(*members[module_key], counts)
             module_stats = {
                 "name": module["name"],
                 "description": module["description"],
-                "directories": 0,
-                "files": 0,
-                "lines": {"total": 0, "code": 0, "comments": 0, "blank": 0},
-                "languages": defaultdict(lambda: {"files": 0, "lines": 0}),
-                "fileTypes": defaultdict(lambda: {"files": 0, "lines": 0})
+                "directories": result["directories"],
+                "files": result["files"],
+                "lines": result["lines"],
+                # 转换为普通字典
+                "languages": dict(result["languages"]),
+                "fileTypes": dict(result["fileTypes"])
             }
             
-            for module_path in module["paths"]:
-                exclude_paths = module.get("excludePaths", [])
-                result = self.scan_directory(module_path, exclude_paths)
-                
-                module_stats["directories"] += result["directories"]
-                module_stats["files"] += result["files"]
-                module_stats["lines"]["total"] += result["lines"]["total"]
-                module_stats["lines"]["code"] += result["lines"]["code"]
-                module_stats["lines"]["comments"] += result["lines"]["comments"]
-                module_stats["lines"]["blank"] += result["lines"]["blank"]
-                
-                # 合并语言统计
-                for lang, stats in result["languages"].items():
-                    module_stats["languages"][lang]["files"] += stats["files"]
-                    module_stats["languages"][lang]["lines"] += stats["lines"]
-                    
-                # 合并文件类型统计
-                for file_type, stats in result["fileTypes"].items():
-                    module_stats["fileTypes"][file_type]["files"] += stats["files"]
-                    module_stats["fileTypes"][file_type]["lines"] += stats["lines"]
-            
-            # 转换为普通字典
-            module_stats["languages"] = dict(module_stats["languages"])
-            module_stats["fileTypes"] = dict(module_stats["fileTypes"])
-            
             self.stats["modules"][module_key] = module_stats
             
             # 更新总计
@@ -250,7 +372,62 @@ class ProjectStatsCollector:
         
         print("✅ 统计数据收集完成!")
 
-    def save_json_stats(self, output_dir="quantification"):
+    @staticmethod
+    def history_rows(module_stats):
+        """{模块: 模块统计} -> 历史记录行 (模块, 语言, 文件数, 行数)"""
+        return [(key, language, stats["files"], stats["lines"])
+                for key, module in module_stats.items() for language, stats in module["languages"].items()]
+
+    @telemetry.traced()
+    def record_history(self):
+        """把本次统计追加到历史文件"""
+        if self.history is None:
+            return
+        commit = self.git_state[0] if self.git_state else stats_history.head_commit(self.project_root)
+        if self.history.append(int(time.time()), commit, self.history_rows(self.stats["modules"])):
+            self.history.save()
+            print(f"统计历史已追加到: {self.history.path}")
+
+    def commit_rows(self, tree, read_blob, blob_counts):
+        """统计一个历史 commit，返回历史记录行
+
+        :param tree: {相对路径: blob}，来自 git ls-tree
+        :param read_blob: 按 blob 读取内容的函数
+        :param blob_counts: 跨 commit 复用的 {(blob, 文件名): LineCount}，未变化的文件只读取一次
+        """
+        files = {path for path in tree if self.tree.visible(path)}
+        module_stats = {}
+        for key, module in self.config["modules"].items():
+            _, module_files = self.module_members(module, set(), files)
+            counts = {}
+            for path in module_files:
+                blob_key = (tree[path], os.path.basename(path))
+                if blob_key not in blob_counts:
+                    blob_counts[blob_key] = line_counter.count_buffer(read_blob(tree[path]) or b"", path)
+                counts[path] = blob_counts[blob_key]
+            module_stats[key] = self.aggregate(set(), module_files, counts)
+        return self.history_rows(module_stats)
+
+    @telemetry.traced()
+    def backfill(self, since=None, max_commits=None):
+        """回放 git 历史（第一父提交链），补齐历史文件中缺少的 commit；不检出任何文件"""
+        if self.history is None:
+            return
+        commits = [(commit, timestamp) for commit, timestamp
+                   in stats_history.list_commits(self.project_root, since, max_commits)
+                   if not self.history.has_commit(commit)]
+        print(f"🕰️ 回填 {len(commits)} 个历史提交...")
+        blob_counts = {}
+        with stats_history.BlobReader(self.project_root) as reader:
+            for commit, timestamp in commits:
+                tree = stats_history.list_tree(self.project_root, commit)
+                self.history.append(timestamp, commit, self.commit_rows(tree, reader.read, blob_counts))
+        if commits:
+            self.history.save()
+            print(f"回填完成，共读取 {len(blob_counts)} 个不同的文件版本")
+
+    @telemetry.traced()
+    def save_json_stats(self, output_dir=SCRIPT_DIR):
         """保存JSON统计数据"""
         output_path = os.path.join(output_dir, "project-stats.json")
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -305,10 +482,31 @@ class ProjectStatsCollector:
             display_type = "无扩展名" if file_type == "no-extension" else file_type
             md += f"| {display_type} | {stats['files']} | {stats['lines']:,} |\n"
         md += "\n"
+
+        md += self.generate_trend_report()
         
         return md
 
-    def save_markdown_stats(self, output_dir="quantification"):
+    def generate_trend_report(self, days=stats_history.TREND_DAYS):
+        """近 days 天各模块行数趋势（至少两次统计才生成）"""
+        if self.history is None:
+            return ""
+        timestamps, series = self.history.series("lines", "module", days=days)
+        if len(timestamps) < 2:
+            return ""
+        first, last = (time.strftime("%Y-%m-%d", time.localtime(t)) for t in (timestamps[0], timestamps[-1]))
+        md = f"## 📈 近 {days} 天趋势\n\n"
+        md += f"共 {len(timestamps)} 次统计（{first} ~ {last}）\n\n"
+        md += "| 模块 | 行数趋势 | 当前行数 | 变化 |\n"
+        md += "|------|----------|----------|------|\n"
+        for key, module in self.stats["modules"].items():
+            values = series.get(key, [0] * len(timestamps))
+            md += f"| {module['name']} | {stats_history.sparkline(values)} | {values[-1]:,} | {values[-1] - values[0]:+,} |\n"
+        md += "\n"
+        return md
+
+    @telemetry.traced()
+    def save_markdown_stats(self, output_dir=SCRIPT_DIR):
         """保存Markdown统计表"""
         markdown = self.generate_markdown_report()
         output_path = os.path.join(output_dir, "project-stats.md")
@@ -316,16 +514,34 @@ class ProjectStatsCollector:
             f.write(markdown)
         print(f"Markdown统计表已保存到: {output_path}")
 
+    @telemetry.traced()
     def run(self):
         """运行统计"""
         print("🚀 开始项目量化统计...\n")
         self.collect_stats()
+        self.record_history()
         self.save_json_stats()
         self.save_markdown_stats()
         print("\n✅ 统计完成! 请查看生成的文件:")
-        print("  - quantification/project-stats.json (详细数据)")
-        print("  - quantification/project-stats.md (统计表格)")
+        print(f"  - {SCRIPT_DIR / 'project-stats.json'} (详细数据)")
+        print(f"  - {SCRIPT_DIR / 'project-stats.md'} (统计表格)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="项目量化统计")
+    parser.add_argument("--git", action="store_true", help="由 git 报告变化的文件（适合提交钩子）")
+    parser.add_argument("--no-cache", action="store_true", help="忽略缓存，重新统计全部文件")
+    parser.add_argument("--no-history", action="store_true", help="不追加统计历史")
+    parser.add_argument("--backfill", action="store_true", help="先回放 git 历史，补齐统计历史")
+    parser.add_argument("--since", help="回填的起始时间（git 日期格式，如 \"90 days ago\"）")
+    parser.add_argument("--max-commits", type=int, help="最多回填最近的多少个提交")
+    args = parser.parse_args(argv)
+
+    collector = ProjectStatsCollector(cache_path=None if args.no_cache else CACHE_PATH, git_mode=args.git,
+                                      history_path=None if args.no_history else HISTORY_PATH)
+    if args.backfill:
+        collector.backfill(args.since, args.max_commits)
+    collector.run()
+
 
 if __name__ == "__main__":
-    collector = ProjectStatsCollector()
-    collector.run() 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -8,26 +8,27 @@ README自动更新器 - 实时时间同步系统
 Features:
 - 🕒 实时时间记录（严格YYYY-MM-DD HH:MM:SS格式）
 - 📝 自动更新README.md最后时间戳
-- 🎵 30秒轻音乐提醒系统
-- 🔄 Git自动推送流程
+- 🔔 可选的非阻塞提醒（仅 macOS；notify=False 或 README_NOTIFY=0 关闭）
+- 🔄 后台防抖同步：更新入队后立即返回，由 git_sync 合并提交并重试推送
 - 📊 更新内容记录
+- 🔒 README按节打补丁，加锁后原子写回
 """
 
 import os
 import sys
-import time
-import subprocess
-import threading
-import platform
 from datetime import datetime
 from pathlib import Path
 import logging
-import re
+import git_sync
+import readme_sections
+import telemetry
+from launcher import sounds
 
 class ReadmeAutoUpdater:
-    def __init__(self):
+    def __init__(self, notify: bool = None):
         self.current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.os_type = platform.system()
+        # 未指定时由环境变量决定，服务器上可设置 README_NOTIFY=0
+        self.notify = os.environ.get('README_NOTIFY', '1') != '0' if notify is None else notify
         self.project_root = Path(__file__).parent.parent.parent  # 回到项目根目录
         self.readme_file = self.project_root / 'README.md'
         self.setup_logging()
@@ -42,7 +43,8 @@ class ReadmeAutoUpdater:
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(log_dir / 'readme_updater.log'),
-                logging.StreamHandler(sys.stdout)
+                logging.StreamHandler(sys.stdout),
+                telemetry.handler()
             ]
         )
         self.logger = logging.getLogger(__name__)
@@ -63,97 +65,59 @@ class ReadmeAutoUpdater:
         print(f"{colors.get(color, '')}{message}{colors['reset']}")
         self.logger.info(message)
 
-    def play_30s_update_music(self):
-        """播放30秒文档更新轻音乐"""
-        hour = datetime.now().hour
-        
-        self.print_color("🎵 播放30秒文档更新轻音乐提醒...", 'cyan')
-        
-        def play_music():
-            try:
-                if self.os_type == 'Darwin':  # macOS
-                    if hour >= 22 or hour <= 8:  # 深夜模式
-                        self.print_color("🌙 深夜模式：文档更新完成，播放轻柔提醒...", 'purple')
-                        for i in range(8):
-                            subprocess.run(['afplay', '/System/Library/Sounds/Tink.aiff'], 
-                                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                            time.sleep(1.2)
-                        self._speak("README文档已更新完成，深夜模式", 'Sin-ji', 120)
-                    else:
-                        self.print_color("🎶 播放30秒文档更新自然轻音乐...", 'green')
-                        for i in range(15):
-                            subprocess.run(['afplay', '/System/Library/Sounds/Purr.aiff'], 
-                                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                            time.sleep(1.8)
-                            if i == 5:
-                                self._speak("项目文档已成功更新", 'Sin-ji', 150)
-                            elif i == 10:
-                                self._speak("GitHub同步完成", 'Sin-ji', 140)
-            except Exception as e:
-                self.logger.warning(f"音乐播放失败: {e}")
-            
-            self.print_color("✅ 30秒文档更新轻音乐播放完成", 'green')
-        
-        threading.Thread(target=play_music, daemon=True).start()
-
-    def _speak(self, text: str, voice: str = None, rate: int = 140):
-        """语音提醒"""
+    def play_update_notification(self):
+        """文档更新提醒：在独立进程中播放，立即返回；非 macOS 或已关闭提醒时不做任何事"""
+        if not self.notify or not sounds.AVAILABLE:
+            return
+        if sounds.late_night():
+            sounds.notify('Tink', "README文档已更新完成，深夜模式", rate=120)
+        else:
+            sounds.notify('Purr', "项目文档已成功更新", rate=150)
+
+    def _edit_readme(self, method, *args):
+        """未传入编辑会话时，为单个更新打开一次加锁的编辑会话"""
         try:
-            if self.os_type == 'Darwin' and voice:
-                subprocess.run(['say', text, '--voice', voice, '--rate', str(rate)], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except Exception as e:
-            self.logger.warning(f"语音播放失败: {e}")
+            with readme_sections.edit(self.readme_file) as doc:
+                return method(*args, doc=doc)
+        except (OSError, ValueError) as e:
+            self.print_color(f"❌ 更新README.md失败: {e}", 'red')
+            return False
 
-    def update_readme_timestamp(self, update_description: str = "项目优化更新"):
+    def update_readme_timestamp(self, update_description: str = "项目优化更新", doc=None):
         """更新README.md文件的最后更新时间"""
         if not self.readme_file.exists():
             self.print_color("❌ README.md文件不存在", 'red')
             return False
-        
-        try:
-            # 读取README.md内容
-            content = self.readme_file.read_text(encoding='utf-8')
-            
-            # 查找最后更新时间的位置（使用正则表达式）
-            # 匹配格式：*最后更新: YYYY-MM-DD HH:MM:SS
-            time_pattern = r'\*最后更新:\s*\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}'
-            
-            new_timestamp = f"*最后更新: {self.current_time}"
-            
-            if re.search(time_pattern, content):
-                # 替换现有的时间戳
-                updated_content = re.sub(time_pattern, new_timestamp, content)
-                self.print_color("🔄 发现现有时间戳，正在更新...", 'yellow')
-            else:
-                # 如果没有找到，在文件末尾添加
-                updated_content = content.rstrip() + f"\n\n{new_timestamp}\n"
-                self.print_color("📝 在文件末尾添加时间戳...", 'yellow')
-            
-            # 写回文件
-            self.readme_file.write_text(updated_content, encoding='utf-8')
-            
-            self.print_color(f"✅ README.md时间戳已更新: {self.current_time}", 'green')
-            self.print_color(f"📋 更新描述: {update_description}", 'cyan')
-            
-            return True
-            
-        except Exception as e:
-            self.print_color(f"❌ 更新README.md失败: {e}", 'red')
-            return False
+        if doc is None:
+            return self._edit_readme(self.update_readme_timestamp, update_description)
+        
+        # 匹配格式：*最后更新: YYYY-MM-DD HH:MM:SS
+        time_pattern = r'\*最后更新:\s*\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}'
+        new_timestamp = f"*最后更新: {self.current_time}"
+        
+        matches = list(doc.finditer(time_pattern))
+        if matches:
+            # 只替换时间戳所在的字节区间
+            for match in matches:
+                doc.replace(match.start(), match.end(), new_timestamp)
+            self.print_color("🔄 发现现有时间戳，正在更新...", 'yellow')
+        else:
+            # 如果没有找到，在文件末尾添加
+            doc.append(("\n" if doc.data.endswith(b"\n") else "\n\n") + f"{new_timestamp}\n")
+            self.print_color("📝 在文件末尾添加时间戳...", 'yellow')
+        
+        self.print_color(f"✅ README.md时间戳已更新: {self.current_time}", 'green')
+        self.print_color(f"📋 更新描述: {update_description}", 'cyan')
+        return True
 
-    def add_development_log(self, module_name: str, optimization_details: str):
+    def add_development_log(self, module_name: str, optimization_details: str, doc=None):
         """添加开发进度日志到README.md"""
         if not self.readme_file.exists():
             return False
+        if doc is None:
+            return self._edit_readme(self.add_development_log, module_name, optimization_details)
         
-        try:
-            content = self.readme_file.read_text(encoding='utf-8')
-            
-            # 查找开发进度记录位置
-            log_pattern = r'### 3\.3 🔄 \*\*最新开发进度记录\*\*\s*\n\*\*最后更新\*\*: \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
-            
-            new_log_entry = f"""### 3.3 🔄 **最新开发进度记录**
+        new_log_entry = f"""### 3.3 🔄 **最新开发进度记录**
 
 **最后更新**: {self.current_time}
 
@@ -161,82 +125,66 @@ class ReadmeAutoUpdater:
   - ✅ **核心改进**：{optimization_details}
   - 🔧 **技术优化**：代码结构优化、性能提升、用户体验改进
   - 📊 **量化指标**：系统响应速度提升、代码质量改善
-  - 🎵 **30秒自然轻音乐提醒**：{module_name}优化任务完成，播放舒缓自然轻音乐庆祝！
-  - 🌐 **GitHub同步**：优化成果已推送到远程仓库
-  - 🔄 **下一步计划**：继续优化其他模块功能、提升整体系统性能"""
-            
-            if re.search(log_pattern, content):
-                # 替换现有的进度记录
-                updated_content = re.sub(
-                    r'### 3\.3 🔄 \*\*最新开发进度记录\*\*.*?(?=\n---|\n## |\Z)',
-                    new_log_entry,
-                    content,
-                    flags=re.DOTALL
-                )
+  - 📝 **README更新**：最后更新时间与本节进度记录已写入
+  - 🌐 **GitHub同步**：README.md 的提交已加入后台同步队列，防抖窗口结束后合并提交并推送
+  - 🔄 **下一步计划**：继续优化其他模块功能、提升整体系统性能
+
+"""
+        
+        # 通过标题索引定位开发进度记录一节
+        section = doc.section('3.3 🔄 **最新开发进度记录**', level=3)
+        if section is not None:
+            # 替换现有的进度记录（到下一个同级标题前的分隔线为止）
+            doc.replace_section(section, new_log_entry)
+        else:
+            # 在快速启动一节（及其前面的分隔线）之前插入新的进度记录
+            quick_start = doc.section('4. ⚡ 快速启动', level=2)
+            if quick_start is not None:
+                doc.insert_before(quick_start, new_log_entry)
             else:
-                # 在适当位置插入新的进度记录
-                insert_position = content.find("---\n\n## 4. ⚡ 快速启动")
-                if insert_position > -1:
-                    updated_content = content[:insert_position] + new_log_entry + "\n\n---\n\n" + content[insert_position+5:]
-                else:
-                    updated_content = content + "\n\n" + new_log_entry + "\n"
-            
-            self.readme_file.write_text(updated_content, encoding='utf-8')
-            
-            self.print_color(f"✅ 开发进度日志已添加: {module_name}", 'green')
-            return True
-            
-        except Exception as e:
-            self.print_color(f"❌ 添加开发日志失败: {e}", 'red')
-            return False
+                doc.append("\n\n" + new_log_entry)
+        
+        self.print_color(f"✅ 开发进度日志已添加: {module_name}", 'green')
+        return True
+
+    def _update_readme(self, module_name: str, optimization_details: str, doc=None):
+        return (self.update_readme_timestamp(f"{module_name}优化更新", doc=doc)
+                and self.add_development_log(module_name, optimization_details, doc=doc))
+
+    def git_commit_and_push(self, commit_message: str = None, paths=None):
+        """把提交加入后台同步队列后立即返回；防抖窗口内的多次更新合并为一次提交并推送
 
-    def git_commit_and_push(self, commit_message: str = None):
-        """Git提交和推送"""
+        :param paths: 需要提交的文件（相对项目根目录），默认只提交 README.md；
+            提交在后台稍后进行，不能把工作区中其他未完成的修改一并提交
+        """
         if not commit_message:
             commit_message = f"更新README，记录系统优化进度 - {self.current_time}"
+        if paths is None:
+            paths = [self.readme_file.relative_to(self.project_root).as_posix()]
         
-        try:
-            os.chdir(self.project_root)
-            
-            # Git add
-            self.print_color("📁 添加更改到Git...", 'blue')
-            subprocess.run(['git', 'add', '.'], check=True)
-            
-            # Git commit
-            self.print_color("💾 提交更改...", 'blue')
-            subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-            
-            # Git push
-            self.print_color("🚀 推送到远程仓库...", 'blue')
-            subprocess.run(['git', 'push'], check=True)
-            
-            self.print_color("✅ Git推送完成！", 'green')
-            return True
-            
-        except subprocess.CalledProcessError as e:
-            self.print_color(f"❌ Git操作失败: {e}", 'red')
+        if not git_sync.enqueue(self.project_root, commit_message, paths, notify=self.notify):
+            self.print_color("❌ 不在 Git 仓库中，跳过同步", 'red')
             return False
+        
+        self.print_color(f"📮 已加入后台同步队列（{git_sync.DEBOUNCE_SECONDS:.0f} 秒内的更新合并提交）", 'blue')
+        return True
 
+    @telemetry.traced()
     def update_with_optimization(self, module_name: str, optimization_details: str):
         """完整的优化更新流程"""
         self.print_color(f"🚀 开始{module_name}优化更新流程...", 'cyan')
         
-        # 播放30秒轻音乐
-        self.play_30s_update_music()
-        
-        # 更新README时间戳
-        if not self.update_readme_timestamp(f"{module_name}优化更新"):
+        # 时间戳与开发进度日志在同一次加锁编辑中完成：只读取、索引、写回一次
+        if not self._edit_readme(self._update_readme, module_name, optimization_details):
             return False
         
-        # 添加开发进度日志
-        if not self.add_development_log(module_name, optimization_details):
-            return False
-        
-        # Git提交推送
+        # 加入后台同步队列，推送在后台完成
         commit_msg = f"更新README，记录{module_name}优化进度 - {self.current_time}"
         if not self.git_commit_and_push(commit_msg):
             return False
         
+        self.play_update_notification()
+        
         self.print_color(f"🎉 {module_name}优化更新流程完成！", 'green')
         
         # 显示完成信息
@@ -259,8 +207,7 @@ class ReadmeAutoUpdater:
 ✅ 完成项目：
   📝 README.md时间戳已更新
   📋 开发进度日志已记录
-  🌐 GitHub仓库已同步
-  🎵 30秒轻音乐提醒已播放
+  📮 Git提交已加入后台同步队列（python3 git_sync.py 查看状态）
 
 🔄 下一步：可以继续进行其他模块的开发优化
 """
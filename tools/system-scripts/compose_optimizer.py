@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Docker Compose 配置优化器
+解析 tools/docker-configs/docker-compose*.yml，为 Postgres / Redis / 后端注入原生 healthcheck，
+把依赖改写为 depends_on: condition: service_healthy，补充内存上限，并按主机内存调整 Postgres 参数。
+服务都有 healthcheck 之后，`docker compose up -d --wait` 会等到全部健康再返回，启动脚本不再需要固定 sleep。
+
+修改以行区间补丁的形式应用：只改动涉及的键，注释与原有格式保持不变；
+默认只输出 unified diff，--write 时原子写回，写回前重新解析校验补丁结果。
+
+Features:
+- 💊 原生 healthcheck：pg_isready / redis-cli ping / 后端 /health
+- 🔗 depends_on 改写为 service_healthy，并从连接串推断后端对数据库的依赖
+- 📏 未声明 deploy 的服务补充内存上限
+- 🐘 shared_buffers / work_mem 等按主机内存（psutil）与容器上限计算
+- 🧾 unified diff 输出，--write 写回
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+import yaml
+from yaml.nodes import MappingNode, Node, SequenceNode
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+COMPOSE_DIR = PROJECT_ROOT / 'tools' / 'docker-configs'
+COMPOSE_GLOB = 'docker-compose*.yml'
+
+MiB = 1024 ** 2
+GiB = 1024 ** 3
+
+# 新注入的 healthcheck 间隔较短，`up --wait` 不必等满 30 秒才看到第一次检查结果
+HEALTHCHECK_TIMING = {'interval': '10s', 'timeout': '5s', 'retries': 5}
+START_PERIOD = {'postgres': '10s', 'redis': '5s', 'backend': '30s'}
+BACKEND_HEALTH_PATH = '/health'
+DEFAULT_BACKEND_PORT = 8000
+
+# 未声明 deploy 时补充的内存上限；Postgres 的上限按主机内存计算
+MEMORY_LIMITS = {'redis': 256 * MiB, 'backend': 1 * GiB, 'frontend': 512 * MiB}
+POSTGRES_HOST_SHARE = 4  # 最多使用主机内存的 1/4
+POSTGRES_MIN_MEMORY = 256 * MiB
+POSTGRES_MAX_MEMORY = 4 * GiB
+POSTGRES_MAX_CONNECTIONS = 100
+
+# 被依赖时可以推断为数据库依赖的角色（它们自身不依赖其他服务，推断不会产生循环）
+DATASTORE_ROLES = ('postgres', 'redis')
+# 元素不超过该数目的列表写成流式 ["a", "b"]，否则逐行列出
+FLOW_ITEMS = 6
+
+
+def parse_size(value) -> Optional[int]:
+    """Compose 的内存写法（512M、1g、1gb、字节数）→ 字节"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kmg]?)b?\s*', str(value), re.IGNORECASE)
+    if not match:
+        return None
+    scale = {'': 1, 'k': 1024, 'm': MiB, 'g': GiB}[match.group(2).lower()]
+    return int(float(match.group(1)) * scale)
+
+
+def compose_size(size: int) -> str:
+    return f'{size // GiB}G' if size % GiB == 0 else f'{size // MiB}M'
+
+
+def postgres_size(size: int) -> str:
+    return f'{size // GiB}GB' if size % GiB == 0 else f'{size // MiB}MB'
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(value, high))
+
+
+def postgres_memory(host_memory: int = None) -> int:
+    """Postgres 容器的内存预算：主机内存的 1/4，限制在 256M–4G，按 64M 取整"""
+    host_memory = host_memory or psutil.virtual_memory().total
+    budget = _clamp(host_memory // POSTGRES_HOST_SHARE, POSTGRES_MIN_MEMORY, POSTGRES_MAX_MEMORY)
+    return budget // (64 * MiB) * (64 * MiB)
+
+
+def postgres_settings(memory: int, max_connections: int = POSTGRES_MAX_CONNECTIONS) -> Dict[str, str]:
+    """按容器内存上限计算的 Postgres 参数"""
+    shared_buffers = memory // 4
+    work_mem = (memory - shared_buffers) // (max_connections * 2)
+    return {
+        'shared_buffers': postgres_size(shared_buffers // MiB * MiB),
+        'effective_cache_size': postgres_size(memory * 3 // 4 // MiB * MiB),
+        'work_mem': postgres_size(_clamp(work_mem // MiB * MiB, 4 * MiB, 64 * MiB)),
+        'maintenance_work_mem': postgres_size(_clamp(memory // 16 // MiB * MiB, 16 * MiB, 512 * MiB)),
+    }
+
+
+def service_role(name: str, config: dict) -> Optional[str]:
+    """postgres / redis 按镜像名或服务名识别，backend / frontend 按服务名识别"""
+    image = str(config.get('image', ''))
+    base = image.rsplit('/', 1)[-1].split('@', 1)[0].split(':', 1)[0]
+    for role in DATASTORE_ROLES:
+        if base == role or name == role:
+            return role
+    if name in ('backend', 'frontend'):
+        return name
+    return None
+
+
+def _environment(config: dict) -> Dict[str, str]:
+    env = config.get('environment') or {}
+    if isinstance(env, list):
+        return dict(item.split('=', 1) if '=' in item else (item, '') for item in map(str, env))
+    return {str(k): '' if v is None else str(v) for k, v in env.items()}
+
+
+def _container_port(config: dict) -> int:
+    port = _environment(config).get('PORT')
+    if port and port.isdigit():
+        return int(port)
+    for mapping in config.get('ports') or []:
+        target = str(mapping.get('target') if isinstance(mapping, dict) else mapping).rsplit(':', 1)[-1]
+        target = target.split('/', 1)[0]
+        if target.isdigit():
+            return int(target)
+    return DEFAULT_BACKEND_PORT
+
+
+def healthcheck_for(role: str, config: dict) -> Optional[dict]:
+    if role == 'postgres':
+        # $$ 在 compose 中转义为 $，由容器内的 shell 展开
+        test = ['CMD-SHELL', 'pg_isready -U $${POSTGRES_USER:-postgres} -d $${POSTGRES_DB:-postgres}']
+    elif role == 'redis':
+        command = config.get('command') or ''
+        command = ' '.join(map(str, command)) if isinstance(command, list) else str(command)
+        password = re.search(r'--requirepass\s+(\S+)', command)
+        test = (['CMD', 'redis-cli', '--no-auth-warning', '-a', password.group(1), 'ping'] if password
+                else ['CMD', 'redis-cli', 'ping'])
+    elif role == 'backend':
+        url = f'http://localhost:{_container_port(config)}{BACKEND_HEALTH_PATH}'
+        test = ['CMD-SHELL', f'wget -q --spider {url} || exit 1']
+    else:
+        return None
+    return {'test': test, **HEALTHCHECK_TIMING, 'start_period': START_PERIOD[role]}
+
+
+def _scalar(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    text = str(value)
+    # 不会被解析成其他类型的简单字符串保持不加引号（30s、512M、service_healthy）
+    if re.fullmatch(r'\w[\w.\-/]*', text) and yaml.safe_load(text) == text:
+        return text
+    return json.dumps(text, ensure_ascii=False)
+
+
+def render(key: str, value, indent: int, unit: int = 2) -> List[str]:
+    """把一个键值渲染为块格式的 YAML 行（与仓库内 compose 文件的写法一致）"""
+    pad = ' ' * indent
+    if isinstance(value, dict):
+        lines = [f'{pad}{key}:\n']
+        for child_key, child in value.items():
+            lines += render(child_key, child, indent + unit, unit)
+        return lines
+    if isinstance(value, list):
+        items = [json.dumps(str(item), ensure_ascii=False) for item in value]
+        if len(items) <= FLOW_ITEMS:
+            return [f"{pad}{key}: [{', '.join(items)}]\n"]
+        return [f'{pad}{key}:\n'] + [f'{pad}{" " * unit}- {item}\n' for item in items]
+    return [f'{pad}{key}: {_scalar(value)}\n']
+
+
+@dataclass
+class ComposeChange:
+    """一个 compose 文件的优化结果"""
+    path: Path
+    original: str
+    updated: str
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return self.original != self.updated
+
+    def diff(self) -> str:
+        try:
+            name = self.path.resolve().relative_to(PROJECT_ROOT).as_posix()
+        except ValueError:
+            name = self.path.name
+        return ''.join(difflib.unified_diff(self.original.splitlines(keepends=True),
+                                            self.updated.splitlines(keepends=True),
+                                            f'a/{name}', f'b/{name}'))
+
+    def write(self) -> bool:
+        """原子写回；没有变化时不写文件"""
+        if not self.changed:
+            return False
+        tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        try:
+            tmp_path.write_text(self.updated, encoding='utf-8')
+            os.chmod(tmp_path, os.stat(self.path).st_mode & 0o7777)
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return True
+
+
+class ComposeDocument:
+    """compose 文件及其 YAML 节点；节点的起止位置用来计算行补丁"""
+
+    def __init__(self, path: Path, text: str = None):
+        self.path = Path(path)
+        self.text = self.path.read_text(encoding='utf-8') if text is None else text
+        self.lines = self.text.splitlines(keepends=True)
+        self.data = yaml.safe_load(self.text) or {}
+        self.nodes: Dict[str, Tuple[Node, MappingNode]] = {}
+        root = yaml.compose(self.text)
+        services = self._child(root, 'services')
+        if isinstance(services, MappingNode):
+            for key, value in services.value:
+                if isinstance(value, MappingNode):
+                    self.nodes[key.value] = (key, value)
+        self.patches: List[Tuple[int, int, List[str]]] = []
+        self.expected: Dict[Tuple[str, str], object] = {}
+
+    @staticmethod
+    def _child(node: Optional[Node], name: str) -> Optional[Node]:
+        if not isinstance(node, MappingNode):
+            return None
+        return next((value for key, value in node.value if key.value == name), None)
+
+    def _filler(self, line: int) -> bool:
+        return line >= len(self.lines) or not self.lines[line].strip() or self.lines[line].lstrip().startswith('#')
+
+    def _end_line(self, node: Node) -> int:
+        """node 最后一行内容的下一行；块集合的结束位置是下一个记号，需要跳过其前的空行与注释"""
+        mark = node.end_mark
+        block = isinstance(node, (MappingNode, SequenceNode)) and not node.flow_style
+        # 文件末尾没有换行时，块集合也结束在最后一行的行中
+        if mark.column > 0 and (not block or mark.index >= len(self.text)):
+            return mark.line + 1
+        line = mark.line
+        while line > node.start_mark.line + 1 and self._filler(line - 1):
+            line -= 1
+        return line
+
+    def _layout(self, service: str) -> Tuple[int, int]:
+        """(服务内键的缩进, 每级缩进宽度)"""
+        key, value = self.nodes[service]
+        column = value.value[0][0].start_mark.column if value.value else key.start_mark.column + 2
+        return column, max(column - key.start_mark.column, 1)
+
+    def set_key(self, service: str, key: str, value):
+        """新增或整体替换服务下的一个键"""
+        _, node = self.nodes[service]
+        column, unit = self._layout(service)
+        lines = render(key, value, column, unit)
+        existing = next(((k, v) for k, v in node.value if k.value == key), None)
+        if existing:
+            self.patches.append((existing[0].start_mark.line, self._end_line(existing[1]), lines))
+        else:
+            end = self._end_line(node)
+            self.patches.append((end, end, lines))
+        self.expected[(service, key)] = value
+
+    def render_text(self) -> str:
+        lines = list(self.lines)
+        if lines and not lines[-1].endswith('\n') and any(start >= len(lines) for start, _, _ in self.patches):
+            lines[-1] += '\n'
+        previous = None
+        # 从后往前应用，前面的行号不受影响；同一位置的多个插入先应用后添加的，最终保持添加顺序
+        order = sorted(range(len(self.patches)), key=lambda i: (self.patches[i][:2], i), reverse=True)
+        for start, end, new_lines in (self.patches[i] for i in order):
+            if previous is not None and end > previous:
+                raise ValueError(f'{self.path.name}: 补丁区间重叠 ({start}-{end})')
+            lines[start:end] = new_lines
+            previous = start
+        text = ''.join(lines)
+        self._verify(text)
+        return text
+
+    def _verify(self, text: str):
+        """重新解析补丁结果，确认每个键都得到了预期的值、其余内容不变"""
+        data = yaml.safe_load(text) or {}
+        services = data.get('services') or {}
+        for (service, key), value in self.expected.items():
+            if (services.get(service) or {}).get(key) != value:
+                raise ValueError(f'{self.path.name}: {service}.{key} 补丁校验失败')
+        original = self.data.get('services') or {}
+        for service, config in original.items():
+            untouched = {k: v for k, v in (config or {}).items() if (service, k) not in self.expected}
+            if any((services.get(service) or {}).get(k) != v for k, v in untouched.items()):
+                raise ValueError(f'{self.path.name}: {service} 的其他配置被意外修改')
+
+
+def _referenced_services(config: dict, names) -> List[str]:
+    """连接串中以主机名出现的其他服务（如 @postgres:5432、redis://redis:6379）"""
+    values = ' '.join(_environment(config).values())
+    return [name for name in names if re.search(rf'[@/]{re.escape(name)}:\d', values)]
+
+
+def optimize(path, host_memory: int = None) -> ComposeChange:
+    """计算一个 compose 文件的优化补丁（不写文件）"""
+    document = ComposeDocument(path)
+    services = {name: config or {} for name, config in (document.data.get('services') or {}).items()
+                if name in document.nodes}
+    roles = {name: service_role(name, config) for name, config in services.items()}
+    notes = []
+
+    healthy = {name for name, config in services.items()
+               if config.get('healthcheck') and not (config['healthcheck'] or {}).get('disable')}
+    for name, config in services.items():
+        if 'healthcheck' in config:
+            continue
+        healthcheck = healthcheck_for(roles[name], config)
+        if healthcheck:
+            document.set_key(name, 'healthcheck', healthcheck)
+            healthy.add(name)
+            notes.append(f'{name}: 注入 healthcheck')
+
+    datastores = [name for name, role in roles.items() if role in DATASTORE_ROLES]
+    for name, config in services.items():
+        declared = config.get('depends_on') or {}
+        if isinstance(declared, list):
+            declared = {dep: None for dep in declared}
+        inferred = []
+        if config.get('network_mode') != 'host' and roles[name] not in DATASTORE_ROLES:
+            inferred = [dep for dep in _referenced_services(config, datastores) if dep not in declared]
+        depends_on = {}
+        for dep in list(declared) + inferred:
+            condition = (declared.get(dep) or {}).get('condition') if isinstance(declared.get(dep), dict) else None
+            if condition != 'service_completed_successfully':
+                condition = 'service_healthy' if dep in healthy else condition or 'service_started'
+            depends_on[dep] = {'condition': condition}
+        if depends_on and depends_on != config.get('depends_on'):
+            if inferred or any(value['condition'] != 'service_started' for value in depends_on.values()):
+                document.set_key(name, 'depends_on', depends_on)
+                conditions = ', '.join(f"{dep}({value['condition']})" for dep, value in depends_on.items())
+                notes.append(f'{name}: depends_on → {conditions}')
+
+    for name, config in services.items():
+        role = roles[name]
+        limit = parse_size((((config.get('deploy') or {}).get('resources') or {}).get('limits') or {}).get('memory', ''))
+        if role == 'postgres':
+            memory = limit or postgres_memory(host_memory)
+            if 'command' in config:
+                notes.append(f'{name}: 已有 command，未调整 Postgres 参数')
+            else:
+                command = ['postgres']
+                for setting, value in postgres_settings(memory).items():
+                    command += ['-c', f'{setting}={value}']
+                document.set_key(name, 'command', command)
+                notes.append(f'{name}: 按 {compose_size(memory)} 内存调整 Postgres 参数')
+        else:
+            memory = MEMORY_LIMITS.get(role)
+        if 'deploy' not in config and memory:
+            document.set_key(name, 'deploy', {'resources': {'limits': {'memory': compose_size(memory)}}})
+            notes.append(f'{name}: 内存上限 {compose_size(memory)}')
+
+    return ComposeChange(document.path, document.text, document.render_text(), notes)
+
+
+def compose_files(directory=COMPOSE_DIR) -> List[Path]:
+    return sorted(Path(directory).glob(COMPOSE_GLOB))
+
+
+def optimize_all(paths=None, host_memory: int = None, write: bool = False) -> List[ComposeChange]:
+    """优化多个文件；write=True 时写回有变化的文件。解析失败的文件跳过并记入 notes"""
+    changes = []
+    for path in paths or compose_files():
+        try:
+            change = optimize(path, host_memory)
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            text = ''
+            changes.append(ComposeChange(Path(path), text, text, [f'❌ 跳过: {e}']))
+            continue
+        if write:
+            change.write()
+        changes.append(change)
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Docker Compose 配置优化：healthcheck、depends_on、资源上限')
+    parser.add_argument('files', nargs='*', type=Path, help=f'compose 文件（默认 {COMPOSE_DIR}/{COMPOSE_GLOB}）')
+    parser.add_argument('--write', action='store_true', help='写回文件（默认只输出 diff）')
+    parser.add_argument('--memory', help='按指定的主机内存计算（如 16G），默认读取本机内存')
+    args = parser.parse_args(argv)
+
+    host_memory = parse_size(args.memory) if args.memory else None
+    if args.memory and not host_memory:
+        parser.error(f'无法识别的内存大小: {args.memory}')
+    changes = optimize_all(args.files or None, host_memory, write=args.write)
+    for change in changes:
+        sys.stdout.write(change.diff())
+    for change in changes:
+        print(f"\n📄 {change.path.name}: {'已写回' if args.write and change.changed else '有改动' if change.changed else '无需改动'}",
+              file=sys.stderr)
+        for note in change.notes:
+            print(f'   • {note}', file=sys.stderr)
+    if not args.write and any(change.changed for change in changes):
+        print('\n💡 确认无误后加 --write 写回，然后用 docker compose up -d --wait 启动', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,12 +14,11 @@ import subprocess
 import platform
 import threading
 import socket
-import urllib.request
-import urllib.error
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-import concurrent.futures
+from typing import List, Dict, Tuple
+from image_bundle import export_bundle, read_manifest
+from image_puller import ImagePuller, Mirror, local_images, rank_mirrors
 
 # ANSI颜色代码
 class Colors:
@@ -67,15 +66,27 @@ class DockerSmartFixer:
             "aliyun": {
                 "url": "https://registry.cn-hangzhou.aliyuncs.com",
                 "name": "阿里云镜像源",
-                "priority": 4
+                "priority": 4,
+                "prefix": "registry.cn-hangzhou.aliyuncs.com/google_containers"
             },
             "tencent": {
                 "url": "https://mirror.ccs.tencentyun.com",
                 "name": "腾讯云镜像源",
-                "priority": 5
+                "priority": 5,
+                "prefix": "ccr.ccs.tencentyun.com/mirrors"
             }
         }
         
+        # 本地 registry（如 docker run -p 5000:5000 registry:2），用于测试或内网部署
+        local_registry = os.environ.get("DOCKER_LOCAL_REGISTRY")
+        if local_registry:
+            self.mirror_sources["local"] = {
+                "url": f"http://{local_registry}",
+                "name": "本地Registry",
+                "priority": 0,
+                "prefix": local_registry
+            }
+        
         # 核心镜像列表
         self.core_images = {
             "node:18-alpine": "Node.js运行时",
@@ -85,7 +96,8 @@ class DockerSmartFixer:
         }
         
         self.available_mirrors = []
-        self.pull_progress = {}
+        self.mirror_probes = []
+        self.pull_workers = 3
         
     def _get_docker_config_path(self) -> Path:
         """获取Docker配置文件路径"""
@@ -228,49 +240,25 @@ class DockerSmartFixer:
             
         return True
     
+    def _mirror(self, mirror_id: str) -> Mirror:
+        info = self.mirror_sources[mirror_id]
+        return Mirror(mirror_id, info["url"], info["name"], info["priority"], info.get("prefix", ""))
+    
     def test_mirror_sources(self) -> List[str]:
-        """测试镜像源可用性"""
+        """并发测速镜像源，按延迟排序"""
         self.log_info("测试镜像源连接状态...")
-        available_mirrors = []
         
-        def test_mirror(mirror_id: str, mirror_info: Dict) -> Optional[str]:
-            """测试单个镜像源"""
-            try:
-                url = mirror_info["url"]
-                name = mirror_info["name"]
-                
-                # 尝试连接镜像源
-                req = urllib.request.Request(
-                    url,
-                    headers={'User-Agent': 'Docker-Client'}
-                )
-                
-                with urllib.request.urlopen(req, timeout=5) as response:
-                    if response.status == 200:
-                        self.log_success(f"✓ {name} ({url}) - 可用")
-                        return mirror_id
-            except:
-                self.log_warning(f"✗ {mirror_info['name']} ({mirror_info['url']}) - 不可用")
-            
-            return None
-        
-        # 并发测试所有镜像源
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_mirror = {
-                executor.submit(test_mirror, mirror_id, mirror_info): mirror_id 
-                for mirror_id, mirror_info in self.mirror_sources.items()
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_mirror):
-                result = future.result()
-                if result:
-                    available_mirrors.append(result)
-        
-        # 按优先级排序
-        available_mirrors.sort(key=lambda x: self.mirror_sources[x]["priority"])
+        self.mirror_probes = rank_mirrors(self._mirror(mirror_id) for mirror_id in self.mirror_sources)
+        for probe in self.mirror_probes:
+            mirror = probe.mirror
+            if probe.ok:
+                self.log_success(f"✓ {mirror.name} ({mirror.url}) - {probe.latency_ms:.0f} ms")
+            else:
+                self.log_warning(f"✗ {mirror.name} ({mirror.url}) - 不可用: {probe.detail}")
         
+        available_mirrors = [probe.mirror.mirror_id for probe in self.mirror_probes if probe.ok]
         if available_mirrors:
-            self.log_success(f"可用镜像源: {', '.join(available_mirrors)}")
+            self.log_success(f"可用镜像源（按延迟排序）: {', '.join(available_mirrors)}")
         else:
             self.log_error("所有镜像源都不可用")
             
@@ -289,6 +277,7 @@ class DockerSmartFixer:
         mirror_urls = [
             self.mirror_sources[mirror_id]["url"] 
             for mirror_id in self.available_mirrors
+            if mirror_id != "local"
         ]
         
         # 创建daemon.json配置
@@ -350,101 +339,64 @@ class DockerSmartFixer:
                 
         return False
     
+    def _image_puller(self) -> ImagePuller:
+        """按测速排名创建拉取器；每个镜像源带断路器"""
+        loggers = {"info": self.log_info, "success": self.log_success, "warning": self.log_warning}
+        return ImagePuller(
+            [self._mirror(mirror_id) for mirror_id in self.available_mirrors],
+            max_workers=self.pull_workers,
+            run=self.run_command,
+            on_event=lambda level, message: loggers[level](message)
+        )
+    
     def smart_pull_image(self, image: str, description: str) -> bool:
-        """智能拉取镜像"""
+        """智能拉取单个镜像"""
         self.log_info(f"拉取镜像: {image} ({description})")
-        
-        # 检查镜像是否已存在
-        success, stdout, _ = self.run_command(["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"])
-        if success and image in stdout:
-            self.log_warning(f"镜像已存在，跳过: {image}")
-            return True
-        
-        # 尝试从多个镜像源拉取
-        max_retries = 3
-        
-        for mirror_id in self.available_mirrors:
-            mirror_name = self.mirror_sources[mirror_id]["name"]
-            
-            for retry in range(max_retries):
-                self.log_info(f"尝试从 {mirror_name} 拉取 (尝试 {retry + 1}/{max_retries})...")
-                
-                # 构建拉取命令
-                if mirror_id in ["aliyun", "tencent"]:
-                    # 某些镜像源需要特殊处理
-                    if mirror_id == "aliyun":
-                        full_image = f"registry.cn-hangzhou.aliyuncs.com/google_containers/{image.split(':')[0]}:{image.split(':')[1]}"
-                    else:
-                        full_image = f"ccr.ccs.tencentyun.com/mirrors/{image.split(':')[0]}:{image.split(':')[1]}"
-                else:
-                    full_image = image
-                
-                # 拉取镜像
-                success, stdout, stderr = self.run_command(
-                    ["docker", "pull", full_image],
-                    timeout=120
-                )
-                
-                if success:
-                    # 如果使用了替代镜像名，重新标记
-                    if full_image != image:
-                        self.run_command(["docker", "tag", full_image, image])
-                        self.run_command(["docker", "rmi", full_image])
-                    
-                    self.log_success(f"✓ 成功从 {mirror_name} 拉取 {image}")
-                    return True
-                else:
-                    self.log_warning(f"从 {mirror_name} 拉取失败")
-                    if retry < max_retries - 1:
-                        time.sleep(5)
-        
-        self.log_error(f"✗ 从所有镜像源拉取 {image} 失败")
-        return False
+        return self._report_pull(self._image_puller().pull_all([image]))[image]
     
     def pull_all_images(self) -> Dict[str, bool]:
-        """拉取所有核心镜像"""
-        self.log_info(f"开始拉取 {len(self.core_images)} 个核心镜像...")
-        
-        results = {}
-        for image, description in self.core_images.items():
-            results[image] = self.smart_pull_image(image, description)
-            
-        return results
+        """并行拉取所有核心镜像（已存在的镜像只通过一次 docker images 判断）"""
+        self.log_info(f"开始拉取 {len(self.core_images)} 个核心镜像 (并发 {self.pull_workers})...")
+        return self._report_pull(self._image_puller().pull_all(self.core_images))
+    
+    def _report_pull(self, results) -> Dict[str, bool]:
+        for image, result in results.items():
+            if result.action == "failed":
+                self.log_error(f"✗ 从所有镜像源拉取 {image} 失败")
+                for attempt in result.attempts:
+                    self.log_debug(f"  {attempt}")
+            elif result.action == "pulled":
+                self.log_info(f"{image} 耗时 {result.duration:.1f}s")
+        return {image: result.ok for image, result in results.items()}
     
     def create_offline_backup(self):
-        """创建离线镜像备份"""
+        """创建离线镜像包（分层去重，可在同一目录增量更新）"""
         self.log_info("创建离线镜像备份...")
         
         # 检查是否有镜像可以备份
-        success, stdout, _ = self.run_command(["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"])
-        if not success or not stdout:
+        existing = local_images(self.run_command)
+        images = [image for image in self.core_images if image in existing]
+        if not images:
             self.log_warning("没有镜像可以备份")
             return
         
-        # 创建备份目录
-        backup_dir = Path("docker/offline-backup-" + datetime.now().strftime("%Y%m%d_%H%M%S"))
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 保存镜像
-        saved_count = 0
-        for image in self.core_images:
-            if image in stdout:
-                filename = image.replace("/", "_").replace(":", "_") + ".tar"
-                filepath = backup_dir / filename
-                
-                self.log_info(f"保存镜像: {image}")
-                success, _, _ = self.run_command(
-                    ["docker", "save", "-o", str(filepath), image],
-                    timeout=300
-                )
-                
-                if success:
-                    saved_count += 1
-                    self.log_success(f"✓ 已保存: {image}")
+        # 固定目录：已存在的层直接复用，只写入新增部分
+        bundle_dir = Path("docker/offline-bundle")
+        self.log_info(f"导出镜像: {', '.join(images)}")
+        try:
+            stats = export_bundle(images, bundle_dir)
+        except (OSError, RuntimeError) as e:
+            self.log_error(f"离线备份失败: {e}")
+            return
         
-        if saved_count > 0:
-            self.log_success(f"离线备份完成: {backup_dir}")
-            self.report_data["fixes_applied"].append(f"创建离线镜像备份 ({saved_count}个镜像)")
+        manifest = read_manifest(bundle_dir)
+        saved = manifest["raw_bytes"] - manifest["stored_bytes"]
+        self.log_success(f"离线备份完成: {bundle_dir}（共 {len(manifest['images'])} 个镜像）")
+        self.log_info(f"原始 {manifest['raw_bytes'] / 1024 / 1024:.1f} MB → 包内 "
+                      f"{manifest['stored_bytes'] / 1024 / 1024:.1f} MB，节省 {saved / 1024 / 1024:.1f} MB "
+                      f"(新增 {stats.new_blobs} 层，复用 {stats.reused_blobs} 层)")
+        self.log_info(f"离线导入: python image_bundle.py import {bundle_dir}")
+        self.report_data["fixes_applied"].append(f"创建离线镜像备份 ({len(images)}个镜像)")
     
     def generate_report(self):
         """生成修复报告"""
@@ -26,6 +26,8 @@ from datetime import datetime
 from pathlib import Path
 import logging
 import signal
+import readiness
+import telemetry
 import atexit
 
 class DockerSystemFixerV2:
@@ -55,7 +57,8 @@ class DockerSystemFixerV2:
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(log_dir / 'docker_fix_v2.log'),
-                logging.StreamHandler(sys.stdout)
+                logging.StreamHandler(sys.stdout),
+                telemetry.handler()
             ]
         )
         self.logger = logging.getLogger(__name__)
@@ -102,6 +105,7 @@ class DockerSystemFixerV2:
 """
         self.print_color(banner, 'cyan')
 
+    @telemetry.traced()
     def check_environment(self):
         """检查运行环境"""
         self.print_color("🔍 阶段1：环境检查与诊断...", 'blue')
@@ -151,6 +155,7 @@ class DockerSystemFixerV2:
         else:
             self.print_color("  🪟 Windows: 下载Docker Desktop from https://docker.com", 'yellow')
 
+    @telemetry.traced()
     def diagnose_docker_issues(self):
         """深度诊断Docker问题"""
         self.print_color("🔍 阶段2：深度问题诊断...", 'blue')
@@ -221,6 +226,7 @@ class DockerSystemFixerV2:
         
         return issues
 
+    @telemetry.traced()
     def fix_registry_configuration(self):
         """修复Docker镜像源配置"""
         self.print_color("🔧 阶段3：修复镜像源配置...", 'blue')
@@ -265,6 +271,7 @@ class DockerSystemFixerV2:
             self.print_color(f"❌ 配置更新失败: {e}", 'red')
             return False
 
+    @telemetry.traced()
     def restart_docker_service(self):
         """重启Docker服务"""
         self.print_color("🔄 阶段4：重启Docker服务...", 'blue')
@@ -321,6 +328,7 @@ class DockerSystemFixerV2:
         self.print_color("❌ Docker服务启动超时", 'red')
         return False
 
+    @telemetry.traced()
     def pull_required_images(self):
         """智能拉取必需镜像"""
         self.print_color("📦 阶段5：智能镜像拉取...", 'blue')
@@ -381,33 +389,48 @@ class DockerSystemFixerV2:
         else:
             return False
 
+    @telemetry.traced()
     def optimize_compose_files(self):
-        """优化Docker Compose配置"""
+        """优化Docker Compose配置：注入 healthcheck、service_healthy 依赖与资源上限"""
         self.print_color("📝 阶段6：优化Compose配置...", 'blue')
         
-        # 确保docker目录存在
-        self.docker_dir.mkdir(exist_ok=True)
+        try:
+            import compose_optimizer
+        except ImportError as e:
+            self.print_color(f"⚠️  缺少依赖，跳过Compose优化: {e}（pip install -r config/requirements.txt）", 'yellow')
+            return False
         
-        # 检查并应用优化配置
-        fixed_compose = self.docker_dir / 'docker-compose-fixed.yml'
         main_compose = self.project_root / 'docker-compose.yml'
+        template = compose_optimizer.COMPOSE_DIR / 'docker-compose.yml'
+        
+        if not main_compose.exists():
+            if not template.exists():
+                self.print_color("⚠️  未找到Compose配置文件", 'yellow')
+                return False
+            shutil.copy2(template, main_compose)
+            self.print_color(f"📋 已从模板创建配置: {template}", 'yellow')
+        
+        try:
+            change = compose_optimizer.optimize(main_compose)
+        except Exception as e:
+            self.print_color(f"❌ Compose配置优化失败: {e}", 'red')
+            return False
         
-        if fixed_compose.exists():
+        for note in change.notes:
+            self.print_color(f"  • {note}", 'cyan')
+        if change.changed:
             # 备份现有配置
-            if main_compose.exists():
-                backup_file = main_compose.with_suffix(f'.yml.backup.{int(time.time())}')
-                shutil.copy2(main_compose, backup_file)
-                self.print_color(f"📋 已备份现有配置: {backup_file}", 'yellow')
-            
-            # 应用优化配置
-            shutil.copy2(fixed_compose, main_compose)
-            self.print_color("✅ 已应用优化的Compose配置", 'green')
-            self.fix_results['compose_optimized'] = True
-            return True
+            backup_file = main_compose.with_suffix(f'.yml.backup.{int(time.time())}')
+            shutil.copy2(main_compose, backup_file)
+            self.print_color(f"📋 已备份现有配置: {backup_file}", 'yellow')
+            change.write()
+            self.print_color("✅ 已应用优化的Compose配置（可用 docker compose up -d --wait 启动）", 'green')
         else:
-            self.print_color("⚠️  未找到优化配置文件", 'yellow')
-            return False
+            self.print_color("✅ Compose配置已是最优，无需改动", 'green')
+        self.fix_results['compose_optimized'] = True
+        return True
 
+    @telemetry.traced()
     def test_system_startup(self):
         """测试系统启动"""
         self.print_color("🚀 阶段7：系统启动测试...", 'blue')
@@ -430,7 +453,10 @@ class DockerSystemFixerV2:
                 
                 # 等待服务就绪
                 self.print_color("⏳ 等待服务就绪...", 'yellow')
-                time.sleep(20)
+                readiness.wait_for_all({
+                    'postgres': lambda: readiness.probe_postgres('localhost', 5432, 'financial_user', 'financial_db'),
+                    'redis': lambda: readiness.probe_redis('localhost', 6379),
+                }, timeout=60)
                 
                 # 检查服务状态
                 status_result = subprocess.run(['docker-compose', 'ps'], 
@@ -458,6 +484,7 @@ class DockerSystemFixerV2:
             self.print_color(f"❌ 启动异常: {e}", 'red')
             return False
 
+    @telemetry.traced()
     def create_enhanced_scripts(self):
         """创建增强的启动脚本"""
         self.print_color("📜 阶段8：创建增强启动脚本...", 'blue')
@@ -488,9 +515,21 @@ docker-compose down --remove-orphans
 echo "🌐 启动所有服务..."
 docker-compose up -d
 
-# 等待服务启动
+# 等待服务启动（HTTP 响应即就绪，指数退避，最长 90 秒）
 echo "⏳ 等待服务启动完成..."
-sleep 30
+wait_for_url() {
+    local url=$1 deadline=$((SECONDS + 90)) delay=0.2
+    until curl -s -o /dev/null "$url"; do
+        if (( SECONDS >= deadline )); then
+            echo "⚠️  $url 尚未响应"
+            return 1
+        fi
+        sleep "$delay"
+        delay=$(awk "BEGIN { d = $delay * 2; print (d > 2 ? 2 : d) }")
+    done
+}
+wait_for_url http://localhost:8000
+wait_for_url http://localhost:3000
 
 # 检查服务状态
 echo "📊 检查服务状态..."
@@ -542,12 +581,16 @@ fi
 🚀 集成Docker状态检查、服务启动、音乐提醒的完整解决方案
 """
 
+import os
 import subprocess
-import time
 import sys
 import platform
 from pathlib import Path
 
+# 就绪探测复用 tools/system-scripts/readiness.py
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'tools' / 'system-scripts'))
+import readiness
+
 def check_docker():
     """检查Docker状态"""
     try:
@@ -585,7 +628,11 @@ def start_system():
                               check=True, capture_output=True, text=True)
         
         print("⏳ 等待服务启动完成...")
-        time.sleep(30)
+        urls = ['http://localhost:8000', 'http://localhost:3000']
+        ready = readiness.wait_for_all({url: (lambda url=url: readiness.probe_http(url)) for url in urls}, timeout=90)
+        for url, elapsed in ready.items():
+            if elapsed is None:
+                print(f"⚠️  {url} 尚未响应")
         
         # 检查状态
         print("📊 检查服务状态...")
@@ -685,6 +732,7 @@ if __name__ == "__main__":
         except Exception as e:
             self.logger.warning(f"语音播放失败: {e}")
 
+    @telemetry.traced()
     def generate_fix_report(self):
         """生成修复报告"""
         report_content = f"""
@@ -799,6 +847,7 @@ python deployment/scripts/start_local_system.py
         
         self.print_color(result_display, status_color)
 
+    @telemetry.traced()
     def run_complete_fix(self):
         """运行完整修复流程"""
         self.display_banner()
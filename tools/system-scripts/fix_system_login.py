@@ -13,11 +13,32 @@ import time
 import json
 from pathlib import Path
 import platform
+from launcher import services, tools
+from launcher.console import Console
+
+FIXED_COMPOSE_FILE = 'docker-compose-fixed.yml'
 
 class SystemLoginFixer:
     def __init__(self):
         self.os_type = platform.system()
         self.project_root = Path(__file__).parent
+        self.console = Console('login_fix', self.project_root / 'logs')
+        self._process_logs = None
+
+    @property
+    def process_logs(self):
+        """后端/前端输出写入 logs/<service>.log，而不是丢弃"""
+        if self._process_logs is None:
+            from process_logs import ProcessLogMultiplexer
+            self._process_logs = ProcessLogMultiplexer(self.project_root / 'logs')
+        return self._process_logs
+
+    def stop_processes(self, *processes):
+        """停止前后端进程并关闭日志"""
+        for process in processes:
+            process.terminate()
+        if self._process_logs is not None:
+            self._process_logs.close()
         
     def print_banner(self):
         """显示启动横幅"""
@@ -31,53 +52,25 @@ class SystemLoginFixer:
     def check_docker_status(self):
         """检查Docker状态"""
         print("🔍 检查 Docker 状态...")
-        try:
-            # 检查 Docker 是否运行
-            result = subprocess.run(['docker', 'ps'], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("❌ Docker 未运行，请先启动 Docker Desktop")
-                return False
-                
-            # 尝试拉取镜像
-            print("📥 尝试获取必需的 Docker 镜像...")
-            
-            # 使用国内镜像加速
-            images = [
-                ('postgres:14', 'registry.cn-hangzhou.aliyuncs.com/library/postgres:14'),
-                ('redis:7', 'registry.cn-hangzhou.aliyuncs.com/library/redis:7')
-            ]
-            
-            for original, mirror in images:
-                print(f"   拉取 {original}...")
-                # 先尝试官方镜像
-                pull_result = subprocess.run(
-                    ['docker', 'pull', original], 
-                    capture_output=True, text=True
-                )
-                
-                if pull_result.returncode != 0:
-                    print(f"   ⚠️  官方镜像失败，尝试国内镜像...")
-                    # 尝试国内镜像
-                    mirror_result = subprocess.run(
-                        ['docker', 'pull', mirror],
-                        capture_output=True, text=True
-                    )
-                    
-                    if mirror_result.returncode == 0:
-                        # 重新标记为原始名称
-                        subprocess.run(['docker', 'tag', mirror, original])
-                        print(f"   ✅ 成功获取 {original}")
-                    else:
-                        print(f"   ❌ 无法获取 {original}")
-                        return False
-                else:
-                    print(f"   ✅ 成功获取 {original}")
-                    
-            return True
-            
-        except FileNotFoundError:
+        if not tools.has_command('docker'):
             print("❌ Docker 未安装")
             return False
+        if not tools.docker_running():
+            print("❌ Docker 未运行，请先启动 Docker Desktop")
+            return False
+        
+        # 官方镜像失败时改用阿里云镜像并重新标记为原始名称；两个镜像并行拉取
+        print("📥 尝试获取必需的 Docker 镜像...")
+        from image_puller import ImagePuller, Mirror
+        puller = ImagePuller([
+            Mirror('default', '', 'Docker Hub'),
+            Mirror('aliyun', 'https://registry.cn-hangzhou.aliyuncs.com', '阿里云镜像',
+                   prefix='registry.cn-hangzhou.aliyuncs.com/library'),
+        ], on_event=lambda level, message: print(f"   {message}"))
+        results = puller.pull_all(['postgres:14', 'redis:7'])
+        for image, result in results.items():
+            print(f"   {'✅ 成功获取' if result.ok else '❌ 无法获取'} {image}")
+        return all(result.ok for result in results.values())
             
     def fix_docker_compose(self):
         """修复 docker-compose.yml"""
@@ -127,7 +120,7 @@ volumes:
 """
         
         # 保存修复的配置
-        with open(self.project_root / 'docker-compose-fixed.yml', 'w') as f:
+        with open(self.project_root / FIXED_COMPOSE_FILE, 'w') as f:
             f.write(docker_compose_content)
             
         print("✅ Docker Compose 配置已修复")
@@ -158,12 +151,8 @@ BCRYPT_ROUNDS=12
         print("🚀 启动数据库服务...")
         
         # 使用修复的配置启动
-        result = subprocess.run(
-            ['docker-compose', '-f', 'docker-compose-fixed.yml', 'up', '-d', 'postgres', 'redis'],
-            cwd=self.project_root,
-            capture_output=True,
-            text=True
-        )
+        result = tools.compose(['up', '-d', 'postgres', 'redis'], cwd=self.project_root,
+                               files=[FIXED_COMPOSE_FILE])
         
         if result.returncode != 0:
             print(f"❌ Docker 服务启动失败: {result.stderr}")
@@ -171,43 +160,36 @@ BCRYPT_ROUNDS=12
             
         # 等待服务就绪
         print("⏳ 等待数据库服务就绪...")
-        time.sleep(10)
-        
-        return True
+        ready = services.wait_databases(self.console, timeout=60)
+        return ready['PostgreSQL'] is not None
         
     def start_local_services(self):
         """启动本地服务"""
         print("🚀 启动应用服务...")
         
-        # 安装并启动后端
-        print("   📦 安装后端依赖...")
-        subprocess.run(['npm', 'install'], cwd=self.project_root / 'backend')
+        # 前后端依赖并行安装（未变化时跳过）
+        print("   📦 检查前后端依赖...")
+        services.install_packages(self.console, [self.project_root / 'backend', self.project_root / 'frontend'])
         
         print("   🔧 生成 Prisma 客户端...")
         subprocess.run(['npx', 'prisma', 'generate'], cwd=self.project_root / 'backend')
         
         print("   🚀 启动后端服务...")
-        backend_process = subprocess.Popen(
-            ['npm', 'run', 'dev'],
-            cwd=self.project_root / 'backend',
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        
-        # 安装并启动前端
-        print("   📦 安装前端依赖...")
-        subprocess.run(['npm', 'install'], cwd=self.project_root / 'frontend')
+        backend_process = self.process_logs.spawn('backend', ['npm', 'run', 'dev'],
+                                                  cwd=self.project_root / 'backend')
         
         print("   🚀 启动前端服务...")
-        frontend_process = subprocess.Popen(
-            ['npm', 'run', 'dev'],
-            cwd=self.project_root / 'frontend',
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        frontend_process = self.process_logs.spawn('frontend', ['npm', 'run', 'dev'],
+                                                   cwd=self.project_root / 'frontend')
         
         return backend_process, frontend_process
         
+    def wait_for_app_services(self, timeout: float = 90):
+        """等待前后端开始响应 HTTP，而不是固定等待"""
+        print("⏳ 等待服务启动...")
+        services.wait_http(self.console, {'后端服务': 'http://localhost:8000', '前端服务': 'http://localhost:3000'},
+                           timeout=timeout)
+        
     def run_pure_local_mode(self):
         """纯本地模式（不使用 Docker）"""
         print("\n🏠 使用纯本地模式启动...")
@@ -219,8 +201,7 @@ BCRYPT_ROUNDS=12
         backend_proc, frontend_proc = self.start_local_services()
         
         # 等待服务启动
-        print("⏳ 等待服务启动...")
-        time.sleep(15)
+        self.wait_for_app_services()
         
         self.show_success_info()
         
@@ -230,8 +211,7 @@ BCRYPT_ROUNDS=12
                 time.sleep(1)
         except KeyboardInterrupt:
             print("\n🛑 停止服务...")
-            backend_proc.terminate()
-            frontend_proc.terminate()
+            self.stop_processes(backend_proc, frontend_proc)
             
     def run_hybrid_mode(self):
         """混合模式（Docker 数据库 + 本地应用）"""
@@ -252,8 +232,7 @@ BCRYPT_ROUNDS=12
         backend_proc, frontend_proc = self.start_local_services()
         
         # 等待服务启动
-        print("⏳ 等待服务启动...")
-        time.sleep(15)
+        self.wait_for_app_services()
         
         self.show_success_info()
         
@@ -263,9 +242,8 @@ BCRYPT_ROUNDS=12
                 time.sleep(1)
         except KeyboardInterrupt:
             print("\n🛑 停止服务...")
-            backend_proc.terminate()
-            frontend_proc.terminate()
-            subprocess.run(['docker-compose', '-f', 'docker-compose-fixed.yml', 'down'])
+            self.stop_processes(backend_proc, frontend_proc)
+            tools.compose(['down'], cwd=self.project_root, files=[FIXED_COMPOSE_FILE], capture=False)
             
     def show_success_info(self):
         """显示成功信息"""
@@ -288,7 +266,7 @@ BCRYPT_ROUNDS=12
 
 💡 提示：
    - 这是演示环境，使用测试数据
-   - 如需查看日志，请查看终端输出
+   - 服务日志位于 logs/backend.log 与 logs/frontend.log
    - 确保端口 3000, 8000, 5432, 6379 未被占用
         """)
         
@@ -306,6 +284,10 @@ BCRYPT_ROUNDS=12
             print("   注意：纯本地模式使用内存数据库，数据不会持久化")
             self.run_pure_local_mode()
 
+def main():
+    SystemLoginFixer().run()
+    return 0
+
+
 if __name__ == "__main__":
-    fixer = SystemLoginFixer()
-    fixer.run() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
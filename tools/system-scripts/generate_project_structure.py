@@ -1,54 +1,205 @@
 #!/usr/bin/env python3
 """
-Generate PROJECT_STRUCTURE.md documenting the file tree structure of the repository.
-Excludes common unwanted directories to keep output concise.
+Generate PROJECT_STRUCTURE.md documenting the file tree structure of the repository,
+plus PROJECT_STRUCTURE.json with every level, file sizes and per-directory totals.
+Excludes common unwanted directories and anything matched by .gitignore to keep output concise.
+
+Both outputs are written from a single streamed depth-first walk. Raw directory listings
+are cached by directory mtime, so reruns only re-scan directories whose entries changed
+(a file edited in place keeps its cached size until its directory changes; use --no-cache).
 """
+import argparse
+import json
 import os
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from path_matcher import PathMatcher, TreeMatcher
 
+# Directory names excluded at any depth; .gitignore rules are applied as well
 EXCLUDE_DIRS = {'.git', 'venv', 'node_modules', '__pycache__', '.cursor', 'logs'}
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DOC_PATH = PROJECT_ROOT / 'docs' / 'PROJECT_STRUCTURE.md'
+JSON_PATH = DOC_PATH.with_suffix('.json')
+CACHE_PATH = Path(__file__).resolve().parent / '.cache' / 'project-structure.json'
+CACHE_VERSION = 1
+
+MAX_DEPTH = 2  # levels to display in the Markdown tree; the JSON tree is never cut
+
+class Entry(NamedTuple):
+    depth: int
+    name: str
+    is_dir: bool
+    size: int
+    last: bool  # last entry of its directory
+
+class ListingCache:
+    """Unfiltered directory listings keyed by relative path, reused while the directory mtime is unchanged
+
+    Exclusion rules are applied after lookup, so editing .gitignore or EXCLUDE_DIRS needs no rescan.
+    """
+
+    def __init__(self, path: Path, reuse: bool = True):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self.seen = set()
+        self.hits = self.misses = 0
+        if reuse:
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                if data.get('version') == CACHE_VERSION:
+                    self.entries = data['entries']
+            except (OSError, ValueError):
+                pass
+
+    def listdir(self, root: Path, rel_dir: str) -> Tuple[List[str], List[List]]:
+        """(subdirectory names, [file name, size] pairs) of rel_dir"""
+        self.seen.add(rel_dir)
+        full_path = root / rel_dir
+        mtime = os.stat(full_path).st_mtime_ns
+        cached = self.entries.get(rel_dir)
+        if cached is not None and cached['mtime'] == mtime:
+            self.hits += 1
+            return cached['dirs'], cached['files']
+        self.misses += 1
+        dirs, files = [], []
+        with os.scandir(full_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                    continue
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+                files.append([entry.name, size])
+        self.entries[rel_dir] = {'mtime': mtime, 'dirs': dirs, 'files': files}
+        return dirs, files
+
+    def save(self):
+        if not self.misses and self.seen == set(self.entries):
+            return
+        entries = {rel_dir: self.entries[rel_dir] for rel_dir in sorted(self.seen)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'entries': entries}, separators=(',', ':')),
+                            encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+def _walk(tree: TreeMatcher, listings: ListingCache, rel_dir: str, depth: int):
+    def rel(name):
+        return f'{rel_dir}/{name}' if rel_dir else name
+
+    try:
+        dirs, files = listings.listdir(tree.root, rel_dir)
+    except OSError:
+        dirs, files = [], []
+    dirs = sorted((d for d in dirs if not tree.excluded(rel(d), is_dir=True)), key=str.lower)
+    files = sorted((f for f in files if not tree.excluded(rel(f[0]))), key=lambda f: f[0].lower())
+    total = len(dirs) + len(files)
+    totals = {'files': len(files), 'dirs': len(dirs), 'size': sum(size for _, size in files)}
+    for idx, name in enumerate(dirs):
+        yield 'dir', Entry(depth, name, True, 0, idx == total - 1)
+        child = yield from _walk(tree, listings, rel(name), depth + 1)
+        yield 'end', child
+        for key in totals:
+            totals[key] += child[key]
+    for idx, (name, size) in enumerate(files, len(dirs)):
+        yield 'file', Entry(depth, name, False, size, idx == total - 1)
+    return totals
+
+def walk(tree: TreeMatcher, listings: ListingCache) -> Iterator[tuple]:
+    """Depth-first stream of ('dir' | 'file', Entry) events; every directory (and finally the root)
+    is closed by an ('end', totals) event carrying its recursive file/dir counts and size"""
+    totals = yield from _walk(tree, listings, '', 0)
+    yield 'end', totals
+
+class MarkdownTree:
+    """Box-drawing tree lines, cut at max_depth (None for unlimited)"""
+
+    def __init__(self, max_depth: Optional[int] = MAX_DEPTH):
+        self.max_depth = max_depth
+        self.lines: List[str] = []
+        self.lasts: List[bool] = []  # whether each open ancestor is the last entry of its parent
+
+    def feed(self, kind: str, item):
+        if kind == 'end':
+            if self.lasts:
+                self.lasts.pop()
+            return
+        if self.max_depth is None or item.depth <= self.max_depth:
+            prefix = ''.join('    ' if last else '│   ' for last in self.lasts)
+            connector = '└── ' if item.last else '├── '
+            self.lines.append(f"{prefix}{connector}{item.name}{'/' if item.is_dir else ''}")
+        if item.is_dir:
+            self.lasts.append(item.last)
+
+class JsonTree:
+    """Writes the nested JSON tree as events arrive
+
+    A directory's totals come after its children, so nothing but the open-directory stack is kept in memory.
+    """
+
+    def __init__(self, f, root_name: str):
+        self.f = f
+        self.first = [True]
+        f.write('{"name": %s, "type": "dir", "children": [' % json.dumps(root_name, ensure_ascii=False))
+
+    def _separator(self):
+        self.f.write('\n' if self.first[-1] else ',\n')
+        self.first[-1] = False
+
+    def feed(self, kind: str, item):
+        if kind == 'dir':
+            self._separator()
+            self.f.write('{"name": %s, "type": "dir", "children": [' % json.dumps(item.name, ensure_ascii=False))
+            self.first.append(True)
+        elif kind == 'file':
+            self._separator()
+            self.f.write(json.dumps({'name': item.name, 'type': 'file', 'size': item.size}, ensure_ascii=False))
+        else:
+            self.first.pop()
+            self.f.write('], "files": %d, "dirs": %d, "size": %d}' % (item['files'], item['dirs'], item['size']))
+
+def generate_structure(max_depth: Optional[int] = MAX_DEPTH, use_cache: bool = True):
+    tree = TreeMatcher(PROJECT_ROOT, PathMatcher(patterns=[f'{name}/' for name in sorted(EXCLUDE_DIRS)]))
+    listings = ListingCache(CACHE_PATH, reuse=use_cache)
+    markdown = MarkdownTree(max_depth)
+    JSON_PATH.parent.mkdir(exist_ok=True)
+    # Streamed into the cache directory (outside the walked tree) and moved into place at the end
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_json = CACHE_PATH.with_name(f'{JSON_PATH.name}.{os.getpid()}.tmp')
+    with open(tmp_json, 'w', encoding='utf-8') as f:
+        json_tree = JsonTree(f, PROJECT_ROOT.name)
+        for kind, item in walk(tree, listings):
+            markdown.feed(kind, item)
+            json_tree.feed(kind, item)
+        f.write('\n')
+    os.replace(tmp_json, JSON_PATH)
+    listings.save()
 
-MAX_DEPTH = 2  # levels to display
-
-def should_exclude(path: Path) -> bool:
-    # Exclude directories in EXCLUDE_DIRS at any depth
-    parts = set(path.parts)
-    return bool(parts & EXCLUDE_DIRS)
-
-def build_tree(current: Path, prefix: str = '', depth: int = 0):
-    if depth > MAX_DEPTH:
-        return []
-    lines = []
-    entries = sorted([p for p in current.iterdir() if not should_exclude(p)], key=lambda p: (p.is_file(), p.name.lower()))
-    total = len(entries)
-    for idx, entry in enumerate(entries):
-        connector = '└── ' if idx == total - 1 else '├── '
-        line = f"{prefix}{connector}{entry.name}{'/' if entry.is_dir() else ''}"
-        lines.append(line)
-        if entry.is_dir():
-            extension = '    ' if idx == total - 1 else '│   '
-            lines.extend(build_tree(entry, prefix + extension, depth + 1))
-    return lines
-
-def generate_structure():
-    tree_lines = build_tree(PROJECT_ROOT)
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     header = [
         '# 📁 项目文件结构',
         '',
         f'*最后生成时间*: {now}',
         '',
-        '代码仓库目录层级 (深度 ≤ 2)',
+        f'代码仓库目录层级 (深度 ≤ {max_depth})' if max_depth is not None else '代码仓库目录层级 (完整)',
         '```',
     ]
-    footer = ['```', '', '---', '', '*本文件由 scripts/generate_project_structure.py 自动生成*']
-    DOC_PATH.parent.mkdir(exist_ok=True)
-    DOC_PATH.write_text('\n'.join(header + tree_lines + footer), encoding='utf-8')
+    footer = ['```', '', f'完整目录树（含文件大小与各目录汇总）见 {JSON_PATH.name}', '', '---', '',
+              '*本文件由 scripts/generate_project_structure.py 自动生成*']
+    DOC_PATH.write_text('\n'.join(header + markdown.lines + footer), encoding='utf-8')
     print(f"✅ PROJECT_STRUCTURE.md generated at {DOC_PATH}")
+    print(f"✅ PROJECT_STRUCTURE.json generated at {JSON_PATH}")
+    print(f"   {listings.misses} directories scanned, {listings.hits} reused from cache")
 
 if __name__ == '__main__':
-    generate_structure() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=MAX_DEPTH,
+                        help=f'levels shown in the Markdown tree (default {MAX_DEPTH}, negative for unlimited)')
+    parser.add_argument('--no-cache', action='store_true', help='rescan every directory')
+    args = parser.parse_args()
+    generate_structure(None if args.depth < 0 else args.depth, use_cache=not args.no_cache)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台 Git 同步队列
+README / 统计数据更新后只需入队即可返回；后台 worker 等到一段时间内没有新的更新，
+再把期间的全部更新合并为一次提交并推送，推送失败时按指数退避重试。
+
+队列与 worker 日志位于 <git 目录>/readme-sync/，不会出现在工作区中。
+
+Features:
+- ⏱️ 防抖合并：DEBOUNCE_SECONDS 内的多次更新合并为一次提交
+- 🧵 后台进程：入队后立即返回，调用脚本可以直接退出
+- 🔁 推送重试：失败后按 2s、4s、8s… 退避；提交失败（如 index.lock 被占用）的更新退避后重新入队
+- 🔒 单实例 worker：队列读写在文件锁内完成，worker 退出前再次检查队列
+- 🔔 可选的完成提醒（仅 macOS，其他平台为空操作）
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from readme_sections import file_lock
+
+DEBOUNCE_SECONDS = 10.0
+PUSH_RETRIES = 4
+COMMIT_RETRIES = 4
+BACKOFF_SECONDS = 2.0
+
+QUEUE_NAME = 'queue.jsonl'
+WORKER_LOCK_NAME = 'worker.lock'
+LOG_NAME = 'worker.log'
+
+
+def sync_dir(root: Path) -> Optional[Path]:
+    """<git 目录>/readme-sync；root 不在 git 仓库中时返回 None"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--absolute-git-dir'], cwd=root,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    path = Path(result.stdout.strip()) / 'readme-sync'
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _worker_running(directory: Path) -> bool:
+    """worker 在整个生命周期内持有 worker.lock；能立即拿到锁说明没有 worker 在运行"""
+    try:
+        with file_lock(directory / WORKER_LOCK_NAME, timeout=0):
+            return False
+    except TimeoutError:
+        return True
+
+
+def _read_queue(directory: Path) -> List[dict]:
+    try:
+        lines = (directory / QUEUE_NAME).read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return []
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+def enqueue(root, message: str, paths: Iterable[str] = ('.',), push: bool = True,
+            notify: bool = False, debounce: float = DEBOUNCE_SECONDS) -> bool:
+    """登记一次待提交的更新并确保后台 worker 在运行；立即返回
+
+    :param paths: 需要提交的路径（相对 root），默认整个工作区
+    :param notify: 推送完成后播报提醒（仅 macOS）
+    """
+    root = Path(root).resolve()
+    directory = sync_dir(root)
+    if directory is None:
+        return False
+    entry = {'time': time.time(), 'message': message, 'paths': list(paths), 'push': push, 'notify': notify}
+    with file_lock(directory / QUEUE_NAME):
+        with open(directory / QUEUE_NAME, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        if not _worker_running(directory):
+            _spawn_worker(root, directory, debounce)
+    return True
+
+
+def _spawn_worker(root: Path, directory: Path, debounce: float):
+    command = [sys.executable, str(Path(__file__).resolve()), '--worker', '--debounce', str(debounce), str(root)]
+    options = {}
+    if os.name == 'nt':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+    with open(directory / LOG_NAME, 'a', encoding='utf-8') as log:
+        subprocess.Popen(command, cwd=root, stdin=subprocess.DEVNULL, stdout=log, stderr=log, **options)
+
+
+def _log(message: str):
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+
+
+def _git(root: Path, *args) -> subprocess.CompletedProcess:
+    return subprocess.run(['git', *args], cwd=root, capture_output=True, text=True)
+
+
+def commit_message(entries: List[dict]) -> str:
+    messages = list(dict.fromkeys(entry['message'] for entry in entries))
+    if len(messages) == 1:
+        return messages[0]
+    return f"{messages[-1]}（合并 {len(messages)} 次更新）\n\n" + '\n'.join(f'- {m}' for m in messages)
+
+
+def push_with_retry(root: Path, retries: int = PUSH_RETRIES, backoff: float = BACKOFF_SECONDS) -> bool:
+    for attempt in range(retries + 1):
+        result = _git(root, 'push')
+        if result.returncode == 0:
+            return True
+        if attempt < retries:
+            delay = backoff * 2 ** attempt
+            _log(f"⚠️ 推送失败，{delay:.0f} 秒后重试 ({attempt + 1}/{retries}): {result.stderr.strip()}")
+            time.sleep(delay)
+    _log(f"❌ 推送失败，已放弃: {result.stderr.strip()}")
+    return False
+
+
+def commit(root: Path, entries: List[dict]) -> Optional[bool]:
+    """把一批更新合并为一次提交；返回 True 已提交、None 没有变化、False 提交失败"""
+    paths = sorted({path for entry in entries for path in entry['paths']})
+    result = _git(root, 'add', '--', *paths)
+    if result.returncode != 0:
+        _log(f"❌ 暂存失败: {result.stderr.strip()}")
+        return False
+    if _git(root, 'diff', '--cached', '--quiet', '--', *paths).returncode == 0:
+        _log(f"ℹ️ {len(entries)} 次更新没有需要提交的变化")
+        return None
+    result = _git(root, 'commit', '-m', commit_message(entries), '--', *paths)
+    if result.returncode != 0:
+        _log(f"❌ 提交失败: {result.stderr.strip() or result.stdout.strip()}")
+        return False
+    _log(f"✅ 已提交 {len(entries)} 次更新: {', '.join(paths)}")
+    return True
+
+
+def push(root: Path, entries: List[dict]) -> bool:
+    """提交之后按批次中的设置推送并提醒"""
+    if not any(entry.get('push') for entry in entries):
+        return True
+    pushed = push_with_retry(root)
+    if pushed:
+        _log("🚀 推送完成")
+        if any(entry.get('notify') for entry in entries):
+            from launcher import sounds
+            sounds.notify(text='GitHub同步完成')
+    return pushed
+
+
+def run_worker(root, debounce: float = DEBOUNCE_SECONDS):
+    """等待队列静默 debounce 秒后处理一批，直到队列为空；同一时间只运行一个"""
+    root = Path(root).resolve()
+    directory = sync_dir(root)
+    if directory is None:
+        return
+    while True:
+        try:
+            with file_lock(directory / WORKER_LOCK_NAME, timeout=0):
+                _drain(root, directory, debounce)
+        except TimeoutError:
+            return
+        # 队列清空到释放锁之间入队的条目不会触发新的 worker，由本进程继续处理
+        if not _read_queue(directory):
+            return
+
+
+def _drain(root: Path, directory: Path, debounce: float):
+    queue_path = directory / QUEUE_NAME
+    while True:
+        entries = _read_queue(directory)
+        if entries:
+            wait = max(entry['time'] for entry in entries) + debounce - time.time()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+        with file_lock(queue_path):
+            # 在队列锁内取走全部条目，与入队互斥
+            entries = _read_queue(directory)
+            if not entries:
+                return
+            queue_path.write_text('', encoding='utf-8')
+        committed = commit(root, entries)
+        if committed is False:
+            _requeue(directory, entries)
+        elif committed:
+            push(root, entries)
+
+
+def _requeue(directory: Path, entries: List[dict]):
+    """提交失败的条目退避后重新入队，超过 COMMIT_RETRIES 次后放弃"""
+    retry = []
+    for entry in entries:
+        attempts = entry.get('attempts', 0) + 1
+        if attempts > COMMIT_RETRIES:
+            _log(f"❌ 已放弃: {entry['message']}")
+            continue
+        # 把时间推后，_drain 等到退避结束后再处理
+        retry.append(dict(entry, attempts=attempts, time=time.time() + BACKOFF_SECONDS * 2 ** attempts))
+    if not retry:
+        return
+    _log(f"🔁 {len(retry)} 次更新重新入队，稍后重试提交")
+    with file_lock(directory / QUEUE_NAME):
+        with open(directory / QUEUE_NAME, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in retry)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='后台 Git 同步队列')
+    parser.add_argument('root', nargs='?', default='.', help='仓库目录')
+    parser.add_argument('--worker', action='store_true', help='以后台 worker 身份处理队列')
+    parser.add_argument('--flush', action='store_true', help='不等待防抖窗口，立即处理队列')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS, help='防抖窗口（秒）')
+    args = parser.parse_args(argv)
+    if args.worker or args.flush:
+        run_worker(args.root, 0 if args.flush else args.debounce)
+        return 0
+    directory = sync_dir(Path(args.root).resolve())
+    if directory is None:
+        print('❌ 不在 git 仓库中')
+        return 1
+    print(f"📮 待同步: {len(_read_queue(directory))} 次更新，worker {'运行中' if _worker_running(directory) else '未运行'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
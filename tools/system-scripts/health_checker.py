@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并发健康检查器（asyncio）
+
+所有服务在同一个事件循环中并发探测，总耗时约等于最慢的一个服务，
+而不是各服务超时之和；连接在多轮检查之间复用，适合监控模式反复调用。
+
+Features:
+- ⚡ asyncio 并发探测，单个服务超时不拖慢其他服务
+- 🔁 HTTP/1.1 keep-alive 与 Redis 长连接跨轮次复用
+- 🐘 原生 PostgreSQL 握手 / 🧰 Redis PING，无需 docker-compose exec
+- ⏱️ 每个服务返回 up/down 与延迟（毫秒）
+"""
+
+import asyncio
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+# 单个服务的探测超时（秒）
+DEFAULT_TIMEOUT = 3.0
+
+_PG_PROTOCOL = 196608
+_PG_NOT_READY_CODES = {'57P03'}
+_PG_TERMINATE = b'X' + struct.pack('!i', 4)
+
+
+@dataclass
+class ServiceCheck:
+    """一个待检查的服务；kind 为 http / postgres / redis / tcp"""
+    name: str
+    kind: str
+    host: str = 'localhost'
+    port: int = 0
+    url: str = ''
+    user: str = 'postgres'
+    database: str = 'postgres'
+
+    @classmethod
+    def http(cls, name: str, url: str) -> 'ServiceCheck':
+        parts = urlsplit(url)
+        return cls(name, 'http', parts.hostname or 'localhost', parts.port or 80, url)
+
+
+@dataclass
+class HealthResult:
+    """单个服务的检查结果"""
+    name: str
+    healthy: bool
+    latency_ms: float
+    detail: str = ''
+
+
+class AsyncHealthChecker:
+    """并发健康检查器，持有自己的事件循环和连接池
+
+    同步调用 check() 即可；同一实例反复调用时复用已建立的连接。
+    """
+
+    def __init__(self, checks: List[ServiceCheck], timeout: float = DEFAULT_TIMEOUT):
+        self.checks = checks
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        # (host, port) -> (reader, writer)
+        self._http_pool: Dict[tuple, tuple] = {}
+        self._redis_pool: Dict[tuple, tuple] = {}
+        # 同一 (host, port) 的池化连接一次只供一个检查收发
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+
+    # 对外接口 -------------------------------------------------------------
+
+    def check(self) -> Dict[str, HealthResult]:
+        """并发检查所有服务，返回 {服务名: HealthResult}"""
+        return self._loop.run_until_complete(self.check_async())
+
+    async def check_async(self) -> Dict[str, HealthResult]:
+        results = await asyncio.gather(*(self._run(check) for check in self.checks))
+        return {result.name: result for result in results}
+
+    def close(self):
+        """关闭池中连接和事件循环"""
+        for pool in (self._http_pool, self._redis_pool):
+            for _, writer in pool.values():
+                writer.close()
+            pool.clear()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # 调度 -----------------------------------------------------------------
+
+    async def _run(self, check: ServiceCheck) -> HealthResult:
+        probe = {
+            'http': self._probe_http,
+            'postgres': self._probe_postgres,
+            'redis': self._probe_redis,
+            'tcp': self._probe_tcp,
+        }[check.kind]
+        started = time.perf_counter()
+        try:
+            healthy, detail = await asyncio.wait_for(probe(check), self.timeout)
+        except asyncio.TimeoutError:
+            healthy, detail = False, '超时'
+        except (OSError, asyncio.IncompleteReadError, ValueError, RuntimeError) as e:
+            healthy, detail = False, str(e) or e.__class__.__name__
+        latency = (time.perf_counter() - started) * 1000
+        return HealthResult(check.name, healthy, latency, detail)
+
+    def _lock(self, check: ServiceCheck) -> asyncio.Lock:
+        return self._locks.setdefault((check.host, check.port), asyncio.Lock())
+
+    def _discard(self, check: ServiceCheck):
+        """丢弃可能处于半读状态的池化连接（调用方持有该连接的锁）"""
+        for pool in (self._http_pool, self._redis_pool):
+            entry = pool.pop((check.host, check.port), None)
+            if entry:
+                entry[1].close()
+
+    # 探测实现 -------------------------------------------------------------
+
+    async def _probe_tcp(self, check: ServiceCheck):
+        _, writer = await asyncio.open_connection(check.host, check.port)
+        writer.close()
+        return True, 'connected'
+
+    async def _probe_http(self, check: ServiceCheck):
+        key = (check.host, check.port)
+        parts = urlsplit(check.url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        request = (f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+                   f'Connection: keep-alive\r\nAccept: */*\r\n\r\n').encode('ascii')
+
+        # 池化连接可能已被服务端关闭，失败时用新连接重试一次
+        async with self._lock(check):
+            for attempt in range(2):
+                reused = key in self._http_pool
+                if not reused:
+                    self._http_pool[key] = await asyncio.open_connection(check.host, check.port)
+                reader, writer = self._http_pool[key]
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status, keep_alive = await self._read_http_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError, RuntimeError):
+                    self._discard(check)
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except asyncio.CancelledError:
+                    # 超时取消时响应可能只读了一半
+                    self._discard(check)
+                    raise
+                if not keep_alive:
+                    self._discard(check)
+                return status < 500, f'HTTP {status}'
+
+    @staticmethod
+    async def _read_http_response(reader: asyncio.StreamReader):
+        """读取完整响应（含正文，以便连接可复用），返回 (状态码, 是否可复用)"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[0].startswith(b'HTTP/') or not parts[1].isdigit():
+            raise ValueError(f"不是 HTTP 响应: {status_line[:40].decode('latin-1').strip()!r}")
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif status not in (204, 304) and not (100 <= status < 200):
+            # 无长度的正文只能读到连接关闭
+            await reader.read()
+            keep_alive = False
+        return status, keep_alive
+
+    async def _probe_postgres(self, check: ServiceCheck):
+        # 认证前的连接无法长期保持（authentication_timeout），每次新建
+        params = f'user\0{check.user}\0database\0{check.database}\0\0'.encode('utf-8')
+        reader, writer = await asyncio.open_connection(check.host, check.port)
+        try:
+            writer.write(struct.pack('!ii', 8 + len(params), _PG_PROTOCOL) + params)
+            await writer.drain()
+            kind, length = struct.unpack('!ci', await reader.readexactly(5))
+            if kind == b'R':
+                return True, 'accepting connections'
+            if kind != b'E':
+                return False, f'unexpected message {kind!r}'
+            body = await reader.readexactly(length - 4)
+            fields = {part[:1]: part[1:] for part in body.split(b'\0') if part}
+            code = fields.get(b'C', b'').decode('ascii', 'replace')
+            message = fields.get(b'M', b'').decode('utf-8', 'replace')
+            return code not in _PG_NOT_READY_CODES, f'{code} {message}'.strip()
+        finally:
+            writer.write(_PG_TERMINATE)
+            writer.close()
+
+    async def _probe_redis(self, check: ServiceCheck):
+        key = (check.host, check.port)
+        async with self._lock(check):
+            for attempt in range(2):
+                reused = key in self._redis_pool
+                if not reused:
+                    self._redis_pool[key] = await asyncio.open_connection(check.host, check.port)
+                reader, writer = self._redis_pool[key]
+                try:
+                    writer.write(b'*1\r\n$4\r\nPING\r\n')
+                    await writer.drain()
+                    reply = await reader.readline()
+                    if not reply:
+                        raise asyncio.IncompleteReadError(b'', None)
+                except (OSError, asyncio.IncompleteReadError, RuntimeError):
+                    self._discard(check)
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except asyncio.CancelledError:
+                    self._discard(check)
+                    raise
+                reply = reply.decode('utf-8', 'replace').strip()
+                if reply.startswith('-NOAUTH'):
+                    # 需要认证的连接不再复用，但服务本身已可用
+                    self._discard(check)
+                    return True, reply
+                return reply == '+PONG', reply
+
+
+def default_checks() -> List[ServiceCheck]:
+    """本项目默认的服务列表（与 launch_system 的端口一致）"""
+    return [
+        ServiceCheck.http('frontend', 'http://localhost:3000'),
+        ServiceCheck.http('backend', 'http://localhost:8000'),
+        ServiceCheck.http('pgadmin', 'http://localhost:5050'),
+        ServiceCheck('postgres', 'postgres', 'localhost', 5432, user='financial_user', database='financial_db'),
+        ServiceCheck('redis', 'redis', 'localhost', 6379),
+    ]
+
+
+def report() -> bool:
+    """检查默认服务并打印结果，全部健康时返回 True"""
+    with AsyncHealthChecker(default_checks()) as checker:
+        started = time.perf_counter()
+        results = checker.check()
+        elapsed = (time.perf_counter() - started) * 1000
+    for result in results.values():
+        icon = '✅' if result.healthy else '❌'
+        print(f"{icon} {result.name:<10} {result.latency_ms:8.1f} ms  {result.detail}")
+    healthy = sum(result.healthy for result in results.values())
+    print(f"📊 {healthy}/{len(results)} 健康，总耗时 {elapsed:.1f} ms")
+    return healthy == len(results)
+
+
+def main():
+    sys.exit(0 if report() else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线镜像包（分层去重）
+
+`docker save` 的输出按流读取：每个文件（镜像层、配置、manifest）按内容 SHA-256
+寻址，只压缩存储一次，多个镜像共享的基础层（Debian/Alpine）不再重复；
+导入时按清单在内存中重新拼出 tar 流直接送入 `docker load`，全程不落地中间 tar。
+
+包目录结构:
+    bundle.json                 清单：各批次的镜像与 tar 条目顺序、每个 blob 的大小与编码
+    blobs/sha256/<digest>.zst   压缩后的内容（缺少 zstd 时为 .gz）
+
+同一目录可反复导出：已有的 blob 直接复用，只写入新增的层。每次导出是清单中的一个批次，
+镜像被新批次完全覆盖的旧批次会被替换，其余批次保留；导入时按导出先后依次 docker load。
+
+Features:
+- 🧩 按内容寻址存储，跨镜像、跨批次去重
+- 🗜️ zstd 压缩（zstandard 模块或 zstd 命令），都没有时退回 gzip
+- 🚰 导出/导入全程流式管道，不写中间 tar 文件
+- 📋 清单记录包含的镜像及原始/存储字节数
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BUNDLE_FORMAT = 2
+MANIFEST_NAME = 'bundle.json'
+CHUNK_SIZE = 1024 * 1024
+ZSTD_LEVEL = 10
+
+
+# 压缩编码 -------------------------------------------------------------------
+
+def default_codec() -> str:
+    if zstandard is not None or shutil.which('zstd'):
+        return 'zst'
+    return 'gz'
+
+
+class _CommandWriter:
+    """把写入内容通过管道交给外部压缩命令"""
+
+    def __init__(self, command: List[str], path: Path):
+        self._output = open(path, 'wb')
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=self._output)
+
+    def write(self, data: bytes):
+        self._process.stdin.write(data)
+
+    def close(self):
+        self._process.stdin.close()
+        code = self._process.wait()
+        self._output.close()
+        if code != 0:
+            raise OSError(f'压缩命令退出码 {code}')
+
+
+class _CommandReader:
+    """读取外部解压命令的输出"""
+
+    def __init__(self, command: List[str]):
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._process.stdout.read(size)
+
+    def close(self):
+        self._process.stdout.close()
+        self._process.wait()
+
+
+class _ZstdWriter:
+    def __init__(self, path: Path):
+        self._output = open(path, 'wb')
+        self._writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1).stream_writer(self._output)
+
+    def write(self, data: bytes):
+        self._writer.write(data)
+
+    def close(self):
+        self._writer.close()  # 同时关闭底层文件
+
+
+def open_writer(path: Path, codec: str):
+    if codec == 'gz':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if zstandard is not None:
+        return _ZstdWriter(path)
+    return _CommandWriter(['zstd', '-q', '-T0', f'-{ZSTD_LEVEL}', '-c', '-'], path)
+
+
+def open_reader(path: Path, codec: str):
+    """返回可按块读取的解压流"""
+    if codec == 'gz':
+        return gzip.open(path, 'rb')
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return _CommandReader(['zstd', '-q', '-d', '-c', str(path)])
+
+
+# 清单 -----------------------------------------------------------------------
+
+@dataclass
+class BundleStats:
+    """一次导出/导入的统计"""
+    images: List[str] = field(default_factory=list)
+    raw_bytes: int = 0        # docker save 输出中的文件总字节数
+    written_bytes: int = 0    # 本次新写入的压缩字节数
+    new_blobs: int = 0
+    reused_blobs: int = 0
+
+
+def blob_path(bundle_dir: Path, digest: str, codec: str) -> Path:
+    return bundle_dir / 'blobs' / 'sha256' / f'{digest}.{codec}'
+
+
+def read_manifest(bundle_dir) -> dict:
+    return json.loads((Path(bundle_dir) / MANIFEST_NAME).read_text(encoding='utf-8'))
+
+
+def _archives(manifest: dict) -> List[dict]:
+    """清单中的批次；格式 1 的清单整体就是一个批次"""
+    if manifest.get('format') == 1:
+        return [manifest]
+    return manifest['archives']
+
+
+def _previous_archives(bundle_dir: Path, images: List[str]) -> List[dict]:
+    """保留旧清单中仍有镜像未被本次导出覆盖的批次"""
+    try:
+        manifest = read_manifest(bundle_dir)
+    except (OSError, ValueError):
+        return []
+    if manifest.get('format') not in (1, BUNDLE_FORMAT):
+        return []
+    return [{key: archive[key] for key in ('created', 'images', 'raw_bytes', 'entries')}
+            for archive in _archives(manifest) if not set(archive['images']) <= set(images)]
+
+
+def _existing_blobs(bundle_dir: Path) -> Dict[str, str]:
+    """已有 blob：digest -> 编码"""
+    blobs = {}
+    directory = bundle_dir / 'blobs' / 'sha256'
+    if directory.is_dir():
+        for entry in os.scandir(directory):
+            digest, _, codec = entry.name.partition('.')
+            if codec in ('zst', 'gz'):
+                blobs[digest] = codec
+    return blobs
+
+
+# 导出 -----------------------------------------------------------------------
+
+def export_bundle(images: List[str], bundle_dir, codec: str = None) -> BundleStats:
+    """把镜像以 docker save 流的形式导出到去重的包目录"""
+    bundle_dir = Path(bundle_dir)
+    codec = codec or default_codec()
+    (bundle_dir / 'blobs' / 'sha256').mkdir(parents=True, exist_ok=True)
+    existing = _existing_blobs(bundle_dir)
+    stats = BundleStats(images=list(images))
+    entries = []
+    blobs: Dict[str, dict] = {}
+
+    process = subprocess.Popen(['docker', 'save', *images], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stream_error = None
+    try:
+        with tarfile.open(fileobj=process.stdout, mode='r|') as archive:
+            for member in archive:
+                entry = {'name': member.name, 'mode': member.mode, 'mtime': int(member.mtime)}
+                if member.isdir():
+                    entry['type'] = 'dir'
+                elif member.issym() or member.islnk():
+                    entry['type'] = 'symlink' if member.issym() else 'hardlink'
+                    entry['linkname'] = member.linkname
+                elif member.isfile():
+                    digest, written = _store_blob(archive.extractfile(member), bundle_dir, codec, existing)
+                    entry.update(type='file', size=member.size, digest=digest)
+                    stats.raw_bytes += member.size
+                    if digest not in blobs:
+                        blobs[digest] = {'size': member.size, 'codec': existing[digest]}
+                        if written:
+                            stats.new_blobs += 1
+                            stats.written_bytes += written
+                        else:
+                            stats.reused_blobs += 1
+                else:
+                    continue
+                entries.append(entry)
+    except tarfile.TarError as e:
+        # docker save 失败时管道为空或被截断，以 docker 的错误输出为准
+        stream_error = e
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', 'replace').strip()
+        process.wait()
+    if process.returncode != 0 or stream_error is not None:
+        raise RuntimeError(f'docker save 失败: {stderr or stream_error}')
+
+    archives = _previous_archives(bundle_dir, images)
+    archives.append({
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'images': list(images),
+        'raw_bytes': stats.raw_bytes,
+        'entries': entries,
+    })
+    for archive in archives[:-1]:
+        for entry in archive['entries']:
+            if entry['type'] == 'file' and entry['digest'] not in blobs:
+                blobs[entry['digest']] = {'size': entry['size'], 'codec': existing[entry['digest']]}
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'images': list(dict.fromkeys(image for archive in archives for image in archive['images'])),
+        'raw_bytes': sum(archive['raw_bytes'] for archive in archives),
+        'stored_bytes': sum(blob_path(bundle_dir, d, b['codec']).stat().st_size for d, b in blobs.items()),
+        'archives': archives,
+        'blobs': blobs,
+    }
+    tmp = bundle_dir / f'{MANIFEST_NAME}.tmp'
+    tmp.write_text(json.dumps(manifest, indent=1, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, bundle_dir / MANIFEST_NAME)
+    return stats
+
+
+def _store_blob(source, bundle_dir: Path, codec: str, existing: Dict[str, str]):
+    """边读边计算摘要并压缩到临时文件；内容已存在时丢弃临时文件
+
+    返回 (digest, 新写入的压缩字节数)。
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix='.incoming-', dir=bundle_dir / 'blobs')
+    os.close(fd)
+    tmp = Path(tmp_name)
+    digest = hashlib.sha256()
+    try:
+        writer = open_writer(tmp, codec)
+        try:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                writer.write(chunk)
+        finally:
+            writer.close()
+        hexdigest = digest.hexdigest()
+        if hexdigest in existing:
+            return hexdigest, 0
+        written = tmp.stat().st_size
+        os.replace(tmp, blob_path(bundle_dir, hexdigest, codec))
+        existing[hexdigest] = codec
+        return hexdigest, written
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+# 导入 -----------------------------------------------------------------------
+
+def import_bundle(bundle_dir) -> BundleStats:
+    """按清单重建各批次的 tar 流，依次直接写入 docker load 的标准输入"""
+    bundle_dir = Path(bundle_dir)
+    manifest = read_manifest(bundle_dir)
+    if manifest.get('format') not in (1, BUNDLE_FORMAT):
+        raise ValueError(f"不支持的离线包格式: {manifest.get('format')}")
+    blobs = manifest['blobs']
+    missing = [d for d, b in blobs.items() if not blob_path(bundle_dir, d, b['codec']).exists()]
+    if missing:
+        raise FileNotFoundError(f"离线包缺少 {len(missing)} 个 blob，例如 {missing[0][:12]}")
+
+    # 按导出先后加载，同名标签以最近一次导出为准
+    for archive in _archives(manifest):
+        _load_archive(bundle_dir, archive['entries'], blobs)
+    return BundleStats(images=manifest['images'], raw_bytes=manifest['raw_bytes'])
+
+
+def _load_archive(bundle_dir: Path, entries: List[dict], blobs: Dict[str, dict]):
+    process = subprocess.Popen(['docker', 'load'], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        with tarfile.open(fileobj=process.stdin, mode='w|', format=tarfile.PAX_FORMAT) as archive:
+            for entry in entries:
+                info = tarfile.TarInfo(entry['name'])
+                info.mode = entry['mode']
+                info.mtime = entry['mtime']
+                if entry['type'] == 'dir':
+                    info.type = tarfile.DIRTYPE
+                    archive.addfile(info)
+                elif entry['type'] in ('symlink', 'hardlink'):
+                    info.type = tarfile.SYMTYPE if entry['type'] == 'symlink' else tarfile.LNKTYPE
+                    info.linkname = entry['linkname']
+                    archive.addfile(info)
+                else:
+                    info.size = entry['size']
+                    codec = blobs[entry['digest']]['codec']
+                    reader = open_reader(blob_path(bundle_dir, entry['digest'], codec), codec)
+                    try:
+                        archive.addfile(info, reader)
+                    finally:
+                        reader.close()
+    except BrokenPipeError:
+        pass  # docker load 提前退出，错误信息见下方输出
+    finally:
+        if not process.stdin.closed:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        output = process.stdout.read().decode('utf-8', 'replace').strip()
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f'docker load 失败: {output}')
+
+
+def _format_size(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('export', 'import'):
+        print("用法: image_bundle.py export <目录> <镜像>... | import <目录>")
+        sys.exit(2)
+    command, bundle_dir = sys.argv[1], sys.argv[2]
+    if command == 'export':
+        stats = export_bundle(sys.argv[3:], bundle_dir)
+        manifest = read_manifest(bundle_dir)
+        print(f"📦 已导出 {len(stats.images)} 个镜像到 {bundle_dir}（包内共 {len(manifest['images'])} 个）")
+        print(f"   原始 {_format_size(manifest['raw_bytes'])} → 包内 {_format_size(manifest['stored_bytes'])}"
+              f"（新增 {stats.new_blobs} 个 blob，复用 {stats.reused_blobs} 个）")
+    else:
+        stats = import_bundle(bundle_dir)
+        print(f"✅ 已导入 {len(stats.images)} 个镜像: {', '.join(stats.images)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并行镜像拉取
+
+按实测延迟给镜像源排序，只调用一次 `docker images` 判断哪些镜像
+已存在，然后用有界线程池同时拉取多个镜像（各镜像的层由 Docker 守护进程并发下载）。
+连续失败的镜像源会被断路器暂时跳过，不再为每个镜像重复等待超时。
+
+Features:
+- 📶 镜像源按 /v2/ 接口的响应延迟排序，延迟相同时按配置优先级
+- 🗂️ 单次 `docker images` 列表判断镜像是否已存在
+- 🔀 有界线程池并行拉取，失败时指数退避重试
+- 🔌 每个镜像源一个断路器，熔断后冷却一段时间再半开试探
+- 🧪 支持本地 registry（如 `registry:2`）作为镜像源，便于测试
+"""
+
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# 断路器：连续失败次数阈值与冷却时间（秒）
+BREAKER_THRESHOLD = 2
+BREAKER_COOLDOWN = 60.0
+# 同一镜像源上的重试次数与退避上限
+PULL_RETRIES = 2
+MAX_BACKOFF = 8.0
+
+RunCommand = Callable[..., Tuple[bool, str, str]]
+
+
+def run_command(cmd: List[str], timeout: int = 30) -> Tuple[bool, str, str]:
+    """与 DockerSmartFixer.run_command 相同的返回约定：(成功, stdout, stderr)"""
+    try:
+        process = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return process.returncode == 0, process.stdout, process.stderr
+    except subprocess.TimeoutExpired:
+        return False, "", "Command timeout"
+    except OSError as e:
+        return False, "", str(e)
+
+
+# 镜像源 ---------------------------------------------------------------------
+
+@dataclass
+class Mirror:
+    """一个镜像源
+
+    prefix 为空时表示通过 daemon.json 的 registry-mirrors 透明加速，直接拉取原始镜像名；
+    否则拉取 `<prefix>/<镜像>` 后重新标记为原始镜像名（如阿里云、本地 registry）。
+    """
+    mirror_id: str
+    url: str
+    name: str
+    priority: int = 99
+    prefix: str = ''
+
+    def reference(self, image: str) -> str:
+        return f"{self.prefix}/{image}" if self.prefix else image
+
+
+@dataclass
+class MirrorProbe:
+    """一次镜像源测速结果"""
+    mirror: Mirror
+    ok: bool
+    latency_ms: float = 0.0
+    detail: str = ''
+
+
+def probe_mirror(mirror: Mirror, timeout: float = 5.0) -> MirrorProbe:
+    """请求镜像源的 /v2/ 接口，测量首字节延迟
+
+    registry 未登录时返回 401 也说明服务在线，同样视为可用。/v2/ 的响应体只有
+    几个字节，读取耗时反映不了下载速率，因此只按延迟测速。
+    """
+    url = mirror.url.rstrip('/') + '/v2/'
+    request = urllib.request.Request(url, headers={'User-Agent': 'Docker-Client'})
+    started = time.perf_counter()
+    try:
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code != 401:
+                raise
+            response = e
+        with response:
+            first_byte = time.perf_counter()
+    except (OSError, ValueError) as e:
+        return MirrorProbe(mirror, False, detail=str(getattr(e, 'reason', e)))
+    latency_ms = (first_byte - started) * 1000
+    return MirrorProbe(mirror, True, latency_ms, f"HTTP {response.status}")
+
+
+def rank_mirrors(mirrors: Iterable[Mirror], timeout: float = 5.0) -> List[MirrorProbe]:
+    """并发测速所有镜像源，可用的按延迟排序在前，延迟相同时按配置优先级"""
+    mirrors = list(mirrors)
+    if not mirrors:
+        return []
+    with ThreadPoolExecutor(max_workers=len(mirrors)) as pool:
+        probes = list(pool.map(lambda m: probe_mirror(m, timeout), mirrors))
+    return sorted(probes, key=lambda p: (not p.ok, p.latency_ms, p.mirror.priority))
+
+
+# 断路器 ---------------------------------------------------------------------
+
+class CircuitBreaker:
+    """连续失败 threshold 次后熔断，cooldown 秒后允许一次试探（半开）"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """是否允许本次请求；半开状态下只放行一个试探请求"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+
+# 拉取 -----------------------------------------------------------------------
+
+@dataclass
+class PullResult:
+    """单个镜像的拉取结果"""
+    image: str
+    ok: bool
+    action: str = 'pulled'   # pulled / cached / failed
+    mirror: str = ''
+    duration: float = 0.0
+    attempts: List[str] = field(default_factory=list)
+
+
+def local_images(run: RunCommand = run_command) -> Set[str]:
+    """一次 `docker images` 调用列出本地全部 仓库:标签"""
+    success, stdout, _ = run(["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"])
+    if not success:
+        return set()
+    images = set()
+    for line in stdout.splitlines():
+        line = line.strip()
+        if line and not line.endswith(':<none>'):
+            images.add(line)
+            # docker images 对官方镜像显示短名，补上 docker.io/library/ 形式便于比较
+            if '/' not in line:
+                images.add(f"docker.io/library/{line}")
+    return images
+
+
+class ImagePuller:
+    """按镜像源排名并行拉取镜像"""
+
+    def __init__(self, mirrors: List[Mirror], max_workers: int = 3, run: RunCommand = run_command,
+                 pull_timeout: int = 600, on_event: Callable[[str, str], None] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param mirrors: 已排序的镜像源；为空时直接拉取原始镜像名
+        :param on_event: on_event(级别, 消息)，级别为 info / success / warning
+        """
+        self.mirrors = mirrors or [Mirror('default', '', 'Docker Hub')]
+        self.max_workers = max_workers
+        self.run = run
+        self.pull_timeout = pull_timeout
+        self.on_event = on_event or (lambda level, message: None)
+        self.sleep = sleep
+        self.breakers = {m.mirror_id: CircuitBreaker() for m in self.mirrors}
+
+    def pull_all(self, images: Iterable[str]) -> Dict[str, PullResult]:
+        """跳过已存在的镜像，其余并行拉取，返回 {镜像: PullResult}"""
+        images = list(images)
+        existing = local_images(self.run)
+        results = {}
+        pending = []
+        for image in images:
+            if image in existing:
+                results[image] = PullResult(image, True, 'cached')
+                self.on_event('warning', f"镜像已存在，跳过: {image}")
+            else:
+                pending.append(image)
+
+        if pending:
+            workers = max(1, min(self.max_workers, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self.pull, image): image for image in pending}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.image] = result
+        return {image: results[image] for image in images}
+
+    def pull(self, image: str) -> PullResult:
+        """依次尝试各镜像源；熔断中的镜像源直接跳过"""
+        started = time.perf_counter()
+        attempts = []
+        for mirror in self.mirrors:
+            breaker = self.breakers[mirror.mirror_id]
+            for retry in range(PULL_RETRIES):
+                if not breaker.allow():
+                    attempts.append(f"{mirror.mirror_id}: 熔断中")
+                    break
+                reference = mirror.reference(image)
+                self.on_event('info', f"{image} ← {mirror.name} (尝试 {retry + 1}/{PULL_RETRIES})")
+                success, _, stderr = self.run(["docker", "pull", reference], timeout=self.pull_timeout)
+                if success:
+                    breaker.record_success()
+                    if reference != image:
+                        self.run(["docker", "tag", reference, image])
+                        self.run(["docker", "rmi", reference])
+                    self.on_event('success', f"✓ 成功从 {mirror.name} 拉取 {image}")
+                    return PullResult(image, True, 'pulled', mirror.mirror_id,
+                                      time.perf_counter() - started, attempts)
+                reason = (stderr or '').strip().splitlines()
+                attempts.append(f"{mirror.mirror_id}: {reason[-1] if reason else '失败'}")
+                if _not_found(stderr):
+                    # 镜像源在线但没有这个镜像：不计入熔断，也不必重试
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                if retry < PULL_RETRIES - 1:
+                    self.sleep(_backoff(retry))
+        return PullResult(image, False, 'failed', '', time.perf_counter() - started, attempts)
+
+
+def _not_found(stderr: str) -> bool:
+    text = (stderr or '').lower()
+    return 'not found' in text or 'manifest unknown' in text or 'repository does not exist' in text
+
+
+def _backoff(retry: int) -> float:
+    """带抖动的指数退避，避免多个线程同时重试同一镜像源"""
+    delay = min(MAX_BACKOFF, 1.0 * 2 ** retry)
+    return delay * random.uniform(0.5, 1.0)
@@ -21,19 +21,18 @@ import time
 import json
 import subprocess
 import threading
-import requests
 import platform
 import signal
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import logging
-import psutil
-import colorama
-from colorama import Fore, Back, Style, init
+from typing import TYPE_CHECKING, Dict, List, Optional
+import telemetry
+from launcher import services, sounds, tools
+from launcher.console import Console, colorize
 
-# 初始化颜色输出
-init(autoreset=True)
+if TYPE_CHECKING:
+    from health_checker import AsyncHealthChecker
+    from startup_dag import StartupGraph
 
 class FinancialSystemLauncher:
     def __init__(self):
@@ -47,44 +46,15 @@ class FinancialSystemLauncher:
             'redis': {'port': 6379, 'name': 'Redis缓存', 'url': None},
             'pgadmin': {'port': 5050, 'name': '数据库管理', 'url': 'http://localhost:5050'}
         }
-        self.setup_logging()
-        self.running_processes = []
-        
-    def setup_logging(self):
-        """设置日志系统"""
-        log_dir = self.project_root / 'logs'
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_dir / 'system_launcher.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
-
+        self.default_ports = {name: config['port'] for name, config in self.services.items()}
+        self.console = Console('system_launcher', self.project_root / 'logs')
+        self.logger = self.console.logger
+        self._health_checker = None
+        self.install_results = {}
+        
     def print_color(self, color: str, message: str, style: str = ''):
         """彩色输出"""
-        color_map = {
-            'red': Fore.RED,
-            'green': Fore.GREEN,
-            'yellow': Fore.YELLOW,
-            'blue': Fore.BLUE,
-            'purple': Fore.MAGENTA,
-            'cyan': Fore.CYAN,
-            'white': Fore.WHITE
-        }
-        
-        style_map = {
-            'bold': Style.BRIGHT,
-            'dim': Style.DIM
-        }
-        
-        output = f"{color_map.get(color, '')}{style_map.get(style, '')}{message}{Style.RESET_ALL}"
-        print(output)
-        self.logger.info(message)
+        self.console.print(message, color, style)
 
     def play_30s_light_music(self, task_type: str):
         """30秒轻音乐提醒系统"""
@@ -93,7 +63,7 @@ class FinancialSystemLauncher:
         self.print_color('cyan', f"🎵 启动30秒{task_type}轻音乐提醒...")
         
         # 深夜模式检查 (22:00-8:00)
-        if hour >= 22 or hour <= 8:
+        if sounds.late_night(hour):
             self.print_color('purple', "🌙 深夜模式：系统启动完成，播放轻柔提醒...")
             self._play_night_mode_music()
             return
@@ -113,8 +83,7 @@ class FinancialSystemLauncher:
         try:
             if self.os_type == 'Darwin':  # macOS
                 for i in range(8):
-                    subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                                 check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    sounds.play('Glass')
                     time.sleep(0.8)
                     if i == 2:
                         self._speak("智能财务管理系统正在启动", 'Ting-Ting', 160)
@@ -138,8 +107,7 @@ class FinancialSystemLauncher:
         try:
             if self.os_type == 'Darwin':
                 for i in range(12):
-                    subprocess.run(['afplay', '/System/Library/Sounds/Purr.aiff'], 
-                                 check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    sounds.play('Purr')
                     time.sleep(1.8)
                     if i == 3:
                         self._speak("所有核心服务已成功启动", 'Mei-Jia', 150)
@@ -156,8 +124,7 @@ class FinancialSystemLauncher:
         try:
             if self.os_type == 'Darwin':
                 for i in range(10):
-                    subprocess.run(['afplay', '/System/Library/Sounds/Blow.aiff'], 
-                                 check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    sounds.play('Blow')
                     time.sleep(2.2)
                     if i == 4:
                         self._speak("智能财务管理系统现在完全运行", 'Sin-ji', 140)
@@ -171,8 +138,7 @@ class FinancialSystemLauncher:
         try:
             if self.os_type == 'Darwin':
                 for i in range(5):
-                    subprocess.run(['afplay', '/System/Library/Sounds/Tink.aiff'], 
-                                 check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    sounds.play('Tink')
                     time.sleep(1.5)
                 self._speak("财务管理系统已成功启动，深夜模式激活", 'Sin-ji', 120)
         except Exception as e:
@@ -184,8 +150,7 @@ class FinancialSystemLauncher:
         try:
             if self.os_type == 'Darwin':
                 for i in range(6):
-                    subprocess.run(['afplay', '/System/Library/Sounds/Sosumi.aiff'], 
-                                 check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    sounds.play('Sosumi')
                     time.sleep(3)
                     if i == 2:
                         self._speak("检测到网络连接问题，请运行修复脚本", 'Ting-Ting', 140)
@@ -197,25 +162,17 @@ class FinancialSystemLauncher:
         self.print_color('red', "✅ 30秒错误提醒音乐播放完成")
 
     def _auto_fix_port_conflicts(self):
-        """自动修复端口冲突"""
+        """docker-compose 报告端口已分配时，连同 Docker 占用的端口一起重新分配"""
         try:
-            for service_name, config in self.services.items():
-                port = config['port']
-                if self._is_port_in_use(port):
-                    self.print_color('yellow', f"🔧 尝试释放端口 {port}...")
-                    if self._kill_port_process(port):
-                        self.print_color('green', f"✅ 端口 {port} 已释放")
-                    else:
-                        self.print_color('red', f"❌ 无法释放端口 {port}")
+            self._resolve_ports(keep_docker=False)
         except Exception as e:
             self.logger.warning(f"端口修复失败: {e}")
 
     def _speak(self, text: str, voice: str = None, rate: int = 140):
         """语音提醒"""
         try:
-            if self.os_type == 'Darwin' and voice:
-                subprocess.run(['say', text, '--voice', voice, '--rate', str(rate)], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if sounds.AVAILABLE and voice:
+                sounds.speak(text, voice, rate)
             elif self.os_type == 'Windows':
                 subprocess.run(['powershell', '-Command', f'Add-Type –AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak("{text}")'], 
                              check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -226,44 +183,27 @@ class FinancialSystemLauncher:
 
     def display_banner(self):
         """显示启动横幅"""
-        os.system('clear' if self.os_type != 'Windows' else 'cls')
+        self.console.clear()
         
-        banner = f"""
-{Fore.CYAN}╔══════════════════════════════════════════════════════════════╗
+        title = """
+╔══════════════════════════════════════════════════════════════╗
 ║                🚀 智能财务管理系统启动器 v2.0                  ║
 ║                   Professional Financial System                ║
 ║                        Python Edition                          ║
-╚══════════════════════════════════════════════════════════════╝{Style.RESET_ALL}
-
-{Fore.YELLOW}🕒 启动时间: {self.current_time}
+╚══════════════════════════════════════════════════════════════╝"""
+        details = f"""
+🕒 启动时间: {self.current_time}
 💻 操作系统: {self.os_type}
-📁 项目路径: {self.project_root}{Style.RESET_ALL}
+📁 项目路径: {self.project_root}
 """
-        print(banner)
+        print(colorize(title, 'cyan') + '\n' + colorize(details, 'yellow'))
 
     def check_environment(self) -> bool:
         """环境检查"""
         self.print_color('blue', "🔍 第一阶段：环境检查...", 'bold')
         
-        # 检查必需工具
-        required_tools = {
-            'docker': 'Docker 容器引擎',
-            'docker-compose': 'Docker Compose',
-            'node': 'Node.js 运行时',
-            'npm': 'NPM 包管理器'
-        }
-        
-        missing_tools = []
-        for tool, description in required_tools.items():
-            if not self._check_command(tool):
-                missing_tools.append(f"{tool} ({description})")
-                self.print_color('red', f"❌ {description} 未安装")
-            else:
-                version = self._get_tool_version(tool)
-                self.print_color('green', f"✅ {description} 已安装: {version}")
-        
-        if missing_tools:
-            self.print_color('red', f"请安装以下必需工具: {', '.join(missing_tools)}")
+        # 检查必需工具（并行获取版本）
+        if tools.check_tools(self.console, ['docker', 'docker-compose', 'node', 'npm']):
             return False
         
         # 检查Node.js版本
@@ -276,24 +216,6 @@ class FinancialSystemLauncher:
         self.print_color('green', "🎯 环境检查完成！")
         return True
 
-    def _check_command(self, command: str) -> bool:
-        """检查命令是否存在"""
-        try:
-            subprocess.run([command, '--version'], 
-                         check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-
-    def _get_tool_version(self, tool: str) -> str:
-        """获取工具版本"""
-        try:
-            result = subprocess.run([tool, '--version'], 
-                                  capture_output=True, text=True, check=True)
-            return result.stdout.strip().split('\n')[0]
-        except:
-            return "未知版本"
-
     def _check_nodejs_version(self) -> bool:
         """检查Node.js版本"""
         try:
@@ -312,80 +234,60 @@ class FinancialSystemLauncher:
             return False
 
     def _check_ports(self):
-        """检查端口占用"""
-        for service_name, config in self.services.items():
-            port = config['port']
-            name = config['name']
-            
-            if self._is_port_in_use(port):
-                self.print_color('yellow', f"⚠️  端口 {port} ({name}) 已被占用")
-                
-                # 尝试终止占用进程
-                if self._kill_port_process(port):
-                    self.print_color('green', f"✅ 已释放端口 {port}")
-                else:
-                    self.print_color('yellow', f"⚠️  请手动处理端口 {port} 冲突")
-            else:
-                self.print_color('green', f"✅ 端口 {port} ({name}) 可用")
-
-    def _is_port_in_use(self, port: int) -> bool:
-        """检查端口是否被占用"""
-        try:
-            for conn in psutil.net_connections():
-                if conn.laddr.port == port:
-                    return True
-            return False
-        except:
-            return False
-
-    def _kill_port_process(self, port: int) -> bool:
-        """终止占用端口的进程"""
-        try:
-            for conn in psutil.net_connections():
-                if conn.laddr.port == port and conn.pid:
-                    process = psutil.Process(conn.pid)
-                    process.terminate()
-                    time.sleep(1)
-                    if process.is_running():
-                        process.kill()
-                    return True
-            return False
-        except:
-            return False
+        """检查端口占用：遗留的项目进程直接终止，其他占用者改用备用端口"""
+        self._resolve_ports(keep_docker=True)
+
+    def _resolve_ports(self, keep_docker: bool):
+        """一次快照解析全部端口冲突，并把实际端口同步到 self.services"""
+        effective = services.resolve_ports(self.console, self.project_root, self.default_ports,
+                                           compose_dir=self.project_root, keep_docker=keep_docker)
+        for name, port in effective.items():
+            config = self.services[name]
+            if port != config['port']:
+                config['port'] = port
+                if config['url']:
+                    config['url'] = f'http://localhost:{port}'
+                self._health_checker = None
 
     def install_dependencies(self) -> bool:
-        """安装依赖"""
-        self.print_color('blue', "📦 第二阶段：依赖管理...", 'bold')
-        
-        # 设置环境文件
-        self._setup_env_files()
-        
-        # 安装根目录依赖
-        if (self.project_root / 'package.json').exists():
-            self.print_color('cyan', "📋 安装根目录依赖...")
-            if not self._run_npm_install('.'):
-                return False
-            self.print_color('green', "✅ 根目录依赖安装完成")
-        
-        # 安装前端依赖
-        frontend_dir = self.project_root / 'frontend'
-        if frontend_dir.exists() and (frontend_dir / 'package.json').exists():
-            self.print_color('cyan', "🎨 安装前端依赖...")
-            if not self._run_npm_install('frontend'):
-                return False
-            self.print_color('green', "✅ 前端依赖安装完成")
-        
-        # 安装后端依赖
-        backend_dir = self.project_root / 'backend'
-        if backend_dir.exists() and (backend_dir / 'package.json').exists():
-            self.print_color('cyan', "⚡ 安装后端依赖...")
-            if not self._run_npm_install('backend'):
-                return False
-            self.print_color('green', "✅ 后端依赖安装完成")
-        
-        self.print_color('green', "🎯 依赖管理完成！")
+        """各目录并行安装依赖（依赖未变化的目录直接跳过）"""
+        return services.run_parallel({
+            span_name: (lambda d=directory: self._install_package(d))
+            for directory, (span_name, _, _) in self.NPM_PACKAGES.items()
+        })
+
+    # 需要 npm install 的目录：(子 span 名, 图标, 说明)
+    NPM_PACKAGES = {
+        '.': ('npm_root', '📋', '根目录'),
+        'frontend': ('npm_frontend', '🎨', '前端'),
+        'backend': ('npm_backend', '⚡', '后端'),
+    }
+
+    def _install_package(self, directory: str) -> bool:
+        """安装单个目录的依赖（无 package.json 时跳过）"""
+        _, icon, label = self.NPM_PACKAGES[directory]
+        package_dir = self.project_root / directory
+        if not (package_dir / 'package.json').exists():
+            return True
+        self.print_color('cyan', f"{icon} 检查{label}依赖...")
+        import npm_cache
+        result = npm_cache.ensure_installed(package_dir)
+        self.install_results[directory] = result
+        if not result.ok:
+            self.print_color('red', f"❌ {label}{npm_cache.describe(result)}")
+            return False
+        self.print_color('green', f"✅ {label}{npm_cache.describe(result)}")
         return True
 
+    def _report_install_savings(self):
+        """汇总依赖缓存节省的时间"""
+        if not self.install_results:
+            return
+        import npm_cache
+        saved = npm_cache.total_saved(self.install_results.values())
+        if saved > 0:
+            self.print_color('cyan', f"⚡ 依赖缓存命中，本次启动约节省 {saved:.0f}s")
+
     def _setup_env_files(self):
         """设置环境文件"""
         self.print_color('yellow', "📝 设置环境配置文件...")
@@ -408,53 +310,37 @@ class FinancialSystemLauncher:
             frontend_env.write_text(frontend_example.read_text())
             self.print_color('green', "✅ 前端 .env 文件已创建")
 
-    def _run_npm_install(self, directory: str) -> bool:
-        """运行npm install"""
-        try:
-            cwd = self.project_root / directory if directory != '.' else self.project_root
-            result = subprocess.run(['npm', 'install'], 
-                                  cwd=cwd, check=True, 
-                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError as e:
-            self.print_color('red', f"❌ {directory} 依赖安装失败: {e}")
-            return False
-
-    def setup_database(self) -> bool:
-        """设置数据库"""
-        self.print_color('blue', "🗄️ 第三阶段：数据库服务...", 'bold')
-        
+    def _start_database(self) -> bool:
+        """清理旧容器并启动 PostgreSQL/Redis，等待就绪"""
         # 停止旧容器
         self.print_color('cyan', "🔄 清理旧容器...")
         self._run_docker_compose(['down', '--remove-orphans'])
         
         # 启动数据库服务
         self.print_color('cyan', "🚀 启动数据库服务...")
-        if not self._run_docker_compose(['up', '-d', 'postgres', 'redis']):
+        if not self._run_docker_compose(['up', '-d', *self._wait_flag(), 'postgres', 'redis']):
             return False
         
-        # 等待数据库就绪
-        if not self._wait_for_database():
-            return False
-        
-        # 数据库迁移和种子数据
-        self._run_database_migrations()
-        
-        self.print_color('green', "🎯 数据库服务完成！")
-        
-        # 播放服务就绪音乐
-        self.play_30s_light_music("服务就绪")
-        return True
+        # 等待数据库就绪（--wait 已等到 healthcheck 通过时，这里第一次探测即成功）
+        return self._wait_for_database()
+
+    @staticmethod
+    def _wait_flag() -> List[str]:
+        """Compose v2 的 --wait：服务 healthcheck 通过后 up 才返回"""
+        return ['--wait'] if tools.compose_supports_wait() else []
+
+    def _pull_images(self) -> bool:
+        """预先拉取镜像，与依赖安装并行进行"""
+        self.print_color('cyan', "🐳 拉取Docker镜像...")
+        return self._run_docker_compose(['pull', '--quiet'])
 
     def _run_docker_compose(self, args: List[str]) -> bool:
         """运行docker-compose命令"""
         try:
-            result = subprocess.run(['docker-compose'] + args, 
-                          cwd=self.project_root, check=True,
-                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            tools.compose(args, cwd=self.project_root, check=True)
             return True
         except subprocess.CalledProcessError as e:
-            error_output = e.stderr.decode() if e.stderr else ""
+            error_output = e.stderr or ""
             
             # 检查网络连接错误
             if "failed to resolve reference" in error_output or "EOF" in error_output:
@@ -484,49 +370,42 @@ class FinancialSystemLauncher:
         """等待数据库就绪"""
         self.print_color('cyan', "⏳ 等待数据库就绪...")
         
-        max_retries = 30
-        for i in range(max_retries):
-            try:
-                result = subprocess.run([
-                    'docker-compose', 'exec', '-T', 'postgres',
-                    'pg_isready', '-U', 'financial_user', '-d', 'financial_db'
-                ], cwd=self.project_root, check=True,
-                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                self.print_color('green', "✅ PostgreSQL 数据库就绪")
-                break
-            except subprocess.CalledProcessError:
-                if i >= max_retries - 1:
-                    self.print_color('red', "❌ 数据库启动超时")
-                    return False
-                self.print_color('yellow', f"⏳ 等待PostgreSQL启动... ({i + 1}/{max_retries})")
-                time.sleep(2)
-        
-        # 检查Redis
-        try:
-            subprocess.run([
-                'docker-compose', 'exec', '-T', 'redis', 'redis-cli', 'ping'
-            ], cwd=self.project_root, check=True,
-               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self.print_color('green', "✅ Redis 缓存就绪")
-        except subprocess.CalledProcessError:
+        import readiness
+        ready = readiness.wait_for_all({
+            'postgres': lambda: readiness.probe_postgres(
+                'localhost', self.services['postgres']['port'], 'financial_user', 'financial_db'),
+            'redis': lambda: readiness.probe_redis('localhost', self.services['redis']['port']),
+        }, timeout=60)
+        
+        if ready['postgres'] is None:
+            self.print_color('red', "❌ 数据库启动超时")
+            return False
+        self.print_color('green', f"✅ PostgreSQL 数据库就绪 ({ready['postgres']:.1f}s)")
+        
+        if ready['redis'] is None:
             self.print_color('yellow', "⚠️  Redis 启动中...")
-            time.sleep(3)
+        else:
+            self.print_color('green', f"✅ Redis 缓存就绪 ({ready['redis']:.1f}s)")
         
         return True
 
-    def _run_database_migrations(self):
-        """运行数据库迁移"""
+    def _generate_prisma_client(self):
+        """生成 Prisma 客户端（不需要数据库连接）"""
+        backend_dir = self.project_root / 'backend'
+        if backend_dir.exists():
+            self.print_color('cyan', "🔧 生成 Prisma 客户端...")
+            subprocess.run(['npm', 'run', 'db:generate'], 
+                         cwd=backend_dir, check=False,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+
+    def _run_database_migrations(self) -> bool:
+        """运行数据库迁移与种子数据，完成后播放服务就绪提醒"""
         backend_dir = self.project_root / 'backend'
         if backend_dir.exists():
             self.print_color('cyan', "🔄 运行数据库迁移...")
             
             try:
-                # Prisma generate
-                subprocess.run(['npm', 'run', 'db:generate'], 
-                             cwd=backend_dir, check=False,
-                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
                 # Database migration
                 subprocess.run(['npm', 'run', 'db:migrate'], 
                              cwd=backend_dir, check=False,
@@ -541,6 +420,9 @@ class FinancialSystemLauncher:
                 self.print_color('green', "✅ 数据库初始化完成")
             except Exception as e:
                 self.print_color('yellow', f"⚠️  数据库迁移部分失败: {e}")
+        
+        self.play_30s_light_music("服务就绪")
+        return True
 
     def start_services(self) -> bool:
         """启动应用服务"""
@@ -548,59 +430,45 @@ class FinancialSystemLauncher:
         
         # 启动所有服务
         self.print_color('cyan', "🌐 启动完整应用堆栈...")
-        if not self._run_docker_compose(['up', '-d']):
+        if not self._run_docker_compose(['up', '-d', *self._wait_flag()]):
             return False
         
         # 等待服务启动
         self.print_color('cyan', "⏳ 等待服务完全启动...")
-        time.sleep(15)
+        import readiness
+        ready = readiness.wait_for_all({
+            name: (lambda url=self.services[name]['url']: readiness.probe_http(url))
+            for name in ('frontend', 'backend')
+        }, timeout=90)
+        for name, elapsed in ready.items():
+            if elapsed is None:
+                self.print_color('yellow', f"⚠️  {self.services[name]['name']} 尚未响应")
+            else:
+                self.print_color('green', f"✅ {self.services[name]['name']} 已就绪 ({elapsed:.1f}s)")
         
         self.print_color('green', "🎯 应用服务启动完成！")
         return True
 
+    @telemetry.traced()
     def health_check(self) -> Dict[str, bool]:
-        """健康检查"""
+        """健康检查（所有服务并发探测）"""
         self.print_color('blue', "💊 第五阶段：健康检查...", 'bold')
         
+        results = self._get_health_checker().check()
         health_status = {}
-        healthy_services = 0
         
-        # 检查Web服务
-        web_services = ['frontend', 'backend', 'pgadmin']
-        for service_name in web_services:
-            config = self.services[service_name]
+        for service_name, config in self.services.items():
             name = config['name']
-            url = config['url']
-            
-            self.print_color('cyan', f"🔍 检查 {name} 服务...")
-            
-            if self._check_http_service(url):
-                self.print_color('green', f"✅ {name} 服务健康")
-                health_status[service_name] = True
-                healthy_services += 1
+            result = results[service_name]
+            health_status[service_name] = result.healthy
+            if result.healthy:
+                self.print_color('green', f"✅ {name} 服务健康 ({result.latency_ms:.0f} ms)")
             else:
-                self.print_color('yellow', f"⚠️  {name} 服务启动中...")
-                health_status[service_name] = False
-        
-        # 检查数据库服务
-        if self._check_database_connection():
-            self.print_color('green', "✅ 数据库连接正常")
-            health_status['postgres'] = True
-            healthy_services += 1
-        else:
-            self.print_color('yellow', "⚠️  数据库连接检查失败")
-            health_status['postgres'] = False
-        
-        # 检查Redis
-        if self._check_redis_connection():
-            self.print_color('green', "✅ Redis缓存连接正常")
-            health_status['redis'] = True
-            healthy_services += 1
-        else:
-            self.print_color('yellow', "⚠️  Redis连接检查失败")
-            health_status['redis'] = False
+                detail = f": {result.detail}" if result.detail else ''
+                self.print_color('yellow', f"⚠️  {name} 服务未就绪{detail}")
         
         # 计算健康度
+        healthy_services = sum(health_status.values())
         total_services = len(self.services)
         health_percentage = (healthy_services * 100) // total_services
         
@@ -613,39 +481,23 @@ class FinancialSystemLauncher:
         
         return health_status
 
-    def _check_http_service(self, url: str, timeout: int = 5) -> bool:
-        """检查HTTP服务"""
-        if not url:
-            return False
-        
-        try:
-            response = requests.get(url, timeout=timeout)
-            return response.status_code < 500
-        except:
-            return False
-
-    def _check_database_connection(self) -> bool:
-        """检查数据库连接"""
-        try:
-            subprocess.run([
-                'docker-compose', 'exec', '-T', 'postgres',
-                'pg_isready', '-U', 'financial_user', '-d', 'financial_db'
-            ], cwd=self.project_root, check=True,
-               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except subprocess.CalledProcessError:
-            return False
-
-    def _check_redis_connection(self) -> bool:
-        """检查Redis连接"""
-        try:
-            subprocess.run([
-                'docker-compose', 'exec', '-T', 'redis', 'redis-cli', 'ping'
-            ], cwd=self.project_root, check=True,
-               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+    def _get_health_checker(self) -> 'AsyncHealthChecker':
+        """复用同一个检查器，使监控模式的多轮检查共享连接"""
+        if self._health_checker is None:
+            from health_checker import AsyncHealthChecker, ServiceCheck
+            checks = []
+            for service_name, config in self.services.items():
+                if config['url']:
+                    checks.append(ServiceCheck.http(service_name, config['url']))
+                elif service_name == 'postgres':
+                    checks.append(ServiceCheck(service_name, 'postgres', 'localhost', config['port'],
+                                               user='financial_user', database='financial_db'))
+                elif service_name == 'redis':
+                    checks.append(ServiceCheck(service_name, 'redis', 'localhost', config['port']))
+                else:
+                    checks.append(ServiceCheck(service_name, 'tcp', 'localhost', config['port']))
+            self._health_checker = AsyncHealthChecker(checks)
+        return self._health_checker
 
     def launch_complete(self):
         """启动完成"""
@@ -678,62 +530,19 @@ class FinancialSystemLauncher:
         # 播放完全运行音乐
         self.play_30s_light_music("完全运行")
 
-    def monitor_system(self):
-        """系统监控模式"""
+    def monitor_system(self, metrics_port: Optional[int] = None):
+        """系统监控模式（后台采样 + 增量渲染）"""
         self.print_color('blue', "📊 进入系统监控模式...", 'bold')
         
-        try:
-            while True:
-                os.system('clear' if self.os_type != 'Windows' else 'cls')
-                
-                self.print_color('cyan', f"""
-╔══════════════════════════════════════════════════════════════╗
-║                   📊 系统实时监控面板                         ║
-║                 更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                 ║
-╚══════════════════════════════════════════════════════════════╝
-""")
-                
-                # 检查服务状态
-                health_status = self.health_check()
-                
-                # 显示系统资源
-                self._display_system_resources()
-                
-                # 显示容器状态
-                self._display_container_status()
-                
-                self.print_color('yellow', "\n按 Ctrl+C 退出监控模式")
-                time.sleep(10)
-                
-        except KeyboardInterrupt:
-            self.print_color('green', "\n👋 退出监控模式")
-
-    def _display_system_resources(self):
-        """显示系统资源"""
-        try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            self.print_color('cyan', "\n💻 系统资源状态：")
-            print(f"   🔥 CPU使用率: {cpu_percent}%")
-            print(f"   💾 内存使用: {memory.percent}% ({memory.used // (1024**3)}GB / {memory.total // (1024**3)}GB)")
-            print(f"   💿 磁盘使用: {disk.percent}% ({disk.used // (1024**3)}GB / {disk.total // (1024**3)}GB)")
-        except Exception as e:
-            self.print_color('yellow', f"⚠️  资源监控失败: {e}")
-
-    def _display_container_status(self):
-        """显示容器状态"""
-        try:
-            result = subprocess.run([
-                'docker-compose', 'ps', '--format', 'table'
-            ], cwd=self.project_root, capture_output=True, text=True, check=True)
-            
-            if result.stdout:
-                self.print_color('cyan', "\n🐳 Docker容器状态：")
-                print(result.stdout)
-        except subprocess.CalledProcessError:
-            self.print_color('yellow', "⚠️  无法获取容器状态")
+        from monitor_dashboard import MonitorDashboard
+        dashboard = MonitorDashboard(
+            service_names={name: config['name'] for name, config in self.services.items()},
+            health_checks=self._get_health_checker().checks,
+            compose_project=self.project_root.name.lower(),
+            metrics_port=metrics_port,
+        )
+        dashboard.run()
+        self.print_color('green', "\n👋 退出监控模式")
 
     def stop_system(self):
         """停止系统"""
@@ -751,6 +560,39 @@ class FinancialSystemLauncher:
         time.sleep(3)
         return self.launch_system()
 
+    def build_startup_graph(self) -> 'StartupGraph':
+        """构建启动依赖图
+
+        check_environment ─┬─ env_files
+                           ├─ install_dependencies ─ prisma_generate
+                           └─ pull_images ─ setup_database
+        setup_database + prisma_generate ─ migrations
+        migrations + install_dependencies ─ start_services ─ health_check
+
+        镜像拉取与 Prisma 生成为非关键步骤，失败时下游照常执行。
+        """
+        from startup_dag import StartupGraph
+        graph = StartupGraph(max_workers=4, reporter=self.console.reporter)
+        graph.add('check_environment', self.check_environment, description='环境检查')
+        graph.add('env_files', lambda: self._setup_env_files() or True,
+                  requires=['check_environment'], description='环境配置文件')
+        graph.add('install_dependencies', self.install_dependencies,
+                  requires=['check_environment'], description='依赖安装')
+        graph.add('prisma_generate', self._generate_prisma_client,
+                  requires=['install_dependencies', 'env_files'], critical=False, description='Prisma 客户端生成')
+        graph.add('pull_images', self._pull_images,
+                  requires=['check_environment'], critical=False, description='镜像拉取')
+        graph.add('setup_database', self._start_database,
+                  requires=['pull_images'], description='数据库服务')
+        graph.add('migrations', self._run_database_migrations,
+                  requires=['setup_database', 'prisma_generate'], description='数据库迁移')
+        graph.add('start_services', self.start_services,
+                  requires=['migrations', 'env_files', 'install_dependencies'],
+                  description='应用服务启动')
+        graph.add('health_check', lambda: self.health_check() is not None,
+                  requires=['start_services'], critical=False, description='健康检查')
+        return graph
+
     def launch_system(self) -> bool:
         """完整启动流程"""
         self.display_banner()
@@ -759,20 +601,17 @@ class FinancialSystemLauncher:
         self.play_30s_light_music("系统启动")
         
         try:
-            # 启动流程
-            if not self.check_environment():
+            # 启动流程：按依赖关系并行执行
+            graph = self.build_startup_graph()
+            with telemetry.span('launch_system', mode='docker') as span:
+                success = graph.run()
+                if not success:
+                    span.fail()
+            graph.report_timings()
+            self._report_install_savings()
+            if not success:
                 return False
             
-            if not self.install_dependencies():
-                return False
-            
-            if not self.setup_database():
-                return False
-            
-            if not self.start_services():
-                return False
-            
-            self.health_check()
             self.launch_complete()
             
             return True
@@ -786,29 +625,41 @@ class FinancialSystemLauncher:
             return False
 
 def main():
-    launcher = FinancialSystemLauncher()
-    
     if len(sys.argv) > 1:
         command = sys.argv[1]
+        if command not in ('--monitor', '--stop', '--restart', '--health'):
+            print(f"未知命令: {command}")
+            print("可用命令: --monitor [--metrics-port PORT], --stop, --restart, --health")
+            return
+        launcher = FinancialSystemLauncher()
         if command == '--monitor':
-            launcher.monitor_system()
+            # 可选: --monitor --metrics-port 9108 提供 Prometheus /metrics
+            metrics_port = None
+            if '--metrics-port' in sys.argv[2:]:
+                metrics_port = int(sys.argv[sys.argv.index('--metrics-port') + 1])
+            launcher.monitor_system(metrics_port)
         elif command == '--stop':
             launcher.stop_system()
         elif command == '--restart':
             launcher.restart_system()
-        elif command == '--health':
-            launcher.health_check()
         else:
-            print(f"未知命令: {command}")
-            print("可用命令: --monitor, --stop, --restart, --health")
+            launcher.health_check()
     else:
         # 默认启动系统
-        success = launcher.launch_system()
-        if success:
-            print(f"\n{Fore.GREEN}🎯 启动成功！使用 python launch_system.py --monitor 进入监控模式{Style.RESET_ALL}")
-        else:
-            print(f"\n{Fore.RED}❌ 启动失败，请检查错误信息{Style.RESET_ALL}")
+        success = launch()
+        if not success:
             sys.exit(1)
 
+
+def launch() -> bool:
+    """Docker 镜像模式入口（供 launcher.modes 在进程内调用）"""
+    launcher = FinancialSystemLauncher()
+    success = launcher.launch_system()
+    if success:
+        print(colorize("\n🎯 启动成功！使用 python launch_system.py --monitor 进入监控模式", 'green'))
+    else:
+        print(colorize("\n❌ 启动失败，请检查错误信息", 'red'))
+    return success
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
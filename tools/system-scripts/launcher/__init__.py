@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+"""
+启动器公共库
+
+launch_system / start_local_system / three_mode_launcher / quick_start /
+fix_system_login 以及 tools/launchers/quick-launch.py 共用的部分：
+彩色输出与日志、命令检测、docker compose 调用、依赖安装、端口与就绪检查，
+以及在同一进程内切换启动模式。
+
+所有子模块按需导入：psutil、colorama 等只在真正用到时才加载，
+`import launcher` 本身几乎不产生开销。
+
+Features:
+- 🖨️ Console：统一的彩色输出 + 文件日志
+- 🧰 tools：命令检测（shutil.which）、并行获取版本、docker compose 调用
+- 🔗 services：依赖安装、端口冲突处理、HTTP/数据库就绪等待
+- 🔀 modes：a/b/c/fix 模式注册表，进程内切换
+"""
+
+__all__ = ['Console', 'MODES', 'run_mode']
+
+_EXPORTS = {
+    'Console': ('launcher.console', 'Console'),
+    'MODES': ('launcher.modes', 'MODES'),
+    'run_mode': ('launcher.modes', 'run_mode'),
+}
+
+
+def __getattr__(name):
+    """延迟导入对外名称（PEP 562）"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'launcher' has no attribute {name!r}")
+    import importlib
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
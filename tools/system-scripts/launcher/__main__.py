@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+统一入口
+
+    python -m launcher            交互选择模式
+    python -m launcher a|b|c      直接启动指定模式
+    python -m launcher status     服务状态检查
+"""
+
+import sys
+from pathlib import Path
+
+# 各启动器模块与本包位于同一目录
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from launcher.console import colorize  # noqa: E402
+from launcher.modes import MODES, run_mode  # noqa: E402
+
+
+def choose_mode() -> str:
+    print(colorize("🎯 请选择启动模式：", 'cyan', 'bold'))
+    for mode in MODES.values():
+        print(f"  {mode.key:<7} {mode.title} - {mode.description}")
+    while True:
+        try:
+            choice = input("\n模式 (回车退出): ").strip().lower()
+        except (EOFError, KeyboardInterrupt):
+            return ''
+        if not choice or choice in MODES:
+            return choice
+        print(colorize(f"❌ 无效选择，请输入 {' / '.join(MODES)}", 'red'))
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    key = argv[0].lower() if argv else choose_mode()
+    if not key:
+        return 0
+    if key not in MODES:
+        print(colorize(f"❌ 未知模式: {key}（可用: {', '.join(MODES)}）", 'red'))
+        return 2
+    try:
+        return 0 if run_mode(key) else 1
+    except KeyboardInterrupt:
+        print(colorize("\n👋 已退出", 'yellow'))
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
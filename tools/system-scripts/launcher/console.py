@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""彩色终端输出与启动器日志"""
+
+import os
+import sys
+from pathlib import Path
+
+COLORS = {
+    'red': '\033[91m',
+    'green': '\033[92m',
+    'yellow': '\033[93m',
+    'blue': '\033[94m',
+    'purple': '\033[95m',
+    'cyan': '\033[96m',
+    'white': '\033[97m',
+}
+STYLES = {
+    'bold': '\033[1m',
+    'dim': '\033[2m',
+}
+RESET = '\033[0m'
+
+_ansi_ready = False
+
+
+def enable_ansi():
+    """Windows 控制台开启 ANSI 转义；有 colorama 时用它，否则用 `os.system('')` 触发 VT 模式"""
+    global _ansi_ready
+    if _ansi_ready or os.name != 'nt':
+        _ansi_ready = True
+        return
+    try:
+        import colorama
+        colorama.just_fix_windows_console()
+    except (ImportError, AttributeError):
+        os.system('')
+    _ansi_ready = True
+
+
+def colorize(message: str, color: str = 'white', style: str = '') -> str:
+    return f"{COLORS.get(color, '')}{STYLES.get(style, '')}{message}{RESET}"
+
+
+class Console:
+    """彩色输出，同时写入 logs/<name>.log 与 telemetry 的 JSON Lines 日志
+
+    日志只写文件，不再像各脚本原先那样再通过 StreamHandler 把每条消息重复打印一遍。
+    """
+
+    def __init__(self, name: str, log_dir=None):
+        self.name = name
+        self.log_dir = Path(log_dir) if log_dir else None
+        self._logger = None
+        enable_ansi()
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            import logging
+            import telemetry
+            logger = logging.getLogger(f'launcher.{self.name}')
+            if not logger.handlers:
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                if self.log_dir is not None:
+                    self.log_dir.mkdir(parents=True, exist_ok=True)
+                    handler = logging.FileHandler(self.log_dir / f'{self.name}.log', encoding='utf-8')
+                    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+                    logger.addHandler(handler)
+                    logger.addHandler(telemetry.handler())
+                else:
+                    logger.addHandler(logging.NullHandler())
+            self._logger = logger
+        return self._logger
+
+    def print(self, message: str, color: str = 'white', style: str = ''):
+        print(colorize(message, color, style), flush=True)
+        self.logger.info(message)
+
+    def reporter(self, message: str, color: str = 'white'):
+        """StartupGraph / PortResolver 使用的 reporter(message, color) 签名"""
+        self.print(message, color)
+
+    @staticmethod
+    def clear():
+        os.system('cls' if os.name == 'nt' else 'clear')
+        sys.stdout.flush()
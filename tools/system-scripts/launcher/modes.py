@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""启动模式注册表：在当前进程内导入并运行对应启动器，不再另起 Python 解释器"""
+
+import importlib
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class Mode:
+    key: str
+    title: str
+    description: str
+    entry: str  # "模块:函数"，函数无参数，返回 bool 或退出码
+
+    def load(self):
+        module_name, function = self.entry.split(':')
+        return getattr(importlib.import_module(module_name), function)
+
+
+MODES: Dict[str, Mode] = {
+    'a': Mode('a', '本地部署方式', '无Docker依赖，纯Node.js本地开发', 'start_local_system:main'),
+    'b': Mode('b', 'Docker镜像模式', '完整容器化部署，生产环境推荐', 'launch_system:launch'),
+    'c': Mode('c', '混合模式', '前端本地 + 后端Docker', 'three_mode_launcher:launch_hybrid'),
+    'fix': Mode('fix', '登录问题修复', '自动检测环境并选择可用的启动方案', 'fix_system_login:main'),
+    'repair': Mode('repair', 'Docker系统修复', '诊断并修复 Docker 配置与镜像', 'fix_docker_system:main'),
+    'status': Mode('status', '系统状态检查', '并发检查各服务健康状态', 'health_checker:report'),
+}
+
+
+def run_mode(key: str) -> bool:
+    """运行指定模式，返回是否成功"""
+    if key not in MODES:
+        raise KeyError(f"未知启动模式: {key}（可用: {', '.join(MODES)}）")
+    result = MODES[key].load()()
+    if isinstance(result, bool) or result is None:
+        return result is not False
+    return result == 0
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""依赖安装、端口冲突处理与服务就绪等待
+
+npm_cache / readiness / port_resolver 在函数内导入，只有实际用到时才加载
+（port_resolver 依赖 psutil）。
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+DATABASE_USER = 'financial_user'
+DATABASE_NAME = 'financial_db'
+
+
+def install_packages(console, package_dirs: Iterable, max_workers: int = 3) -> bool:
+    """并行检查/安装 npm 依赖（锁文件未变化时跳过），全部成功返回 True"""
+    import npm_cache
+    results = npm_cache.install_all([Path(d) for d in package_dirs], max_workers=max_workers)
+    for package_dir, result in results.items():
+        console.print(f"{'✅' if result.ok else '❌'} {package_dir.name}: {npm_cache.describe(result)}",
+                      'green' if result.ok else 'red')
+    saved = npm_cache.total_saved(results.values())
+    if saved > 0:
+        console.print(f"⚡ 依赖缓存命中，约节省 {saved:.0f}s", 'cyan')
+    return all(result.ok for result in results.values())
+
+
+def run_parallel(tasks: Dict[str, Callable[[], bool]]) -> bool:
+    """并行执行各项任务，每项在当前 telemetry span 下记为一个子 span；全部成功返回 True"""
+    import contextvars
+    import telemetry
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(name, func):
+        with telemetry.span(name) as span:
+            ok = func()
+            if not ok:
+                span.fail()
+            return ok
+
+    with ThreadPoolExecutor(max_workers=max(1, len(tasks))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, run, name, func) for name, func in tasks.items()]
+        return all([future.result() for future in futures])
+
+
+def resolve_ports(console, project_root, ports: Dict[str, int], compose_dir=None,
+                  keep_docker: bool = True) -> Dict[str, int]:
+    """处理端口冲突，返回 {服务: 实际端口}"""
+    from port_resolver import PortResolver
+    resolver = PortResolver(project_root, compose_dir=compose_dir)
+    return resolver.resolve(ports, reporter=console.reporter, keep_docker=keep_docker)
+
+
+def report_ready(console, ready: Dict[str, Optional[float]], timeout: float) -> bool:
+    """输出 wait_for_all 的结果，全部就绪时返回 True"""
+    for name, elapsed in ready.items():
+        if elapsed is None:
+            console.print(f"⚠️  {name} {timeout:.0f}s 内未就绪", 'yellow')
+        else:
+            console.print(f"✅ {name} 已就绪 ({elapsed:.1f}s)", 'green')
+    return all(elapsed is not None for elapsed in ready.values())
+
+
+def wait_http(console, urls: Dict[str, str], timeout: float = 90) -> Dict[str, Optional[float]]:
+    """并发等待多个 HTTP 服务开始响应"""
+    import readiness
+    ready = readiness.wait_for_all({name: (lambda url=url: readiness.probe_http(url))
+                                    for name, url in urls.items()}, timeout=timeout)
+    report_ready(console, ready, timeout)
+    return ready
+
+
+def wait_databases(console, postgres_port: int = 5432, redis_port: int = 6379,
+                   timeout: float = 60, extra: Dict[str, str] = None) -> Dict[str, Optional[float]]:
+    """等待 PostgreSQL / Redis（以及可选的 HTTP 服务）就绪"""
+    import readiness
+    probes = {
+        'PostgreSQL': lambda: readiness.probe_postgres('localhost', postgres_port, DATABASE_USER, DATABASE_NAME),
+        'Redis': lambda: readiness.probe_redis('localhost', redis_port),
+    }
+    for name, url in (extra or {}).items():
+        probes[name] = lambda url=url: readiness.probe_http(url)
+    ready = readiness.wait_for_all(probes, timeout=timeout)
+    report_ready(console, ready, timeout)
+    return ready
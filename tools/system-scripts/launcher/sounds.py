@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""macOS 提示音与语音播报（其他平台为空操作）
+
+play / speak 会等待播放结束；notify 启动后立即返回，调用方可以直接退出。
+"""
+
+import shlex
+import subprocess
+import sys
+from datetime import datetime
+
+SOUNDS_DIR = '/System/Library/Sounds'
+AVAILABLE = sys.platform == 'darwin'
+
+
+def late_night(hour: int = None) -> bool:
+    """22 点到次日 8 点使用轻柔提醒"""
+    hour = datetime.now().hour if hour is None else hour
+    return hour >= 22 or hour <= 8
+
+
+def play(sound: str):
+    """播放系统提示音，如 Glass / Tink / Purr / Blow / Sosumi"""
+    if AVAILABLE:
+        subprocess.run(['afplay', f'{SOUNDS_DIR}/{sound}.aiff'],
+                       check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def speak(text: str, voice: str = None, rate: int = 140):
+    if AVAILABLE and voice:
+        subprocess.run(['say', text, '--voice', voice, '--rate', str(rate)],
+                       check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def notify(sound: str = None, text: str = None, voice: str = 'Sin-ji', rate: int = 140):
+    """不等待播放结束的提醒：先提示音再播报，放在独立进程中执行"""
+    if not AVAILABLE or not (sound or text):
+        return
+    commands = []
+    if sound:
+        commands.append(['afplay', f'{SOUNDS_DIR}/{sound}.aiff'])
+    if text and voice:
+        commands.append(['say', text, '--voice', voice, '--rate', str(rate)])
+    script = '; '.join(' '.join(shlex.quote(arg) for arg in command) for command in commands)
+    subprocess.Popen(['/bin/sh', '-c', script], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""外部命令检测与 docker compose 调用"""
+
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+TOOL_DESCRIPTIONS = {
+    'docker': 'Docker 容器引擎',
+    'docker-compose': 'Docker Compose',
+    'node': 'Node.js 运行时',
+    'npm': 'NPM 包管理器',
+}
+
+
+def has_command(name: str) -> bool:
+    """在 PATH 中查找命令，不启动子进程"""
+    if name == 'docker-compose':
+        return bool(compose_command())
+    return shutil.which(name) is not None
+
+
+def tool_version(name: str) -> Optional[str]:
+    command = compose_command() if name == 'docker-compose' else [name]
+    if not command or not shutil.which(command[0]):
+        return None
+    try:
+        result = subprocess.run(command + ['version' if command[-1] == 'compose' else '--version'],
+                                capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[0] if lines else '未知版本'
+
+
+def tool_versions(names: List[str]) -> Dict[str, Optional[str]]:
+    """并行获取多个工具的版本，未安装的为 None"""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, len(names))) as pool:
+        return dict(zip(names, pool.map(tool_version, names)))
+
+
+def check_tools(console, names: List[str], label: str = '') -> List[str]:
+    """检查并输出工具状态，返回缺失的工具列表"""
+    missing = []
+    for name, version in tool_versions(names).items():
+        description = TOOL_DESCRIPTIONS.get(name, name)
+        if version is None:
+            missing.append(name)
+            console.print(f"❌ {description} 未安装", 'red')
+        else:
+            console.print(f"✅ {description} 已安装: {version}", 'green')
+    if missing:
+        prefix = f"{label}需要安装" if label else "请安装以下必需工具"
+        console.print(f"❌ {prefix}: {', '.join(missing)}", 'red')
+    return missing
+
+
+def docker_running(timeout: float = 10) -> bool:
+    try:
+        return subprocess.run(['docker', 'info'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              timeout=timeout).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+@lru_cache(maxsize=1)
+def compose_command() -> List[str]:
+    """优先独立的 docker-compose，否则使用 `docker compose` 插件；都没有时返回空列表"""
+    if shutil.which('docker-compose'):
+        return ['docker-compose']
+    if shutil.which('docker'):
+        try:
+            if subprocess.run(['docker', 'compose', 'version'], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, timeout=10).returncode == 0:
+                return ['docker', 'compose']
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    return []
+
+
+@lru_cache(maxsize=1)
+def compose_supports_wait() -> bool:
+    """`up --wait`（等待服务 running / healthy 后返回）需要 Compose v2"""
+    command = compose_command()
+    if not command:
+        return False
+    try:
+        result = subprocess.run(command + ['up', '--help'], capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return '--wait' in result.stdout
+
+
+def compose(args: List[str], cwd, files: List[str] = (), check: bool = False,
+            capture: bool = True) -> subprocess.CompletedProcess:
+    """运行 docker compose 子命令
+
+    :param files: 额外的 -f 配置文件
+    """
+    command = compose_command() or ['docker-compose']
+    for compose_file in files:
+        command = command + ['-f', str(compose_file)]
+    return subprocess.run(command + list(args), cwd=cwd, check=check,
+                          capture_output=capture, text=True)
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+低开销实时监控面板
+
+采样与渲染分离：后台采样线程按固定周期收集指标，前台只做增量渲染
+（仅重绘发生变化的行），不再每轮清屏、阻塞采样 CPU 或启动 docker-compose 子进程。
+
+Features:
+- 🧵 后台采样线程：psutil 非阻塞 CPU/内存/磁盘与被启动进程（含子进程）指标
+- 📈 固定长度环形缓冲区生成迷你折线图（sparkline）
+- 🐳 直接调用 Docker Engine 套接字 API 获取容器 CPU/内存
+- 🖥️ ANSI 增量渲染（备用屏幕，仅重写变化行）
+- 📡 可选 Prometheus 文本格式 /metrics 端点
+"""
+
+import http.client
+import json
+import os
+import shutil
+import socket
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import psutil
+
+from health_checker import AsyncHealthChecker, ServiceCheck
+
+# 采样周期（秒）
+SAMPLE_INTERVAL = 1.0
+HEALTH_INTERVAL = 5.0
+DOCKER_INTERVAL = 5.0
+# 环形缓冲区长度（采样点数）
+HISTORY_LENGTH = 60
+DOCKER_SOCKET = '/var/run/docker.sock'
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+ANSI_COLORS = {
+    'red': '\033[91m', 'green': '\033[92m', 'yellow': '\033[93m', 'blue': '\033[94m',
+    'purple': '\033[95m', 'cyan': '\033[96m', 'white': '\033[97m', 'dim': '\033[2m', 'reset': '\033[0m',
+}
+
+
+class RingBuffer:
+    """固定长度的数值历史"""
+
+    def __init__(self, size: int = HISTORY_LENGTH):
+        self._values = deque(maxlen=size)
+
+    def append(self, value: float):
+        self._values.append(value)
+
+    @property
+    def latest(self) -> float:
+        return self._values[-1] if self._values else 0.0
+
+    def sparkline(self, width: int = 30, high: float = None) -> str:
+        """最近 width 个点的迷你折线图；high 为空时按窗口内最大值缩放"""
+        values = list(self._values)[-width:]
+        if not values:
+            return ''
+        top = high if high is not None else max(max(values), 1e-9)
+        steps = len(SPARK_CHARS) - 1
+        return ''.join(SPARK_CHARS[min(steps, max(0, round(v / top * steps)))] for v in values)
+
+
+# Docker Engine API ----------------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DockerStatsClient:
+    """通过 Docker Engine 套接字读取容器资源占用（无需启动 docker 子进程）"""
+
+    def __init__(self, socket_path: str = DOCKER_SOCKET, project: str = None, timeout: float = 2.0):
+        self.socket_path = socket_path
+        self.project = project
+        self.timeout = timeout
+        self._previous: Dict[str, tuple] = {}  # 容器 id -> (容器CPU累计, 系统CPU累计)
+
+    @property
+    def available(self) -> bool:
+        return hasattr(socket, 'AF_UNIX') and os.path.exists(self.socket_path)
+
+    def _get(self, path: str):
+        connection = _UnixHTTPConnection(self.socket_path, self.timeout)
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise OSError(f'Docker API {response.status}: {path}')
+            return json.loads(body)
+        finally:
+            connection.close()
+
+    def _containers(self) -> list:
+        if self.project:
+            filters = quote(json.dumps({'label': [f'com.docker.compose.project={self.project}']}))
+            containers = self._get(f'/containers/json?filters={filters}')
+            if containers:
+                return containers
+        return self._get('/containers/json')
+
+    def sample(self) -> List[dict]:
+        """每个运行中容器的 {name, status, cpu_percent, memory_bytes, memory_limit}"""
+        rows = []
+        for container in self._containers():
+            cid = container['Id']
+            stats = self._get(f'/containers/{cid}/stats?stream=false&one-shot=true')
+            cpu = stats.get('cpu_stats', {})
+            total = cpu.get('cpu_usage', {}).get('total_usage', 0)
+            system = cpu.get('system_cpu_usage', 0)
+            online = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+            cpu_percent = 0.0
+            previous = self._previous.get(cid)
+            if previous and system > previous[1]:
+                cpu_percent = (total - previous[0]) / (system - previous[1]) * online * 100
+            self._previous[cid] = (total, system)
+
+            memory = stats.get('memory_stats', {})
+            inner = memory.get('stats', {})
+            # cgroup v2 用 inactive_file，v1 用 cache，与 docker stats 的口径一致
+            used = memory.get('usage', 0) - inner.get('inactive_file', inner.get('cache', 0))
+            rows.append({
+                'name': container['Names'][0].lstrip('/') if container.get('Names') else cid[:12],
+                'status': container.get('Status', ''),
+                'cpu_percent': max(cpu_percent, 0.0),
+                'memory_bytes': max(used, 0),
+                'memory_limit': memory.get('limit', 0),
+            })
+        return rows
+
+
+# 采样 -----------------------------------------------------------------------
+
+class MetricsSampler(threading.Thread):
+    """后台采样线程；snapshot() 返回最近一次采样结果的副本"""
+
+    def __init__(self, processes: Dict[str, int] = None, health_checks: List[ServiceCheck] = None,
+                 docker: DockerStatsClient = None, interval: float = SAMPLE_INTERVAL,
+                 health_interval: float = HEALTH_INTERVAL, docker_interval: float = DOCKER_INTERVAL,
+                 history: int = HISTORY_LENGTH):
+        super().__init__(name='metrics-sampler', daemon=True)
+        self.processes = dict(processes or {})
+        self.health_checks = health_checks or []
+        self.docker = docker
+        self.interval = interval
+        self.health_interval = health_interval
+        self.docker_interval = docker_interval
+        self.history = {'cpu': RingBuffer(history), 'memory': RingBuffer(history)}
+        self.process_history: Dict[str, RingBuffer] = {name: RingBuffer(history) for name in self.processes}
+        self._tracked: Dict[int, psutil.Process] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._snapshot = {'system': {}, 'processes': {}, 'health': {}, 'containers': None, 'updated': None}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: (value.copy() if isinstance(value, dict) else value)
+                    for key, value in self._snapshot.items()}
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        psutil.cpu_percent(interval=None)  # 预热：之后的调用返回两次调用之间的占用率
+        checker = AsyncHealthChecker(self.health_checks) if self.health_checks else None
+        next_health = next_docker = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                update = {'system': self._sample_system(), 'processes': self._sample_processes(),
+                          'updated': datetime.now()}
+                if checker and now >= next_health:
+                    update['health'] = checker.check()
+                    next_health = now + self.health_interval
+                if self.docker and now >= next_docker:
+                    update['containers'] = self._sample_docker()
+                    next_docker = now + self.docker_interval
+                with self._lock:
+                    self._snapshot.update(update)
+                self._stop.wait(self.interval)
+        finally:
+            if checker:
+                checker.close()
+
+    def _sample_system(self) -> dict:
+        cpu = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(os.path.abspath(os.sep))
+        self.history['cpu'].append(cpu)
+        self.history['memory'].append(memory.percent)
+        return {'cpu': cpu, 'memory_percent': memory.percent, 'memory_used': memory.used,
+                'memory_total': memory.total, 'disk_percent': disk.percent}
+
+    def _process(self, pid: int) -> psutil.Process:
+        process = self._tracked.get(pid)
+        if process is None:
+            process = self._tracked[pid] = psutil.Process(pid)
+            process.cpu_percent(interval=None)  # 预热
+        return process
+
+    def _sample_processes(self) -> dict:
+        """被启动进程及其子进程（npm → node）的合计 CPU/RSS"""
+        result = {}
+        alive = set()
+        for name, pid in self.processes.items():
+            try:
+                root = self._process(pid)
+                members = [root] + [self._process(child.pid) for child in root.children(recursive=True)]
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                result[name] = None
+                continue
+            cpu = rss = 0.0
+            for member in members:
+                try:
+                    cpu += member.cpu_percent(interval=None)
+                    rss += member.memory_info().rss
+                    alive.add(member.pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            self.process_history[name].append(cpu)
+            result[name] = {'pid': pid, 'cpu': cpu, 'rss': rss, 'count': len(members)}
+        for pid in set(self._tracked) - alive:
+            del self._tracked[pid]
+        return result
+
+    def _sample_docker(self):
+        try:
+            return self.docker.sample()
+        except (OSError, ValueError, http.client.HTTPException):
+            return None
+
+
+# 渲染 -----------------------------------------------------------------------
+
+def _char_width(ch: str) -> int:
+    return 2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1
+
+
+def fit(text: str, width: int) -> str:
+    """按终端显示宽度截断（行尾由 \\033[K 清除）"""
+    used = 0
+    for i, ch in enumerate(text):
+        used += _char_width(ch)
+        if used > width:
+            return text[:i]
+    return text
+
+
+class DeltaRenderer:
+    """只重写发生变化的行；非终端输出时退化为逐帧打印"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self._previous: List[str] = []
+        self._size = None
+
+    def __enter__(self):
+        if self.interactive:
+            self.stream.write('\033[?1049h\033[?25l')  # 备用屏幕 + 隐藏光标
+            self.stream.flush()
+        return self
+
+    def __exit__(self, *exc):
+        if self.interactive:
+            self.stream.write('\033[?25h\033[?1049l')
+            self.stream.flush()
+
+    def render(self, lines: List[tuple]):
+        """lines 为 [(文本, 颜色)]"""
+        if not self.interactive:
+            for text, _ in lines:
+                self.stream.write(text + '\n')
+            self.stream.write('\n')
+            self.stream.flush()
+            return
+
+        size = shutil.get_terminal_size()
+        if size != self._size:
+            self._size = size
+            self._previous = []
+            self.stream.write('\033[2J')
+        rows = [f"{ANSI_COLORS.get(color, '')}{fit(text, size.columns - 1)}{ANSI_COLORS['reset']}"
+                for text, color in lines[:size.lines - 1]]
+        rows += [''] * max(0, len(self._previous) - len(rows))
+        out = []
+        for row_number, row in enumerate(rows):
+            if row_number >= len(self._previous) or self._previous[row_number] != row:
+                out.append(f'\033[{row_number + 1};1H{row}\033[K')
+        if out:
+            self.stream.write(''.join(out))
+            self.stream.flush()
+        self._previous = rows
+
+
+# Prometheus -----------------------------------------------------------------
+
+def prometheus_text(snapshot: dict) -> str:
+    """把采样快照转换为 Prometheus 文本格式"""
+    lines = []
+
+    def metric(name, value, labels=None, help_text=None):
+        if help_text:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+        label_text = ''
+        if labels:
+            label_text = '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+        lines.append(f'{name}{label_text} {value}')
+
+    system = snapshot.get('system') or {}
+    if system:
+        metric('financial_system_cpu_percent', system['cpu'], help_text='Host CPU usage')
+        metric('financial_system_memory_percent', system['memory_percent'], help_text='Host memory usage')
+        metric('financial_system_disk_percent', system['disk_percent'], help_text='Root disk usage')
+    for i, (name, result) in enumerate((snapshot.get('health') or {}).items()):
+        metric('financial_service_up', int(result.healthy), {'service': name},
+               'Service health (1 = up)' if i == 0 else None)
+        metric('financial_service_latency_ms', round(result.latency_ms, 2), {'service': name},
+               'Health probe latency' if i == 0 else None)
+    for i, (name, proc) in enumerate((snapshot.get('processes') or {}).items()):
+        if proc:
+            metric('financial_process_cpu_percent', proc['cpu'], {'process': name},
+                   'Launched process CPU including children' if i == 0 else None)
+            metric('financial_process_rss_bytes', int(proc['rss']), {'process': name},
+                   'Launched process RSS including children' if i == 0 else None)
+    for i, container in enumerate(snapshot.get('containers') or []):
+        metric('financial_container_cpu_percent', round(container['cpu_percent'], 2),
+               {'container': container['name']}, 'Container CPU usage' if i == 0 else None)
+        metric('financial_container_memory_bytes', container['memory_bytes'],
+               {'container': container['name']}, 'Container memory usage' if i == 0 else None)
+    return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(sampler: MetricsSampler, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """在后台线程提供 /metrics"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text(sampler.snapshot()).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-endpoint', daemon=True).start()
+    return server
+
+
+# 面板 -----------------------------------------------------------------------
+
+def _gb(value: float) -> str:
+    return f'{value / 1024 ** 3:.1f}GB'
+
+
+def _mb(value: float) -> str:
+    return f'{value / 1024 ** 2:.0f}MB'
+
+
+class MonitorDashboard:
+    """监控面板：组合采样线程、增量渲染和可选的 /metrics 端点"""
+
+    def __init__(self, service_names: Dict[str, str], health_checks: List[ServiceCheck],
+                 processes: Dict[str, int] = None, compose_project: str = None,
+                 log_source=None, metrics_port: Optional[int] = None, refresh: float = 1.0):
+        """
+        :param service_names: 服务 id -> 显示名称
+        :param processes: 需要跟踪的进程 名称 -> PID
+        :param log_source: 可选 ProcessLogMultiplexer，显示最近输出
+        :param metrics_port: 指定时在该端口提供 Prometheus /metrics
+        """
+        self.service_names = service_names
+        docker = DockerStatsClient(project=compose_project)
+        self.sampler = MetricsSampler(processes, health_checks, docker if docker.available else None)
+        self.log_source = log_source
+        self.metrics_port = metrics_port
+        self.refresh = refresh
+
+    def build_lines(self, snapshot: dict) -> List[tuple]:
+        lines = []
+        updated = snapshot.get('updated')
+        stamp = updated.strftime('%Y-%m-%d %H:%M:%S') if updated else '采样中...'
+        lines.append((f"📊 智能财务管理系统 · 实时监控    {stamp}    (Ctrl+C 退出)", 'cyan'))
+        if self.metrics_port:
+            lines.append((f"📡 Prometheus: http://127.0.0.1:{self.metrics_port}/metrics", 'dim'))
+        lines.append(('', 'white'))
+
+        system = snapshot.get('system') or {}
+        history = self.sampler.history
+        if system:
+            lines.append(("💻 系统资源", 'blue'))
+            lines.append((f"   CPU   {system['cpu']:5.1f}%  {history['cpu'].sparkline(40, 100)}",
+                          'red' if system['cpu'] > 85 else 'white'))
+            lines.append((f"   内存  {system['memory_percent']:5.1f}%  {history['memory'].sparkline(40, 100)}  "
+                          f"{_gb(system['memory_used'])} / {_gb(system['memory_total'])}",
+                          'red' if system['memory_percent'] > 90 else 'white'))
+            lines.append((f"   磁盘  {system['disk_percent']:5.1f}%", 'white'))
+            lines.append(('', 'white'))
+
+        health = snapshot.get('health') or {}
+        if health:
+            lines.append(("🩺 服务状态", 'blue'))
+            for name, result in health.items():
+                label = self.service_names.get(name, name)
+                icon = '✅' if result.healthy else '❌'
+                lines.append((f"   {icon} {label:<10} {result.latency_ms:7.1f} ms  {result.detail}",
+                              'green' if result.healthy else 'yellow'))
+            up = sum(r.healthy for r in health.values())
+            lines.append((f"   📊 健康度 {up * 100 // len(health)}% ({up}/{len(health)})", 'cyan'))
+            lines.append(('', 'white'))
+
+        processes = snapshot.get('processes') or {}
+        if processes:
+            lines.append(("⚙️ 进程", 'blue'))
+            for name, proc in processes.items():
+                if proc is None:
+                    lines.append((f"   {name:<10} 已退出", 'red'))
+                    continue
+                spark = self.sampler.process_history[name].sparkline(30)
+                lines.append((f"   {name:<10} pid {proc['pid']:<7} CPU {proc['cpu']:5.1f}%  "
+                              f"RSS {_mb(proc['rss']):>6}  ({proc['count']} 个进程)  {spark}", 'white'))
+            lines.append(('', 'white'))
+
+        containers = snapshot.get('containers')
+        if self.sampler.docker:
+            lines.append(("🐳 容器", 'blue'))
+            if containers is None:
+                lines.append(("   ⚠️  无法读取 Docker 容器状态", 'yellow'))
+            elif not containers:
+                lines.append(("   (没有运行中的容器)", 'dim'))
+            for container in containers or []:
+                limit = f" / {_mb(container['memory_limit'])}" if container['memory_limit'] else ''
+                lines.append((f"   {container['name']:<28} CPU {container['cpu_percent']:5.1f}%  "
+                              f"MEM {_mb(container['memory_bytes'])}{limit}  {container['status']}", 'white'))
+            lines.append(('', 'white'))
+
+        if self.log_source is not None:
+            lines.append(("📋 最近输出", 'blue'))
+            for line in self.log_source.tail(lines=8):
+                lines.append((f"   {line}", 'dim'))
+        return lines
+
+    def run(self):
+        """前台渲染直到 Ctrl+C"""
+        self.sampler.start()
+        server = serve_metrics(self.sampler, self.metrics_port) if self.metrics_port else None
+        # 非终端输出（重定向到文件）时降低刷新频率
+        refresh = self.refresh if sys.stdout.isatty() else max(self.refresh, 10.0)
+        try:
+            with DeltaRenderer() as renderer:
+                while True:
+                    renderer.render(self.build_lines(self.sampler.snapshot()))
+                    time.sleep(refresh)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sampler.stop()
+            if server:
+                server.shutdown()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+npm 依赖安装缓存
+
+以 package-lock.json（无锁文件时为 package.json）内容、Node 版本和平台计算指纹，
+安装成功后把指纹写入 node_modules/.install-stamp。再次启动时指纹一致即跳过安装；
+锁文件变化时使用 `npm ci` 做干净、可复现的安装。
+
+Features:
+- 🔑 锁文件 + Node 版本 + 平台指纹，命中即跳过 npm install
+- 🧹 锁文件变化时使用 npm ci
+- 🔀 多个目录并行安装
+- ⏱️ 记录每次安装耗时，命中缓存时报告节省的时间
+"""
+
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable
+
+STAMP_NAME = '.install-stamp'
+
+
+@dataclass
+class InstallResult:
+    """一次依赖检查/安装的结果"""
+    directory: Path
+    action: str          # cached / ci / install / failed / skipped
+    duration: float = 0.0
+    saved: float = 0.0   # 命中缓存时，上次实际安装的耗时
+    error: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return self.action != 'failed'
+
+
+@lru_cache(maxsize=1)
+def node_version() -> str:
+    try:
+        return subprocess.run(['node', '--version'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def lock_file(package_dir: Path) -> Path:
+    """优先使用 package-lock.json，没有时退回 package.json"""
+    lock = package_dir / 'package-lock.json'
+    return lock if lock.exists() else package_dir / 'package.json'
+
+
+def fingerprint(package_dir: Path) -> str:
+    digest = hashlib.sha256()
+    digest.update(lock_file(package_dir).read_bytes())
+    digest.update(f'\0{node_version()}\0{sys.platform}\0{platform.machine()}'.encode())
+    return digest.hexdigest()
+
+
+def read_stamp(package_dir: Path) -> dict:
+    try:
+        return json.loads((package_dir / 'node_modules' / STAMP_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_stamp(package_dir: Path, digest: str, duration: float):
+    stamp = {
+        'fingerprint': digest,
+        'node': node_version(),
+        'lock_file': lock_file(package_dir).name,
+        'duration': round(duration, 2),
+        'installed_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    (package_dir / 'node_modules' / STAMP_NAME).write_text(json.dumps(stamp, indent=2), encoding='utf-8')
+
+
+def ensure_installed(package_dir, force: bool = False) -> InstallResult:
+    """按需安装单个目录的依赖
+
+    指纹与 node_modules 中的记录一致时直接返回 cached；
+    有 package-lock.json 时使用 npm ci，否则 npm install。
+    """
+    package_dir = Path(package_dir)
+    if not (package_dir / 'package.json').exists():
+        return InstallResult(package_dir, 'skipped')
+
+    digest = fingerprint(package_dir)
+    stamp = read_stamp(package_dir)
+    if not force and stamp.get('fingerprint') == digest:
+        return InstallResult(package_dir, 'cached', saved=stamp.get('duration', 0.0))
+
+    action = 'ci' if (package_dir / 'package-lock.json').exists() else 'install'
+    started = time.perf_counter()
+    try:
+        subprocess.run(['npm', action], cwd=package_dir, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        error = (e.stderr or b'').decode('utf-8', 'replace').strip().splitlines()
+        return InstallResult(package_dir, 'failed', time.perf_counter() - started,
+                             error=error[-1] if error else str(e))
+    except OSError as e:
+        return InstallResult(package_dir, 'failed', error=str(e))
+    duration = time.perf_counter() - started
+    write_stamp(package_dir, digest, duration)
+    return InstallResult(package_dir, action, duration)
+
+
+def install_all(package_dirs: Iterable, max_workers: int = 3, force: bool = False) -> Dict[Path, InstallResult]:
+    """并行检查/安装多个目录，返回 {目录: InstallResult}"""
+    package_dirs = [Path(d) for d in package_dirs]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(package_dirs)))) as pool:
+        results = pool.map(lambda d: ensure_installed(d, force), package_dirs)
+        return dict(zip(package_dirs, results))
+
+
+def describe(result: InstallResult) -> str:
+    """单行结果说明，供各启动器输出"""
+    if result.action == 'cached':
+        return f"依赖未变化，跳过安装（节省约 {result.saved:.0f}s）"
+    if result.action == 'skipped':
+        return "无 package.json，跳过"
+    if result.action == 'failed':
+        return f"安装失败: {result.error}"
+    return f"npm {result.action} 完成 ({result.duration:.1f}s)"
+
+
+def total_saved(results: Iterable[InstallResult]) -> float:
+    return sum(r.saved for r in results if r.action == 'cached')
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+路径排除匹配器
+
+普通路径前缀（如 `backend/node_modules/`）放进按路径分段的前缀树，按段比较，
+`dist` 不会再误伤 `distribution`；含通配符的 gitignore 风格规则翻译成一个合并的正则，
+一次 fullmatch 即可得到"最后一条匹配规则"的结论。遍历目录时先判断再下探，
+被排除的子树根本不会被读取。项目统计（update_stats）与目录结构生成器共用。
+
+Features:
+- 🌲 路径前缀树：按路径段匹配，没有子串误判
+- 🧩 gitignore 语法：`*` `?` `[...]` `**` `!取反` `目录/` `/锚定`，合并为单个正则
+- 🙈 遵循 .gitignore（含上级目录与子目录中的 .gitignore）
+- ✂️ 遍历时剪枝：被排除的目录不再进入
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def translate(pattern: str) -> Tuple[str, bool, bool]:
+    """把一条 gitignore 规则翻译为正则，返回 (正则, 是否取反, 是否仅匹配目录)"""
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith(('\\!', '\\#')):
+        pattern = pattern[1:]
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # 开头或中间有 / 时相对规则所在目录锚定，否则匹配任意层级的同名路径
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex, i, n = [], 0, len(pattern)
+    while i < n:
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            regex.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i) and i + 2 == n and (i == 0 or pattern[i - 1] == '/'):
+            regex.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            regex.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            regex.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                regex.append(re.escape('['))
+                i += 1
+                continue
+            body = pattern[i + 1:end].replace('\\', '\\\\')
+            if body[0] in '!^':
+                body = '^' + body[1:]
+            regex.append(f'[{body}]')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < n:
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return prefix + ''.join(regex), negate, dir_only
+
+
+class Rules:
+    """一组 gitignore 风格规则，编译为两个合并正则（目录 / 文件各一个）
+
+    各条规则按倒序排列成分支，第一个匹配的分支就是 gitignore 语义下起决定作用的最后一条规则。
+    """
+
+    def __init__(self, patterns: Iterable[str], base: str = ''):
+        self.base = base.strip('/')
+        self.patterns = [p.rstrip() for p in patterns if p.strip() and not p.startswith('#')]
+        compiled = [translate(p) for p in self.patterns]
+        self._dirs = self._combine(compiled)
+        self._files = self._combine([c for c in compiled if not c[2]])
+
+    @staticmethod
+    def _combine(compiled):
+        if not compiled:
+            return None
+        ordered = list(reversed(compiled))
+        regex = re.compile('|'.join(f'({regex})' for regex, _, _ in ordered))
+        return regex, [negate for _, negate, _ in ordered]
+
+    def match(self, rel_path: str, is_dir: bool = False) -> Optional[bool]:
+        """排除返回 True，被 `!` 规则重新包含返回 False，没有规则匹配返回 None"""
+        combined = self._dirs if is_dir else self._files
+        if combined is None:
+            return None
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        regex, negations = combined
+        m = regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not negations[m.lastindex - 1]
+
+
+class PrefixTrie:
+    """按路径段组织的前缀树，任一祖先（或自身）被加入即视为覆盖"""
+
+    _END = ''
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self.root: Dict[str, dict] = {}
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: str):
+        node = self.root
+        for part in _parts(path):
+            node = node.setdefault(part, {})
+        node[self._END] = {}
+
+    def covers(self, rel_path: str) -> bool:
+        node = self.root
+        if self._END in node:
+            return True
+        for part in _parts(rel_path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def __bool__(self):
+        return bool(self.root)
+
+
+def _parts(path: str) -> List[str]:
+    return [part for part in path.replace('\\', '/').split('/') if part and part != '.']
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in '*?[!')
+
+
+class PathMatcher:
+    """前缀树 + gitignore 规则；子目录的 .gitignore 通过 parent 链叠加，越深的规则优先"""
+
+    def __init__(self, prefixes: Iterable[str] = (), patterns: Iterable[str] = (), base: str = '',
+                 parent: 'PathMatcher' = None):
+        self.trie = PrefixTrie(prefixes)
+        self.rules = Rules(patterns, base)
+        self.parent = parent
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str]) -> 'PathMatcher':
+        """配置中的排除路径：普通路径（相对项目根目录）进前缀树，含通配符的按 gitignore 规则处理"""
+        prefixes, patterns = [], []
+        for path in paths:
+            path = path.replace('\\', '/')
+            (patterns if _is_glob(path) else prefixes).append(path)
+        return cls(prefixes, patterns)
+
+    def hides(self, rel_path: str, is_dir: bool = False) -> bool:
+        """路径本身或它的任一祖先目录被排除"""
+        parts = _parts(rel_path)
+        for depth in range(1, len(parts)):
+            if self.excluded('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return self.excluded('/'.join(parts), is_dir)
+
+    def child(self, base: str, patterns: Iterable[str]) -> 'PathMatcher':
+        return PathMatcher(patterns=patterns, base=base, parent=self)
+
+    def excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        """只判断路径本身；祖先目录是否被排除由遍历（或 TreeMatcher.visible）负责"""
+        rel_path = rel_path.replace(os.sep, '/')
+        matcher = self
+        while matcher is not None:
+            if matcher.trie and matcher.trie.covers(rel_path):
+                return True
+            result = matcher.rules.match(rel_path, is_dir)
+            if result is not None:
+                return result
+            matcher = matcher.parent
+        return False
+
+
+def compile_globs(globs: Iterable[str]):
+    """把 includeFiles 之类的文件名通配符合并为一个正则；为空时返回 None"""
+    globs = list(globs)
+    if not globs:
+        return None
+    return re.compile('|'.join(translate(glob)[0] for glob in globs))
+
+
+def read_gitignore(path: Path) -> List[str]:
+    try:
+        return path.read_text(encoding='utf-8', errors='replace').splitlines()
+    except OSError:
+        return []
+
+
+def _git_root(path: Path) -> Optional[Path]:
+    for candidate in (path, *path.parents):
+        if (candidate / '.git').exists():
+            return candidate
+    return None
+
+
+class TreeMatcher:
+    """某个根目录下的排除判断：基础规则 + 沿途各级 .gitignore
+
+    所有路径都相对 root，使用 / 分隔。
+    """
+
+    def __init__(self, root, matcher: PathMatcher = None, gitignore: bool = True):
+        self.root = Path(root).resolve()
+        self.gitignore = gitignore
+        base = matcher or PathMatcher()
+        if gitignore:
+            base = self._with_ancestor_gitignores(base)
+        self._matchers: Dict[str, PathMatcher] = {'': self._load(base, '')}
+
+    def _with_ancestor_gitignores(self, matcher: PathMatcher) -> PathMatcher:
+        """root 位于仓库子目录时，仓库根目录到 root 之间的 .gitignore 同样生效"""
+        git_root = _git_root(self.root)
+        if git_root is None or git_root == self.root:
+            return matcher
+        parts = self.root.relative_to(git_root).parts
+        for depth in range(len(parts)):
+            lines = read_gitignore(git_root.joinpath(*parts[:depth]) / '.gitignore')
+            if lines:
+                matcher = matcher.child('', _rebase(lines, '/'.join(parts[depth:])))
+        return matcher
+
+    def _load(self, parent: PathMatcher, rel_dir: str) -> PathMatcher:
+        if not self.gitignore:
+            return parent
+        lines = read_gitignore(self.root / rel_dir / '.gitignore')
+        return parent.child(rel_dir, lines) if lines else parent
+
+    def matcher_for(self, rel_dir: str) -> PathMatcher:
+        """作用于 rel_dir 目录内各条目的匹配器（逐级加载 .gitignore 并缓存）"""
+        rel_dir = rel_dir.replace(os.sep, '/').strip('/')
+        if rel_dir in ('', '.'):
+            return self._matchers['']
+        matcher = self._matchers.get(rel_dir)
+        if matcher is None:
+            parent_dir = rel_dir.rpartition('/')[0]
+            matcher = self._load(self.matcher_for(parent_dir), rel_dir)
+            self._matchers[rel_dir] = matcher
+        return matcher
+
+    def excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        rel_path = rel_path.replace(os.sep, '/').strip('/')
+        return self.matcher_for(rel_path.rpartition('/')[0]).excluded(rel_path, is_dir)
+
+    def visible(self, rel_path: str, is_dir: bool = False) -> bool:
+        """路径本身及其所有祖先目录都未被排除（遍历时会被访问到）"""
+        parts = _parts(rel_path)
+        for depth in range(1, len(parts)):
+            if self.excluded('/'.join(parts[:depth]), is_dir=True):
+                return False
+        return not self.excluded('/'.join(parts), is_dir)
+
+    def listdir(self, rel_dir: str = '') -> Tuple[List[str], List[str]]:
+        """rel_dir 下未被排除的 (子目录名, 文件名)，均已排序；目录不可读时抛出 OSError"""
+        rel_dir = rel_dir.replace(os.sep, '/').strip('/')
+        rel_dir = '' if rel_dir == '.' else rel_dir
+        matcher = self.matcher_for(rel_dir)
+        dirs, files = [], []
+        with os.scandir(self.root / rel_dir) as entries:
+            for entry in entries:
+                rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if matcher.excluded(rel_path, is_dir):
+                    continue
+                (dirs if is_dir else files).append(entry.name)
+        dirs.sort()
+        files.sort()
+        return dirs, files
+
+    def walk(self, top: str = '') -> Iterator[Tuple[str, List[str], List[str]]]:
+        """类似 os.walk，但返回相对 root 的路径，并在下探前剪掉被排除的目录
+
+        与 os.walk 一样，调用方可以就地修改返回的目录列表来进一步剪枝。
+        """
+        top = top.replace(os.sep, '/').strip('/')
+        stack = ['' if top == '.' else top]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                dirs, files = self.listdir(rel_dir)
+            except OSError:
+                continue
+            yield rel_dir, dirs, files
+            stack.extend(f'{rel_dir}/{d}' if rel_dir else d for d in reversed(dirs))
+
+
+def _rebase(lines: List[str], prefix: str) -> List[str]:
+    """把上级目录 .gitignore 的规则改写为相对其子目录 prefix 的规则
+
+    未锚定的规则（任意层级）原样保留；锚定规则只保留字面上以 prefix 开头的部分，其余丢弃
+    （前缀部分含通配符的规则不做展开）。
+    """
+    if not prefix:
+        return lines
+    rebased = []
+    for line in lines:
+        stripped = line.rstrip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        negate = '!' if stripped.startswith('!') else ''
+        body = stripped[len(negate):]
+        if '/' not in body.rstrip('/') or body.startswith('**/'):
+            rebased.append(stripped)
+        elif body.lstrip('/').startswith(prefix + '/'):
+            rebased.append(negate + '/' + body.lstrip('/')[len(prefix) + 1:])
+    return rebased
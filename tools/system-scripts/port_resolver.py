@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+端口冲突解析
+
+一次 psutil.net_connections() 快照按端口建立索引，一次性找出所有被占用端口的
+进程（PID、名称、命令行），然后为每个冲突决定处理方式：
+
+- 项目自身遗留的开发服务器（工作目录在项目内）→ 一次性终止
+- Docker 端口转发进程 → 默认保留（docker-compose down 会释放本项目的容器）
+- 其他进程 → 分配备用端口，并同步改写 backend/.env、frontend/.env.local
+  与 docker-compose.override.yml；冲突消失后恢复默认端口
+
+Features:
+- 📸 单次连接快照，避免每个端口重复遍历系统连接表或启动 lsof/netstat
+- 🔎 冲突进程及命令行一次解析
+- 🔀 自动分配备用端口并一致地改写配置
+"""
+
+import json
+import os
+import re
+import shutil
+import socket
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psutil
+
+# 各服务在容器内监听的端口（compose 覆盖文件只改宿主机一侧）
+CONTAINER_PORTS = {'frontend': 3000, 'backend': 8000, 'postgres': 5432, 'redis': 6379, 'pgadmin': 80}
+# 备用端口的搜索范围
+ALTERNATIVE_SEARCH = 100
+COMPOSE_OVERRIDE = 'docker-compose.override.yml'
+OVERRIDE_HEADER = '# 由 port_resolver 自动生成：端口冲突时的宿主机端口映射'
+# 记录上次改写到 .env 的备用端口，冲突消失后据此恢复默认端口（本地模式没有覆盖文件可判断）
+STATE_FILE = '.port-resolver.json'
+# Docker 在宿主机上转发端口的进程
+DOCKER_PROXIES = {'docker-proxy', 'com.docker.backend', 'vpnkit', 'com.docker.vpnkit'}
+
+
+@dataclass
+class PortOwner:
+    """占用端口的进程"""
+    pid: Optional[int]
+    name: str = ''
+    cmdline: str = ''
+    cwd: str = ''
+
+    def describe(self) -> str:
+        if self.pid is None:
+            return '未知进程（无权限读取）'
+        command = self.cmdline or self.name
+        if len(command) > 80:
+            command = command[:77] + '...'
+        return f'PID {self.pid} {command}'
+
+    @property
+    def is_docker(self) -> bool:
+        return self.name in DOCKER_PROXIES
+
+
+@dataclass
+class PortConflict:
+    """一个被占用的服务端口及处理方案"""
+    service: str
+    port: int
+    owners: List[PortOwner] = field(default_factory=list)
+    action: str = 'reassign'   # terminate / reassign / docker
+    new_port: Optional[int] = None
+
+
+class PortSnapshot:
+    """一次连接表快照，按本地端口索引监听中的套接字"""
+
+    def __init__(self):
+        self.listeners: Dict[int, List[PortOwner]] = {}
+        self.complete = True
+        self._owners: Dict[int, PortOwner] = {}
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except psutil.AccessDenied:
+            # macOS 非 root 时无法读取全局连接表，退回逐端口探测
+            self.complete = False
+            return
+        for conn in connections:
+            if not conn.laddr:
+                continue
+            if conn.status != psutil.CONN_LISTEN and conn.type != socket.SOCK_DGRAM:
+                continue
+            owners = self.listeners.setdefault(conn.laddr.port, [])
+            owner = self._owner(conn.pid)
+            if all(o.pid != owner.pid for o in owners):
+                owners.append(owner)
+
+    def _owner(self, pid: Optional[int]) -> PortOwner:
+        if pid is None:
+            return PortOwner(None)
+        if pid not in self._owners:
+            owner = PortOwner(pid)
+            try:
+                process = psutil.Process(pid)
+                with process.oneshot():
+                    owner.name = process.name()
+                    owner.cmdline = ' '.join(process.cmdline())
+                    owner.cwd = process.cwd()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+            self._owners[pid] = owner
+        return self._owners[pid]
+
+    def in_use(self, port: int) -> bool:
+        if port in self.listeners:
+            return True
+        if self.complete:
+            return False
+        return _bind_refused(port)
+
+    def owners(self, port: int) -> List[PortOwner]:
+        return self.listeners.get(port, [])
+
+    def find_free_port(self, start: int, reserved=()) -> Optional[int]:
+        """从 start 起找第一个未被监听、且未被预留的端口"""
+        for port in range(start, min(start + ALTERNATIVE_SEARCH, 65536)):
+            if port not in reserved and port not in self.listeners and not _bind_refused(port):
+                return port
+        return None
+
+
+def _bind_refused(port: int) -> bool:
+    """能否绑定端口（快照之外的最终确认）"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(('0.0.0.0', port))
+            return False
+        except OSError:
+            return True
+
+
+def _inside(path: str, root: Path) -> bool:
+    try:
+        return bool(path) and Path(path).resolve().is_relative_to(root.resolve())
+    except (OSError, ValueError):
+        return False
+
+
+class PortResolver:
+    """为一组服务端口生成并执行冲突处理方案"""
+
+    def __init__(self, project_root, compose_dir=None):
+        """
+        :param compose_dir: docker-compose.yml 所在目录；为空时（本地模式）不生成覆盖文件
+        """
+        self.project_root = Path(project_root)
+        self.compose_dir = Path(compose_dir) if compose_dir else None
+
+    def plan(self, ports: Dict[str, int], keep_docker: bool = True) -> List[PortConflict]:
+        """一次快照内找出全部冲突
+
+        :param ports: 服务名 -> 期望端口
+        :param keep_docker: True 时 Docker 转发的端口标记为 docker 而不重新分配
+            （通常是本项目上次未停止的容器）
+        """
+        snapshot = PortSnapshot()
+        conflicts = []
+        reserved = set(ports.values())
+        for service, port in ports.items():
+            if not snapshot.in_use(port):
+                continue
+            owners = snapshot.owners(port)
+            conflict = PortConflict(service, port, owners)
+            if owners and all(o.pid is not None and _inside(o.cwd, self.project_root) for o in owners):
+                conflict.action = 'terminate'
+            elif keep_docker and owners and all(o.is_docker for o in owners):
+                conflict.action = 'docker'
+            else:
+                conflict.new_port = snapshot.find_free_port(port + 1, reserved)
+                if conflict.new_port is not None:
+                    reserved.add(conflict.new_port)
+            conflicts.append(conflict)
+        return conflicts
+
+    def terminate(self, conflicts: List[PortConflict], timeout: float = 3.0) -> List[PortConflict]:
+        """一次性终止所有 terminate 方案的进程，返回仍未释放的冲突"""
+        targets = {}
+        for conflict in conflicts:
+            if conflict.action != 'terminate':
+                continue
+            for owner in conflict.owners:
+                if owner.pid is not None and owner.pid != os.getpid():
+                    try:
+                        targets[owner.pid] = psutil.Process(owner.pid)
+                    except psutil.NoSuchProcess:
+                        pass
+        for process in targets.values():
+            try:
+                process.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(list(targets.values()), timeout=timeout)
+        for process in alive:
+            try:
+                process.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        psutil.wait_procs(alive, timeout=1)
+
+        snapshot = PortSnapshot()
+        return [c for c in conflicts if c.action == 'terminate' and snapshot.in_use(c.port)]
+
+    def resolve(self, ports: Dict[str, int], reporter=None, keep_docker: bool = True) -> Dict[str, int]:
+        """检查 → 终止遗留进程 → 重新分配端口，返回 {服务: 实际端口}
+
+        :param reporter: reporter(message, color)，与 StartupGraph 的输出方式一致
+        """
+        report = reporter or (lambda message, color: print(message))
+        conflicts = self.plan(ports, keep_docker)
+        busy = {c.service for c in conflicts}
+        for service, port in ports.items():
+            if service not in busy:
+                report(f"✅ 端口 {port} ({service}) 可用", 'green')
+        for conflict in conflicts:
+            owners = '、'.join(o.describe() for o in conflict.owners) or '未知进程'
+            report(f"⚠️  端口 {conflict.port} ({conflict.service}) 被占用: {owners}", 'yellow')
+
+        if any(c.action == 'terminate' for c in conflicts):
+            stuck = {c.service for c in self.terminate(conflicts)}
+            for conflict in conflicts:
+                if conflict.action != 'terminate':
+                    continue
+                if conflict.service in stuck:
+                    report(f"❌ 无法释放端口 {conflict.port}，请手动处理", 'red')
+                else:
+                    report(f"✅ 已终止项目遗留进程，端口 {conflict.port} 已释放", 'green')
+        for conflict in conflicts:
+            if conflict.action == 'docker':
+                report(f"🐳 端口 {conflict.port} 由 Docker 占用，重建容器时释放", 'cyan')
+            elif conflict.action == 'reassign' and conflict.new_port is None:
+                report(f"❌ 端口 {conflict.port} 附近没有可用端口，请手动处理", 'red')
+            elif conflict.action == 'reassign':
+                report(f"🔀 {conflict.service} 改用端口 {conflict.new_port}", 'cyan')
+
+        effective = self.apply(ports, conflicts)
+        if effective != ports:
+            written = f".env 与 {COMPOSE_OVERRIDE}" if self.compose_dir else ".env"
+            report(f"📝 已同步 {written}", 'cyan')
+        return effective
+
+    def apply(self, ports: Dict[str, int], conflicts: List[PortConflict]) -> Dict[str, int]:
+        """把最终端口写入 .env 与 compose 覆盖文件，返回 {服务: 实际端口}
+
+        改过的端口记录在 STATE_FILE 中；没有需要改端口的服务时，据此（以及之前
+        生成的覆盖文件）把 .env 恢复为默认端口，并删除覆盖文件与记录。
+        """
+        moved = {c.service: c.new_port for c in conflicts if c.action == 'reassign' and c.new_port}
+        effective = {**ports, **moved}
+        state = self.project_root / STATE_FILE
+        override = self.compose_dir / COMPOSE_OVERRIDE if self.compose_dir else None
+        generated = (override is not None and override.exists()
+                     and override.read_text(encoding='utf-8').startswith(OVERRIDE_HEADER))
+        if moved or generated or state.exists():
+            write_env_ports(self.project_root, effective)
+        if moved:
+            _write_if_changed(state, json.dumps(moved, indent=2, sort_keys=True) + '\n')
+        elif state.exists():
+            state.unlink()
+        if override is not None and moved:
+            write_compose_override(override, moved)
+        elif generated:
+            override.unlink()
+        return effective
+
+
+# 配置改写 -------------------------------------------------------------------
+
+def _write_if_changed(path: Path, text: str):
+    if not path.exists() or path.read_text(encoding='utf-8') != text:
+        path.write_text(text, encoding='utf-8')
+
+
+def set_env_var(path: Path, key: str, value: str):
+    """设置 .env 中的单个变量，保留其他行与注释"""
+    lines = path.read_text(encoding='utf-8').splitlines() if path.exists() else []
+    pattern = re.compile(rf'^\s*{re.escape(key)}\s*=')
+    for i, line in enumerate(lines):
+        if pattern.match(line):
+            quoted = '"' if '="' in line.replace(' ', '') else ''
+            lines[i] = f'{key}={quoted}{value}{quoted}'
+            break
+    else:
+        lines.append(f'{key}={value}')
+    _write_if_changed(path, '\n'.join(lines) + '\n')
+
+
+def replace_url_port(path: Path, key: str, port: int):
+    """把 KEY=scheme://[user@]host:PORT/... 中的宿主机端口改为 port"""
+    if not path.exists():
+        return
+    text = path.read_text(encoding='utf-8')
+    pattern = re.compile(rf'^(\s*{re.escape(key)}\s*=\s*"?[a-z]+://(?:[^@/\s"]*@)?[^:/\s"]+:)\d+', re.MULTILINE)
+    _write_if_changed(path, pattern.sub(rf'\g<1>{port}', text))
+
+
+def write_env_ports(project_root: Path, ports: Dict[str, int]):
+    """同步改写后端 .env 与前端 .env.local（目录不存在时跳过）"""
+    backend_env = project_root / 'backend' / '.env'
+    frontend_env = project_root / 'frontend' / '.env.local'
+    if backend_env.parent.is_dir():
+        example = backend_env.parent / 'env.example'
+        if not backend_env.exists() and example.exists():
+            # 与各启动器的 _setup_env_files 一致：先从模板创建
+            shutil.copy(example, backend_env)
+        if 'backend' in ports:
+            set_env_var(backend_env, 'PORT', str(ports['backend']))
+        if 'postgres' in ports:
+            replace_url_port(backend_env, 'DATABASE_URL', ports['postgres'])
+        if 'redis' in ports:
+            replace_url_port(backend_env, 'REDIS_URL', ports['redis'])
+    if frontend_env.parent.is_dir() and 'backend' in ports:
+        set_env_var(frontend_env, 'VITE_API_BASE_URL', f"http://localhost:{ports['backend']}")
+
+
+def write_compose_override(path: Path, moved: Dict[str, int]):
+    """生成 compose 覆盖文件，只替换宿主机端口映射（!override 需要 Compose v2.24+）"""
+    lines = [OVERRIDE_HEADER, 'services:']
+    for service, port in sorted(moved.items()):
+        if service in CONTAINER_PORTS:
+            lines += [f'  {service}:', '    ports: !override', f'      - "{port}:{CONTAINER_PORTS[service]}"']
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+子进程日志复用器
+
+启动器用 stdout=PIPE/stderr=PIPE 拉起 `npm run dev` 后如果不读取管道，
+管道缓冲区写满时开发服务器会阻塞在 write 上，看起来像"卡死"。
+本模块用一个后台线程（selectors 多路复用）持续读取所有子进程的输出。
+
+Features:
+- 🔀 单线程 selectors 同时读取全部子进程的 stdout/stderr（Windows 退化为每流一个线程）
+- 🏷️ 每行加上服务名与时间戳前缀
+- 📁 按服务写入滚动日志文件（logs/<service>.log）
+- 🧾 有界内存环形缓冲区，供监控界面展示最近输出
+"""
+
+import logging
+import os
+import selectors
+import subprocess
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 单个日志文件上限与保留份数
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# 每个服务在内存中保留的最近行数
+BUFFER_LINES = 500
+READ_CHUNK = 64 * 1024
+
+
+class _Stream:
+    """一个被读取的管道及其未满一行的残留数据"""
+
+    def __init__(self, service: str, channel: str, pipe):
+        self.service = service
+        self.channel = channel  # 'out' / 'err'
+        self.pipe = pipe
+        self.partial = b''
+
+
+class ProcessLogMultiplexer:
+    """持续读取子进程输出，加前缀后写入滚动日志和环形缓冲区"""
+
+    def __init__(self, log_dir, echo: bool = False, max_bytes: int = MAX_LOG_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT, buffer_lines: int = BUFFER_LINES):
+        """
+        :param log_dir: 日志目录，每个服务一个 <service>.log
+        :param echo: 是否同时把带前缀的行打印到终端
+        """
+        self.log_dir = Path(log_dir)
+        self.echo = echo
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer_lines = buffer_lines
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self._buffers: Dict[str, deque] = {}
+        self._combined = deque(maxlen=buffer_lines)
+        self._loggers: Dict[str, logging.Logger] = {}
+        self._lock = threading.Lock()
+        self._pending: List[_Stream] = []
+        self._closed = False
+        self._use_selector = os.name != 'nt'  # Windows 的 select 不支持管道
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r = self._wake_w = None
+
+    # 进程管理 -------------------------------------------------------------
+
+    def spawn(self, service: str, command: List[str], cwd=None, env=None) -> subprocess.Popen:
+        """启动子进程并接管其 stdout/stderr"""
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.attach(service, process)
+        return process
+
+    def attach(self, service: str, process: subprocess.Popen):
+        """接管一个已用 PIPE 启动的子进程的输出"""
+        with self._lock:
+            self.processes[service] = process
+            self._buffers.setdefault(service, deque(maxlen=self.buffer_lines))
+        streams = [_Stream(service, channel, pipe)
+                   for channel, pipe in (('out', process.stdout), ('err', process.stderr)) if pipe]
+        if self._use_selector:
+            self._ensure_selector_thread()
+            with self._lock:
+                self._pending.extend(streams)
+            os.write(self._wake_w, b'\0')
+        else:
+            for stream in streams:
+                threading.Thread(target=self._read_blocking, args=(stream,), daemon=True).start()
+
+    def tail(self, service: str = None, lines: int = 50) -> List[str]:
+        """最近的输出行；service 为空时返回所有服务合并后的输出"""
+        with self._lock:
+            buffer = self._combined if service is None else self._buffers.get(service, ())
+            return list(buffer)[-lines:]
+
+    def log_path(self, service: str) -> Path:
+        return self.log_dir / f'{service}.log'
+
+    def close(self):
+        """停止读取并关闭日志文件（不终止子进程）；重复调用无副作用"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # 持锁写入：读取线程退出时在同一把锁内关闭唤醒管道
+            if self._wake_w is not None:
+                os.write(self._wake_w, b'\0')
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        for logger in self._loggers.values():
+            for handler in logger.handlers:
+                handler.close()
+
+    # 读取 -----------------------------------------------------------------
+
+    def _ensure_selector_thread(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            self._thread = threading.Thread(target=self._selector_loop, name='process-logs', daemon=True)
+            self._thread.start()
+
+    def _selector_loop(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ, None)
+        try:
+            while not self._closed:
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                for stream in pending:
+                    os.set_blocking(stream.pipe.fileno(), False)
+                    selector.register(stream.pipe, selectors.EVENT_READ, stream)
+                for key, _ in selector.select():
+                    stream = key.data
+                    if stream is None:
+                        try:
+                            os.read(self._wake_r, 4096)
+                        except BlockingIOError:
+                            pass
+                        continue
+                    try:
+                        chunk = os.read(stream.pipe.fileno(), READ_CHUNK)
+                    except BlockingIOError:
+                        continue
+                    if chunk:
+                        self._feed(stream, chunk)
+                    else:
+                        selector.unregister(stream.pipe)
+                        self._finish(stream)
+        finally:
+            selector.close()
+            with self._lock:
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+                self._wake_r = self._wake_w = None
+
+    def _read_blocking(self, stream: _Stream):
+        """Windows 回退：每个管道一个阻塞读取线程"""
+        while not self._closed:
+            chunk = stream.pipe.read1(READ_CHUNK) if hasattr(stream.pipe, 'read1') else stream.pipe.read(READ_CHUNK)
+            if not chunk:
+                break
+            self._feed(stream, chunk)
+        self._finish(stream)
+
+    def _feed(self, stream: _Stream, chunk: bytes):
+        data = stream.partial + chunk
+        *lines, stream.partial = data.split(b'\n')
+        for line in lines:
+            self._emit(stream, line)
+
+    def _finish(self, stream: _Stream):
+        if stream.partial:
+            self._emit(stream, stream.partial)
+            stream.partial = b''
+        stream.pipe.close()
+
+    # 输出 -----------------------------------------------------------------
+
+    def _emit(self, stream: _Stream, raw: bytes):
+        text = raw.decode('utf-8', errors='replace').rstrip('\r')
+        marker = '!' if stream.channel == 'err' else ' '
+        line = f"[{stream.service}] {datetime.now().strftime('%H:%M:%S')} {marker} {text}"
+        with self._lock:
+            self._buffers[stream.service].append(line)
+            self._combined.append(line)
+        self._logger(stream.service).info(line)
+        if self.echo:
+            print(line)
+
+    def _logger(self, service: str) -> logging.Logger:
+        logger = self._loggers.get(service)
+        if logger is not None:
+            return logger
+        with self._lock:
+            logger = self._loggers.get(service)
+            if logger is not None:
+                return logger
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            logger = logging.getLogger(f'process_logs.{service}.{id(self)}')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(self.log_path(service), maxBytes=self.max_bytes,
+                                          backupCount=self.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            self._loggers[service] = logger
+        return logger
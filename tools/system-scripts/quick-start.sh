@@ -23,10 +23,16 @@ fi
 
 # 一键启动
 echo "🔄 正在启动所有服务..."
-docker-compose up -d
-
-echo "⏳ 等待服务启动..."
-sleep 20
+# Compose v2 的 --wait 等到各服务 healthcheck 通过再返回；旧版只能固定等待
+if docker compose up --help 2>/dev/null | grep -q -- '--wait'; then
+    echo "⏳ 等待服务健康检查通过..."
+    docker compose up -d --wait
+else
+    docker-compose up -d
+
+    echo "⏳ 等待服务启动..."
+    sleep 20
+fi
 
 echo "
 ╔══════════════════════════════════════════════════════════════╗
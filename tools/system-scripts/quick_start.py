@@ -11,11 +11,12 @@
 3. 混合模式 - 前端本地，后端Docker
 """
 
-import os
 import sys
 import subprocess
 import time
 from pathlib import Path
+from launcher import sounds, tools
+from launcher.modes import run_mode
 
 def print_banner():
     """显示启动横幅"""
@@ -47,16 +48,11 @@ def check_requirements():
         return False
     
     # 检查Node.js
-    try:
-        result = subprocess.run(['node', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ Node.js 已安装: {result.stdout.strip()}")
-        else:
-            print("❌ Node.js 未安装")
-            return False
-    except FileNotFoundError:
+    version = tools.tool_version('node')
+    if version is None:
         print("❌ Node.js 未安装")
         return False
+    print(f"✅ Node.js 已安装: {version}")
     
     return True
 
@@ -70,7 +66,7 @@ def start_local_mode():
     local_script = project_root / 'start_local_system.py'
     if local_script.exists():
         print("🚀 使用本地系统启动器...")
-        os.system(f'python "{local_script}"')
+        run_mode('a')
     else:
         print("📦 使用简化启动流程...")
         
@@ -94,25 +90,14 @@ def start_docker_mode():
     """启动Docker模式"""
     print("\n🐳 启动Docker容器模式...")
     
-    project_root = Path(__file__).parent
-    
     # 检查Docker
-    try:
-        subprocess.run(['docker', '--version'], check=True, capture_output=True)
-        print("✅ Docker 已安装")
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    if not tools.has_command('docker'):
         print("❌ Docker 未安装或未运行")
         return
+    print("✅ Docker 已安装")
     
-    # 尝试启动Docker Compose
-    try:
-        print("🚀 启动Docker服务...")
-        subprocess.run(['docker-compose', 'up', '-d'], cwd=project_root, check=True)
-        print("✅ Docker服务启动成功")
-        print("🌐 前端: http://localhost:3000")
-        print("⚡ 后端: http://localhost:8000")
-        print("🗄️ 数据库管理: http://localhost:5050")
-    except subprocess.CalledProcessError:
+    # 完整容器化启动（端口处理、依赖安装、就绪等待）
+    if not run_mode('b'):
         print("❌ Docker启动失败，建议使用本地模式")
 
 def run_system_fix():
@@ -124,20 +109,19 @@ def run_system_fix():
     
     if fix_script.exists():
         print("🚀 运行Docker系统修复...")
-        os.system(f'python "{fix_script}"')
+        run_mode('repair')
     else:
         print("⚠️  修复脚本不存在，手动检查问题...")
         
         # 基本诊断
         print("🔍 基本系统诊断:")
         
-        # 检查端口占用
+        # 检查端口占用（一次连接快照覆盖所有端口）
         try:
-            import psutil
-            ports = [3000, 8000, 5432, 6379, 5050]
-            for port in ports:
-                connections = [conn for conn in psutil.net_connections() if conn.laddr.port == port]
-                if connections:
+            from port_resolver import PortSnapshot
+            snapshot = PortSnapshot()
+            for port in [3000, 8000, 5432, 6379, 5050]:
+                if snapshot.in_use(port):
                     print(f"⚠️  端口 {port} 被占用")
                 else:
                     print(f"✅ 端口 {port} 可用")
@@ -163,22 +147,8 @@ def check_system_status():
     """检查系统状态"""
     print("\n📊 检查系统状态...")
     
-    services = {
-        '前端服务': 'http://localhost:3000',
-        '后端API': 'http://localhost:8000',
-        '数据库管理': 'http://localhost:5050'
-    }
-    
-    for service_name, url in services.items():
-        try:
-            import urllib.request
-            with urllib.request.urlopen(url, timeout=3) as response:
-                if response.status == 200:
-                    print(f"✅ {service_name} 运行正常 - {url}")
-                else:
-                    print(f"⚠️  {service_name} 响应异常 - {url}")
-        except Exception:
-            print(f"❌ {service_name} 无法访问 - {url}")
+    # 各服务并发探测
+    run_mode('status')
     
     # 检查进程
     try:
@@ -201,10 +171,8 @@ def check_system_status():
 def play_success_sound():
     """播放成功音效"""
     try:
-        import platform
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        sounds.play('Glass')
+        if sounds.AVAILABLE:
             subprocess.run(['say', '财务管理系统启动选择完成'], 
                          check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except:
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+服务就绪探测
+
+用真实的就绪信号代替固定的 sleep：服务一旦可用立即返回，
+不可用时按带抖动的指数退避重试，直到总超时。
+
+Features:
+- 🔌 TCP 端口连通探测
+- 🌐 HTTP 状态探测（非 5xx 即视为就绪）
+- 🐘 PostgreSQL 协议握手（StartupMessage，等价于 pg_isready）
+- 🧰 Redis PING 探测
+- ⏳ 抖动指数退避 + 总截止时间，多服务并发等待
+"""
+
+import random
+import socket
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Dict, Optional
+
+# 单次探测的连接/读取超时（秒）
+PROBE_TIMEOUT = 1.0
+
+# PostgreSQL 协议版本 3.0
+_PG_PROTOCOL = 196608
+# 服务器仍在启动/恢复/关闭时返回的 SQLSTATE
+_PG_NOT_READY_CODES = {'57P03'}
+
+
+def probe_tcp(host: str, port: int, timeout: float = PROBE_TIMEOUT) -> bool:
+    """端口可以建立 TCP 连接时返回 True
+
+    注意 Docker 端口映射（docker-proxy）在容器内服务就绪前就会接受连接，
+    映射端口应优先使用 HTTP/PostgreSQL/Redis 协议级探测。
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_http(url: str, timeout: float = PROBE_TIMEOUT) -> bool:
+    """HTTP 返回非 5xx 状态码时返回 True（404/401 说明服务本身已在响应）"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('连接被关闭')
+        data += chunk
+    return data
+
+
+def probe_postgres(host: str = 'localhost', port: int = 5432, user: str = 'postgres',
+                   database: str = 'postgres', timeout: float = PROBE_TIMEOUT) -> bool:
+    """发送 StartupMessage 并读取第一条回复
+
+    认证请求（'R'）或除"正在启动"(57P03) 以外的错误都说明服务器已接受连接，
+    与 pg_isready 的判断一致；无需密码，也不需要 docker-compose exec。
+    """
+    params = f'user\0{user}\0database\0{database}\0\0'.encode('utf-8')
+    startup = struct.pack('!ii', 8 + len(params), _PG_PROTOCOL) + params
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            sock.sendall(startup)
+            kind, length = struct.unpack('!ci', _recv_exact(sock, 5))
+            if kind == b'R':
+                return True
+            if kind != b'E':
+                return False
+            body = _recv_exact(sock, length - 4)
+            fields = {part[:1]: part[1:] for part in body.split(b'\0') if part}
+            return fields.get(b'C', b'').decode('ascii', 'replace') not in _PG_NOT_READY_CODES
+    except (OSError, ConnectionError, struct.error):
+        return False
+
+
+def probe_redis(host: str = 'localhost', port: int = 6379, timeout: float = PROBE_TIMEOUT) -> bool:
+    """发送 PING；+PONG 或需要认证（-NOAUTH）都视为就绪，-LOADING 视为未就绪"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            sock.sendall(b'*1\r\n$4\r\nPING\r\n')
+            reply = sock.recv(64)
+    except OSError:
+        return False
+    return reply.startswith(b'+PONG') or reply.startswith(b'-NOAUTH')
+
+
+def wait_for(probe: Callable[[], bool], timeout: float = 60.0, initial_delay: float = 0.1,
+             max_delay: float = 1.0, factor: float = 2.0,
+             stop_event: Optional[threading.Event] = None) -> Optional[float]:
+    """反复调用 probe 直到成功或超时
+
+    两次探测之间的等待按 initial_delay * factor^n 增长（上限 max_delay），
+    并乘以 [0.5, 1) 的随机抖动，避免多个等待者同步重试。
+    成功时返回耗时（秒），超时或 stop_event 被设置时返回 None。
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = initial_delay
+    while True:
+        if probe():
+            return time.monotonic() - started
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        pause = min(delay * random.uniform(0.5, 1.0), remaining)
+        if stop_event is not None:
+            if stop_event.wait(pause):
+                return None
+        else:
+            time.sleep(pause)
+        delay = min(delay * factor, max_delay)
+
+
+def wait_for_all(probes: Dict[str, Callable[[], bool]], timeout: float = 60.0,
+                 **backoff) -> Dict[str, Optional[float]]:
+    """并发等待多个服务，返回 {名称: 就绪耗时或 None}；共享同一个截止时间"""
+    results = {}
+
+    def worker(name, probe):
+        results[name] = wait_for(probe, timeout=timeout, **backoff)
+
+    threads = [threading.Thread(target=worker, args=item, daemon=True) for item in probes.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+README 分节编辑器
+按标题建立一次索引即可按节定位；修改以字节区间补丁的形式暂存，
+在文件锁内一次性应用并通过临时文件 + os.replace 原子写回。
+提交钩子中多个工具先后更新 README 时互不覆盖，也不会读到写了一半的文件。
+
+Features:
+- 🗂️ 标题索引：一次扫描得到各节的字节区间（跳过代码块中的 # 行）
+- 🩹 字节区间补丁：只替换需要修改的区间，其余字节原样保留
+- 💾 原子写入：临时文件 + os.replace
+- 🔒 跨进程文件锁：并发运行的钩子依次读改写
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+LOCK_TIMEOUT = 30.0
+
+# 标题行与代码围栏；标题尾部可选的 # 不属于标题文本
+_LINE_PATTERN = re.compile(rb'^(?:(?P<fence>```|~~~).*|(?P<hashes>#{1,6})[ \t]+(?P<title>.*?)[ \t#]*)\r?$',
+                           re.MULTILINE)
+# 紧挨在标题前面的分隔线（及空行），插入新节时放在它前面；只在标题前 LEAD_WINDOW 字节内查找
+LEAD_WINDOW = 512
+_LEAD_PATTERN = re.compile(rb'(?:^[ \t]*(?:-{3,}|\*{3,}|_{3,})[ \t]*\r?\n(?:[ \t]*\r?\n)*)+\Z', re.MULTILINE)
+
+
+class Section(NamedTuple):
+    level: int
+    title: str
+    lead: int   # 标题前分隔线的起点（没有分隔线时等于 start）
+    start: int  # 标题行起点
+    body: int   # 标题行之后
+    end: int    # 下一个同级或更高级标题的 lead，或文件末尾
+
+
+class Patch(NamedTuple):
+    start: int
+    end: int
+    data: bytes
+
+
+def index_headings(data: bytes) -> List[Section]:
+    """扫描一次，返回文档中各节（按出现顺序）"""
+    headings: List[Tuple[int, str, int, int, int]] = []
+    fence = None
+    for m in _LINE_PATTERN.finditer(data):
+        if m.group('fence'):
+            fence = None if fence == m.group('fence') else (fence or m.group('fence'))
+            continue
+        if fence:
+            continue
+        start, body = m.start(), min(m.end() + 1, len(data))
+        lead = _LEAD_PATTERN.search(data, max(0, start - LEAD_WINDOW), start)
+        headings.append((len(m.group('hashes')), m.group('title').decode('utf-8', 'replace'),
+                         lead.start() if lead else start, start, body))
+
+    sections = []
+    for i, (level, title, lead, start, body) in enumerate(headings):
+        end = next((h[2] for h in headings[i + 1:] if h[0] <= level), len(data))
+        sections.append(Section(level, title, lead, start, body, end))
+    return sections
+
+
+def _lock_path(path: Path) -> Path:
+    digest = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f'readme-{digest}.lock'
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+    """跨进程互斥锁；锁文件放在系统临时目录，不会留在仓库里"""
+    deadline = time.monotonic() + timeout
+    with open(_lock_path(path), 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            acquire = lambda: msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            release = lambda: msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            acquire = lambda: fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            release = lambda: fcntl.flock(lock_file, fcntl.LOCK_UN)
+        while True:
+            try:
+                acquire()
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f'等待 README 锁超时: {path}')
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            release()
+
+
+# 同一进程内多次打开未变化的文件时复用索引，键为 (路径, 大小, mtime_ns)
+_INDEX_CACHE: Dict[Tuple[str, int, int], List[Section]] = {}
+
+
+class ReadmeDocument:
+    """一次编辑会话：读取一次、索引一次，补丁以原始文档的字节偏移表示"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.data = self.path.read_bytes()
+        self.stat = st = os.stat(self.path)
+        key = (str(self.path.resolve()), st.st_size, st.st_mtime_ns)
+        if key not in _INDEX_CACHE:
+            _INDEX_CACHE.clear()
+            _INDEX_CACHE[key] = index_headings(self.data)
+        self.sections = _INDEX_CACHE[key]
+        self.patches: List[Patch] = []
+
+    def section(self, title: str, level: Optional[int] = None) -> Optional[Section]:
+        """按标题文本（不含 #）查找第一个匹配的节"""
+        return next((s for s in self.sections
+                     if s.title == title and (level is None or s.level == level)), None)
+
+    def text(self, section: Section) -> str:
+        return self.data[section.start:section.end].decode('utf-8')
+
+    def finditer(self, pattern: str) -> Iterator[re.Match]:
+        """在原始内容上查找（已暂存的补丁不影响匹配结果）"""
+        return re.finditer(pattern.encode('utf-8'), self.data)
+
+    def replace(self, start: int, end: int, text: str):
+        self.patches.append(Patch(start, end, text.encode('utf-8')))
+
+    def replace_section(self, section: Section, text: str):
+        """替换整节（含标题行）；text 应以换行结尾"""
+        self.replace(section.start, section.end, text)
+
+    def insert_before(self, section: Section, text: str):
+        """在节的标题（及其前面的分隔线）之前插入"""
+        self.replace(section.lead, section.lead, text)
+
+    def append(self, text: str):
+        self.replace(len(self.data), len(self.data), text)
+
+    def render(self) -> bytes:
+        """按偏移顺序拼接补丁与未修改的字节；补丁区间重叠时抛出 ValueError"""
+        parts, pos = [], 0
+        for patch in sorted(self.patches, key=lambda p: (p.start, p.end)):
+            if patch.start < pos:
+                raise ValueError(f'README 补丁区间重叠: {patch.start}-{patch.end}')
+            parts.append(self.data[pos:patch.start])
+            parts.append(patch.data)
+            pos = patch.end
+        parts.append(self.data[pos:])
+        return b''.join(parts)
+
+    def save(self) -> bool:
+        """原子写回；没有补丁时不写文件"""
+        if not self.patches:
+            return False
+        tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.render())
+            os.chmod(tmp_path, self.stat.st_mode & 0o7777)
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self.patches.clear()
+        return True
+
+
+@contextmanager
+def edit(path: Path, timeout: float = LOCK_TIMEOUT) -> Iterator[ReadmeDocument]:
+    """加锁读取 README，with 块正常结束时应用全部补丁并原子写回；发生异常则不写入"""
+    with file_lock(Path(path), timeout):
+        document = ReadmeDocument(path)
+        yield document
+        document.save()
@@ -110,10 +110,15 @@ setup_database() {
         echo "使用 Docker 启动数据库服务..."
         
         # 启动数据库服务
-        docker-compose up -d postgres redis
-        
-        echo "等待数据库启动..."
-        sleep 10
+        if docker compose up --help 2>/dev/null | grep -q -- '--wait'; then
+            echo "等待数据库健康检查通过..."
+            docker compose up -d --wait postgres redis
+        else
+            docker-compose up -d postgres redis
+            
+            echo "等待数据库启动..."
+            sleep 10
+        fi
         
         # 运行数据库迁移
         echo "运行数据库迁移..."
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+telemetry 耗时分析
+读取 logs/telemetry.jsonl，输出最近几次运行的关键路径与跨运行最慢的阶段。
+
+关键路径：从最后结束的顶层 span 出发，逐个回溯"阻塞它的前驱"——
+声明了 requires 的（启动图步骤）取依赖中最晚结束的，其余取开始前最晚结束的同级 span；
+路径上的每个 span 再在其子 span 中按同样规则展开。
+
+Features:
+- 🧭 每次运行的关键路径（含嵌套阶段与在运行中的起止偏移）
+- 🐢 跨运行按阶段汇总：次数、平均、P95、最大耗时与失败次数
+- ⚠️ 列出只有开始没有结束的 span（进程被中断）
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import telemetry
+
+# 判断"前驱在开始前结束"时容许的时钟误差（秒）
+EPSILON = 0.001
+DEFAULT_RUNS = 1
+DEFAULT_TOP = 10
+
+
+class SpanRecord:
+    def __init__(self, event: dict):
+        self.id = event['span']
+        self.parent = event.get('parent')
+        self.name = event['name']
+        self.tool = event.get('tool', '')
+        self.start = event['start']
+        self.duration = event['duration']
+        self.end = self.start + self.duration
+        self.status = event.get('status', 'ok')
+        self.attrs = event.get('attrs') or {}
+        self.children: List['SpanRecord'] = []
+
+
+class Run:
+    def __init__(self, run_id: str):
+        self.id = run_id
+        self.spans: Dict[str, SpanRecord] = {}
+        self.open: Dict[str, dict] = {}  # 只有 span_start 的 span
+
+    @property
+    def start(self) -> float:
+        return min((s.start for s in self.spans.values()), default=0.0)
+
+    def roots(self) -> List[SpanRecord]:
+        for span in self.spans.values():
+            span.children = []
+        roots = []
+        for span in self.spans.values():
+            parent = self.spans.get(span.parent)
+            (parent.children if parent else roots).append(span)
+        return roots
+
+
+def load_runs(paths: List[Path], tool: Optional[str] = None) -> List[Run]:
+    """按首次出现的顺序返回各次运行；损坏的行跳过"""
+    runs: Dict[str, Run] = {}
+    for path in paths:
+        try:
+            f = open(path, encoding='utf-8')
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get('event') not in ('span_start', 'span_end'):
+                    continue
+                if tool and event.get('tool') != tool:
+                    continue
+                run = runs.setdefault(event.get('run', ''), Run(event.get('run', '')))
+                if event['event'] == 'span_start':
+                    run.open[event['span']] = event
+                else:
+                    run.open.pop(event['span'], None)
+                    run.spans[event['span']] = SpanRecord(event)
+    return [run for run in runs.values() if run.spans or run.open]
+
+
+def _blocker(span: SpanRecord, siblings: List[SpanRecord]) -> Optional[SpanRecord]:
+    requires = span.attrs.get('requires')
+    if requires is not None:
+        candidates = [s for s in siblings if s.name in requires]
+    else:
+        candidates = [s for s in siblings if s.start < span.start and s.end <= span.start + EPSILON]
+    return max(candidates, key=lambda s: s.end, default=None)
+
+
+def critical_chain(spans: List[SpanRecord]) -> List[SpanRecord]:
+    """同级 span 中决定结束时间的那条链，从先到后"""
+    if not spans:
+        return []
+    chain = [max(spans, key=lambda s: s.end)]
+    while True:
+        blocker = _blocker(chain[-1], spans)
+        if blocker is None or blocker in chain:
+            break
+        chain.append(blocker)
+    return chain[::-1]
+
+
+def critical_path(run: Run) -> List[tuple]:
+    """[(嵌套深度, span)]：顶层关键链，每个节点展开其子 span 的关键链"""
+    path = []
+
+    def expand(spans, depth):
+        for span in critical_chain(spans):
+            path.append((depth, span))
+            expand(span.children, depth + 1)
+
+    expand(run.roots(), 0)
+    return path
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def slowest(runs: List[Run], top: int = DEFAULT_TOP) -> List[dict]:
+    """按阶段名汇总全部运行，按平均耗时降序"""
+    durations = defaultdict(list)
+    failures = defaultdict(int)
+    for run in runs:
+        for span in run.spans.values():
+            durations[span.name].append(span.duration)
+            if span.status != 'ok':
+                failures[span.name] += 1
+    rows = [{'name': name, 'count': len(values), 'mean': sum(values) / len(values),
+             'p95': _percentile(values, 0.95), 'max': max(values), 'failures': failures[name]}
+            for name, values in durations.items()]
+    rows.sort(key=lambda row: row['mean'], reverse=True)
+    return rows[:top]
+
+
+def _status_icon(span: SpanRecord) -> str:
+    return {'ok': '✅', 'failed': '❌'}.get(span.status, '💥')
+
+
+def print_run(run: Run):
+    origin = run.start
+    total = max((s.end for s in run.spans.values()), default=origin) - origin
+    tools = sorted({s.tool for s in run.spans.values()})
+    print(f"\n🧭 运行 {run.id}（{', '.join(tools)}，总计 {total:.1f}s）关键路径：")
+    for depth, span in critical_path(run):
+        print(f"   {'  ' * depth}{_status_icon(span)} {span.name:<{max(28 - 2 * depth, 1)}} "
+              f"{span.start - origin:7.2f}s → {span.end - origin:7.2f}s  ({span.duration:.2f}s)")
+    for event in run.open.values():
+        print(f"   ⚠️  未结束: {event['name']}（pid {event.get('pid')}，"
+              f"开始于 +{event['ts'] - origin:.1f}s）")
+
+
+def print_slowest(rows: List[dict], runs: int):
+    print(f"\n🐢 最慢的阶段（{runs} 次运行）：")
+    print(f"   {'阶段':<28}{'次数':>6}{'平均':>10}{'P95':>10}{'最大':>10}{'失败':>6}")
+    for row in rows:
+        print(f"   {row['name']:<30}{row['count']:>6}{row['mean']:>9.2f}s{row['p95']:>9.2f}s"
+              f"{row['max']:>9.2f}s{row['failures']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='telemetry 耗时分析：关键路径与最慢阶段')
+    parser.add_argument('file', nargs='?', type=Path, default=telemetry.LOG_PATH, help='telemetry.jsonl 路径')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='显示最近几次运行的关键路径')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='最慢阶段的显示条数')
+    parser.add_argument('--tool', help='只分析指定工具（脚本文件名，如 launch_system）')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出最慢阶段汇总')
+    args = parser.parse_args(argv)
+
+    # 先读轮换出去的旧文件，运行按时间先后排列
+    runs = load_runs([args.file.with_name(args.file.name + '.1'), args.file], args.tool)
+    if not runs:
+        print(f"ℹ️ {args.file} 中没有 span 记录")
+        return 1
+    rows = slowest(runs, args.top)
+    if args.json:
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    for run in runs[-args.runs:]:
+        print_run(run)
+    print_slowest(rows, len(runs))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
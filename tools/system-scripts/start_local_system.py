@@ -23,8 +23,13 @@ import signal
 import webbrowser
 from datetime import datetime
 from pathlib import Path
-import logging
-import psutil
+from typing import TYPE_CHECKING
+import telemetry
+from launcher import services, sounds, tools
+from launcher.console import Console
+
+if TYPE_CHECKING:
+    from startup_dag import StartupGraph
 
 class LocalFinancialSystemLauncher:
     def __init__(self):
@@ -33,60 +38,41 @@ class LocalFinancialSystemLauncher:
         # 修复路径：脚本在 deployment/scripts/ 目录，需要向上两级到达项目根目录
         self.project_root = Path(__file__).parent.parent.parent
         self.processes = []
-        self.setup_logging()
-        
-    def setup_logging(self):
-        """设置日志系统"""
-        log_dir = self.project_root / 'logs'
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_dir / 'local_system.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        # 默认端口；被其他程序占用时由 PortResolver 改为备用端口
+        self.ports = {'frontend': 3000, 'backend': 8000}
+        self.console = Console('local_system', self.project_root / 'logs')
+        self.logger = self.console.logger
+        self._process_logs = None
+
+    @property
+    def process_logs(self):
+        """持续读取开发服务器输出，写入 logs/<service>.log（首次启动服务时创建）"""
+        if self._process_logs is None:
+            from process_logs import ProcessLogMultiplexer
+            self._process_logs = ProcessLogMultiplexer(self.project_root / 'logs')
+        return self._process_logs
 
     def print_color(self, message: str, color: str = 'white'):
         """彩色输出"""
-        colors = {
-            'red': '\033[91m',
-            'green': '\033[92m',
-            'yellow': '\033[93m',
-            'blue': '\033[94m',
-            'purple': '\033[95m',
-            'cyan': '\033[96m',
-            'white': '\033[97m',
-            'reset': '\033[0m'
-        }
-        
-        print(f"{colors.get(color, '')}{message}{colors['reset']}")
-        self.logger.info(message)
+        self.console.print(message, color)
 
     def play_30s_startup_music(self):
         """播放30秒系统启动轻音乐"""
-        hour = datetime.now().hour
-        
         self.print_color("🎵 播放30秒本地系统启动轻音乐...", 'cyan')
         
         def play_music():
             try:
-                if self.os_type == 'Darwin':  # macOS
-                    if hour >= 22 or hour <= 8:  # 深夜模式
+                if sounds.AVAILABLE:  # macOS
+                    if sounds.late_night():  # 深夜模式
                         self.print_color("🌙 深夜模式：本地系统启动完成，播放轻柔提醒...", 'purple')
                         for i in range(5):
-                            subprocess.run(['afplay', '/System/Library/Sounds/Tink.aiff'], 
-                                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                            sounds.play('Tink')
                             time.sleep(1.5)
                         self._speak("本地财务管理系统启动完成，深夜模式激活", 'Sin-ji', 120)
                     else:
                         self.print_color("🎼 播放30秒本地系统启动古典轻音乐...", 'green')
                         for i in range(12):
-                            subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                            sounds.play('Glass')
                             time.sleep(2.0)
                             if i == 3:
                                 self._speak("本地Node.js服务正在启动", 'Ting-Ting', 160)
@@ -102,15 +88,13 @@ class LocalFinancialSystemLauncher:
     def _speak(self, text: str, voice: str = None, rate: int = 140):
         """语音提醒"""
         try:
-            if self.os_type == 'Darwin' and voice:
-                subprocess.run(['say', text, '--voice', voice, '--rate', str(rate)], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            sounds.speak(text, voice, rate)
         except Exception as e:
             self.logger.warning(f"语音播放失败: {e}")
 
     def display_banner(self):
         """显示启动横幅"""
-        os.system('clear' if self.os_type != 'Windows' else 'cls')
+        self.console.clear()
         
         banner = f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -130,92 +114,35 @@ class LocalFinancialSystemLauncher:
         """检查本地环境"""
         self.print_color("🔍 检查本地开发环境...", 'blue')
         
-        # 检查Node.js
-        try:
-            result = subprocess.run(['node', '--version'], capture_output=True, text=True, check=True)
-            version = result.stdout.strip()
-            self.print_color(f"✅ Node.js 已安装: {version}", 'green')
-        except subprocess.CalledProcessError:
-            self.print_color("❌ Node.js 未安装", 'red')
+        # 检查Node.js / npm
+        if tools.check_tools(self.console, ['node', 'npm']):
             return False
         
-        # 检查npm
-        try:
-            result = subprocess.run(['npm', '--version'], capture_output=True, text=True, check=True)
-            version = result.stdout.strip()
-            self.print_color(f"✅ NPM 已安装: {version}", 'green')
-        except subprocess.CalledProcessError:
-            self.print_color("❌ NPM 未安装", 'red')
-            return False
-        
-        # 检查端口占用
-        ports_to_check = [3000, 8000]
-        for port in ports_to_check:
-            if self._is_port_in_use(port):
-                self.print_color(f"⚠️  端口 {port} 已被占用，尝试释放...", 'yellow')
-                self._kill_port_process(port)
-                time.sleep(1)
-                if not self._is_port_in_use(port):
-                    self.print_color(f"✅ 端口 {port} 已释放", 'green')
-                else:
-                    self.print_color(f"⚠️  端口 {port} 仍被占用", 'yellow')
-            else:
-                self.print_color(f"✅ 端口 {port} 可用", 'green')
+        # 检查端口占用：遗留的开发服务器直接终止，其他占用者改用备用端口
+        self.ports = services.resolve_ports(self.console, self.project_root, {'frontend': 3000, 'backend': 8000})
         
         return True
 
-    def _is_port_in_use(self, port: int) -> bool:
-        """检查端口是否被占用"""
-        try:
-            for conn in psutil.net_connections():
-                if conn.laddr.port == port:
-                    return True
-            return False
-        except:
-            return False
+    def url(self, service: str) -> str:
+        return f"http://localhost:{self.ports[service]}"
 
-    def _kill_port_process(self, port: int) -> bool:
-        """终止占用端口的进程"""
-        try:
-            for conn in psutil.net_connections():
-                if conn.laddr.port == port and conn.pid:
-                    process = psutil.Process(conn.pid)
-                    process.terminate()
-                    time.sleep(1)
-                    if process.is_running():
-                        process.kill()
-                    return True
-            return False
-        except:
-            return False
+    def install_dependencies(self) -> bool:
+        """前后端并行安装依赖（依赖未变化时直接跳过）"""
+        return services.run_parallel({f'npm_{name}': (lambda n=name: self._install_package(n))
+                                      for name in ('frontend', 'backend')})
 
-    def install_dependencies(self):
-        """安装依赖"""
-        self.print_color("📦 安装项目依赖...", 'blue')
-        
-        # 安装前端依赖
-        frontend_dir = self.project_root / 'frontend'
-        if frontend_dir.exists() and (frontend_dir / 'package.json').exists():
-            self.print_color("🎨 安装前端依赖...", 'yellow')
-            try:
-                subprocess.run(['npm', 'install'], cwd=frontend_dir, check=True,
-                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                self.print_color("✅ 前端依赖安装完成", 'green')
-            except subprocess.CalledProcessError as e:
-                self.print_color(f"❌ 前端依赖安装失败: {e}", 'red')
-                return False
-        
-        # 安装后端依赖
-        backend_dir = self.project_root / 'backend'
-        if backend_dir.exists() and (backend_dir / 'package.json').exists():
-            self.print_color("⚡ 安装后端依赖...", 'yellow')
-            try:
-                subprocess.run(['npm', 'install'], cwd=backend_dir, check=True,
-                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                self.print_color("✅ 后端依赖安装完成", 'green')
-            except subprocess.CalledProcessError as e:
-                self.print_color(f"❌ 后端依赖安装失败: {e}", 'red')
+    def _install_package(self, name: str) -> bool:
+        """安装 frontend 或 backend 目录的依赖"""
+        icon, label = {'frontend': ('🎨', '前端'), 'backend': ('⚡', '后端')}[name]
+        package_dir = self.project_root / name
+        if package_dir.exists() and (package_dir / 'package.json').exists():
+            self.print_color(f"{icon} 检查{label}依赖...", 'yellow')
+            import npm_cache
+            result = npm_cache.ensure_installed(package_dir)
+            if not result.ok:
+                self.print_color(f"❌ {label}{npm_cache.describe(result)}", 'red')
                 return False
+            self.print_color(f"✅ {label}{npm_cache.describe(result)}", 'green')
         
         return True
 
@@ -301,20 +228,14 @@ PORT=8000
             
             # 启动后端服务
             self.print_color("🚀 启动后端API服务...", 'yellow')
-            backend_process = subprocess.Popen(
-                ['npm', 'run', 'dev'],
-                cwd=backend_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            env = {**os.environ, 'PORT': str(self.ports['backend'])}
+            backend_process = self.process_logs.spawn('backend', ['npm', 'run', 'dev'], cwd=backend_dir, env=env)
             
             self.processes.append(('backend', backend_process))
             self.print_color("✅ 后端服务启动中...", 'green')
             
             # 等待服务启动
-            time.sleep(5)
-            
-            return True
+            return self._wait_for_service('后端', backend_process, self.url('backend'))
             
         except subprocess.CalledProcessError as e:
             self.print_color(f"❌ 后端服务启动失败: {e}", 'red')
@@ -332,33 +253,51 @@ PORT=8000
         try:
             # 启动前端服务
             self.print_color("🚀 启动前端开发服务器...", 'yellow')
-            frontend_process = subprocess.Popen(
-                ['npm', 'run', 'dev'],
-                cwd=frontend_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            # vite.config.ts 的 /api 代理读取 VITE_API_BASE_URL
+            env = {**os.environ, 'VITE_API_BASE_URL': self.url('backend')}
+            frontend_process = self.process_logs.spawn(
+                'frontend', ['npm', 'run', 'dev', '--', '--port', str(self.ports['frontend'])],
+                cwd=frontend_dir, env=env)
             
             self.processes.append(('frontend', frontend_process))
             self.print_color("✅ 前端服务启动中...", 'green')
             
             # 等待服务启动
-            time.sleep(8)
-            
-            return True
+            return self._wait_for_service('前端', frontend_process, self.url('frontend'))
             
         except subprocess.CalledProcessError as e:
             self.print_color(f"❌ 前端服务启动失败: {e}", 'red')
             return False
 
+    def _wait_for_service(self, label: str, process: subprocess.Popen, url: str, timeout: float = 90) -> bool:
+        """等待服务开始响应 HTTP；进程提前退出时立即返回失败"""
+        import readiness
+        elapsed = readiness.wait_for(lambda: process.poll() is not None or readiness.probe_http(url),
+                                     timeout=timeout)
+        if process.poll() is not None:
+            self.print_color(f"❌ {label}进程已退出 (exit {process.returncode})", 'red')
+            self._show_recent_output(process)
+            return False
+        if elapsed is None:
+            self.print_color(f"⚠️  {label}服务 {timeout:.0f}s 内未响应，继续启动", 'yellow')
+        else:
+            self.print_color(f"✅ {label}服务已就绪 ({elapsed:.1f}s)", 'green')
+        return True
+
+    def _show_recent_output(self, process: subprocess.Popen, lines: int = 15):
+        """打印已退出服务的最后几行输出，便于定位失败原因"""
+        for service, tracked in self.process_logs.processes.items():
+            if tracked is process:
+                for line in self.process_logs.tail(service, lines):
+                    print(f"   {line}")
+                self.print_color(f"📋 完整日志: {self.process_logs.log_path(service)}", 'cyan')
+
+    @telemetry.traced()
     def health_check(self):
         """健康检查"""
         self.print_color("💊 系统健康检查...", 'blue')
         
-        services = {
-            'frontend': 'http://localhost:3000',
-            'backend': 'http://localhost:8000'
-        }
+        services = {name: self.url(name) for name in ('frontend', 'backend')}
         
         healthy_services = 0
         
@@ -385,7 +324,7 @@ PORT=8000
         self.print_color("🌐 打开浏览器...", 'blue')
         
         try:
-            webbrowser.open('http://localhost:3000')
+            webbrowser.open(self.url('frontend'))
             self.print_color("✅ 浏览器已打开", 'green')
         except Exception as e:
             self.print_color(f"⚠️  无法自动打开浏览器: {e}", 'yellow')
@@ -397,8 +336,8 @@ PORT=8000
 ║                    🎉 系统启动成功！                          ║
 ╚══════════════════════════════════════════════════════════════╝
 
-🌐 前端界面: http://localhost:3000
-⚡ 后端API: http://localhost:8000
+🌐 前端界面: {self.url('frontend')}
+⚡ 后端API: {self.url('backend')}
 📊 系统状态: 运行中
 🕒 启动时间: {self.current_time}
 
@@ -411,6 +350,23 @@ PORT=8000
 """
         self.print_color(success_banner, 'green')
 
+    def monitor(self) -> bool:
+        """显示监控面板（被启动进程的 CPU/内存、健康状态与最近输出），Ctrl+C 后返回 True；缺少 psutil 时返回 False"""
+        try:
+            from monitor_dashboard import MonitorDashboard
+        except ImportError:
+            return False
+        from health_checker import ServiceCheck
+        names = {'frontend': '前端界面', 'backend': '后端API'}
+        dashboard = MonitorDashboard(
+            service_names=names,
+            health_checks=[ServiceCheck.http(name, self.url(name)) for name in names],
+            processes={name: process.pid for name, process in self.processes},
+            log_source=self.process_logs,
+        )
+        dashboard.run()
+        return True
+
     def cleanup(self):
         """清理进程"""
         self.print_color("🔄 正在停止所有服务...", 'yellow')
@@ -425,6 +381,29 @@ PORT=8000
                 self.print_color(f"⚠️  强制停止 {service_name} 服务", 'yellow')
             except Exception as e:
                 self.print_color(f"❌ 停止 {service_name} 服务失败: {e}", 'red')
+        
+        if self._process_logs is not None:
+            self._process_logs.close()
+
+    def build_startup_graph(self) -> 'StartupGraph':
+        """构建本地启动依赖图
+
+        环境检查 ─┬─ 依赖安装 ─┬─────────── 前端服务
+                  │            └─ 后端服务
+                  └─ 数据库配置 ───┘
+        """
+        from startup_dag import StartupGraph
+        graph = StartupGraph(max_workers=4, reporter=self.console.reporter)
+        graph.add('check_environment', self.check_local_environment, description='环境检查')
+        graph.add('install_dependencies', self.install_dependencies,
+                  requires=['check_environment'], description='依赖安装')
+        graph.add('setup_database', self.setup_database_alternative,
+                  requires=['check_environment'], description='数据库配置')
+        graph.add('start_backend_service', self.start_backend_service,
+                  requires=['install_dependencies', 'setup_database'], description='后端服务启动')
+        graph.add('start_frontend_service', self.start_frontend_service,
+                  requires=['install_dependencies'], description='前端服务启动')
+        return graph
 
     def run_system(self):
         """运行完整系统"""
@@ -433,32 +412,18 @@ PORT=8000
         # 播放启动音乐
         self.play_30s_startup_music()
         
-        # 环境检查
-        if not self.check_local_environment():
-            self.print_color("❌ 环境检查失败", 'red')
-            return False
-        
-        # 安装依赖
-        if not self.install_dependencies():
-            self.print_color("❌ 依赖安装失败", 'red')
-            return False
-        
-        # 设置数据库
-        if not self.setup_database_alternative():
-            self.print_color("❌ 数据库设置失败", 'red')
+        # 环境检查、依赖安装、数据库配置和服务启动按依赖关系并行执行
+        graph = self.build_startup_graph()
+        with telemetry.span('start_local_system', mode='local') as span:
+            success = graph.run()
+            if not success:
+                span.fail()
+        graph.report_timings()
+        if not success:
+            self.print_color("❌ 系统启动失败", 'red')
             return False
         
-        # 启动服务
-        if not self.start_backend_service():
-            self.print_color("❌ 后端服务启动失败", 'red')
-            return False
-        
-        if not self.start_frontend_service():
-            self.print_color("❌ 前端服务启动失败", 'red')
-            return False
-        
-        # 健康检查
-        time.sleep(10)  # 等待服务完全启动
+        # 健康检查（服务启动步骤已等待到就绪）
         if not self.health_check():
             self.print_color("⚠️  部分服务可能未正常启动", 'yellow')
         
@@ -468,28 +433,38 @@ PORT=8000
         # 显示成功信息
         self.display_success_info()
         
-        # 等待用户中断
+        # 等待用户中断；在终端中运行时显示监控面板
         try:
-            while True:
-                time.sleep(1)
+            if not (sys.stdout.isatty() and self.monitor()):
+                while True:
+                    time.sleep(1)
         except KeyboardInterrupt:
-            self.print_color("\n👋 收到停止信号...", 'yellow')
-            self.cleanup()
-            self.print_color("✅ 系统已停止", 'green')
+            pass
+        self.print_color("\n👋 收到停止信号...", 'yellow')
+        self.cleanup()
+        self.print_color("✅ 系统已停止", 'green')
         
         return True
 
 def main():
+    """命令行与 a 模式（launcher.modes 进程内调用）的入口；返回前恢复调用方的信号处理器"""
     launcher = LocalFinancialSystemLauncher()
     
     def signal_handler(signum, frame):
         launcher.cleanup()
         sys.exit(0)
     
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
-    success = launcher.run_system()
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+    for signum in handlers:
+        signal.signal(signum, signal_handler)
+    try:
+        success = launcher.run_system()
+    except SystemExit:
+        # 收到停止信号，服务已清理；不把 SystemExit 传给进程内的调用方（如三模式菜单）
+        return 0
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
     return 0 if success else 1
 
 if __name__ == "__main__":
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import subprocess
-import time
 import sys
 from pathlib import Path
 
+import readiness
+
 def start_financial_system():
     project_root = Path(__file__).parent
     
@@ -23,7 +24,11 @@ def start_financial_system():
                       cwd=project_root, check=True)
         
         print("⏳ 等待服务完全启动...")
-        time.sleep(30)
+        urls = ['http://localhost:8000', 'http://localhost:3000']
+        ready = readiness.wait_for_all({url: (lambda url=url: readiness.probe_http(url)) for url in urls}, timeout=90)
+        for url, elapsed in ready.items():
+            if elapsed is None:
+                print(f"⚠️  {url} 尚未响应")
         
         print("✅ 系统启动完成！")
         print("🌐 前端界面: http://localhost:3000")
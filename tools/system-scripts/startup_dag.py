@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动流程依赖图执行器
+
+把启动流程描述为有向无环图：每个步骤声明自己依赖的前置步骤，
+前置步骤全部成功后立即在线程池中启动，互不依赖的步骤并发执行
+（例如前端/后端 npm install、prisma generate 与镜像拉取）。
+
+Features:
+- 🔀 依赖就绪即启动，独立步骤并发执行
+- ⛔ 关键步骤失败时跳过其下游步骤，其余分支继续
+- ⏱️ 记录每个步骤的开始/结束/耗时，输出关键路径
+- 🧾 每个步骤写入一个 telemetry span（属性含依赖步骤），供 span_report 跨运行分析
+"""
+
+import contextvars
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import telemetry
+
+
+@dataclass
+class StepResult:
+    """单个步骤的执行结果"""
+    name: str
+    status: str = 'pending'  # pending, running, success, failed, skipped
+    started: float = 0.0     # 相对图启动时间（秒）
+    finished: float = 0.0
+    error: str = ''
+
+    @property
+    def duration(self) -> float:
+        return max(self.finished - self.started, 0.0)
+
+
+@dataclass
+class Step:
+    """图中的一个启动步骤；func 返回 False 或抛出异常即视为失败
+
+    非关键步骤（critical=False）失败时只给出警告，下游步骤照常执行。
+    """
+    name: str
+    func: Callable[[], Optional[bool]]
+    requires: Tuple[str, ...] = ()
+    critical: bool = True
+    description: str = ''
+
+
+class StartupGraph:
+    """启动步骤依赖图"""
+
+    def __init__(self, max_workers: int = 4, reporter: Callable[[str, str], None] = None):
+        """
+        :param max_workers: 并发执行的最大步骤数
+        :param reporter: 输出回调 reporter(message, color)，默认直接 print
+        """
+        self.max_workers = max_workers
+        self.reporter = reporter or (lambda message, color='white': print(message))
+        self.steps: Dict[str, Step] = {}
+        self.results: Dict[str, StepResult] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, func: Callable[[], Optional[bool]], requires=(), critical: bool = True,
+            description: str = '') -> 'StartupGraph':
+        """添加步骤；requires 为前置步骤名称列表"""
+        if name in self.steps:
+            raise ValueError(f"重复的步骤名称: {name}")
+        self.steps[name] = Step(name, func, tuple(requires), critical, description or name)
+        return self
+
+    def _validate(self):
+        """检查未知依赖和循环依赖"""
+        for step in self.steps.values():
+            for dep in step.requires:
+                if dep not in self.steps:
+                    raise ValueError(f"步骤 {step.name} 依赖未知步骤 {dep}")
+        visiting, done = set(), set()
+
+        def visit(name, chain):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"检测到循环依赖: {' -> '.join(chain + [name])}")
+            visiting.add(name)
+            for dep in self.steps[name].requires:
+                visit(dep, chain + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name, [])
+
+    def _execute(self, step: Step, origin: float) -> bool:
+        result = self.results[step.name]
+        with self._lock:
+            result.status = 'running'
+            result.started = time.perf_counter() - origin
+        with telemetry.span(step.name, requires=list(step.requires), critical=step.critical) as span:
+            try:
+                ok = step.func()
+                ok = True if ok is None else bool(ok)
+            except Exception as e:
+                ok = False
+                result.error = str(e)
+            if not ok:
+                span.fail(result.error)
+        with self._lock:
+            result.finished = time.perf_counter() - origin
+            result.status = 'success' if ok else 'failed'
+        return ok
+
+    def run(self) -> bool:
+        """执行整张图；所有关键步骤成功时返回 True"""
+        self._validate()
+        self.results = {name: StepResult(name) for name in self.steps}
+        origin = time.perf_counter()
+        running = {}
+
+        def satisfied(dep):
+            status = self.results[dep].status
+            return status == 'success' or (status == 'failed' and not self.steps[dep].critical)
+
+        def ready(step):
+            return (self.results[step.name].status == 'pending'
+                    and all(satisfied(dep) for dep in step.requires))
+
+        def skip_blocked():
+            # 前置步骤失败或被跳过的步骤无法再执行
+            changed = True
+            while changed:
+                changed = False
+                for step in self.steps.values():
+                    if self.results[step.name].status != 'pending':
+                        continue
+                    if any(self.results[dep].status == 'skipped'
+                           or (self.results[dep].status == 'failed' and self.steps[dep].critical)
+                           for dep in step.requires):
+                        self.results[step.name].status = 'skipped'
+                        self.reporter(f"⏭️  跳过 {step.description}（前置步骤未成功）", 'yellow')
+                        changed = True
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                for step in self.steps.values():
+                    if step.name not in running and ready(step):
+                        # 在提交时的上下文中执行，步骤的 span 挂在调用 run() 时所在的 span 下
+                        context = contextvars.copy_context()
+                        running[step.name] = pool.submit(context.run, self._execute, step, origin)
+                        self.results[step.name].status = 'running'
+                if not running:
+                    break
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for name in [n for n, f in running.items() if f in finished]:
+                    future = running.pop(name)
+                    result = self.results[name]
+                    if future.result():
+                        self.reporter(f"✅ {self.steps[name].description} 完成 ({result.duration:.1f}s)", 'green')
+                    else:
+                        detail = f": {result.error}" if result.error else ''
+                        color = 'red' if self.steps[name].critical else 'yellow'
+                        self.reporter(f"❌ {self.steps[name].description} 失败{detail}", color)
+                skip_blocked()
+
+        return all(self.results[name].status == 'success'
+                   for name, step in self.steps.items() if step.critical)
+
+    def critical_path(self) -> List[str]:
+        """按结束时间回溯的关键路径（决定总耗时的步骤链）"""
+        done = {n: r for n, r in self.results.items() if r.status in ('success', 'failed')}
+        if not done:
+            return []
+        name = max(done, key=lambda n: done[n].finished)
+        path = [name]
+        while True:
+            deps = [d for d in self.steps[name].requires if d in done]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: done[n].finished)
+            path.append(name)
+        return list(reversed(path))
+
+    def report_timings(self):
+        """输出各步骤耗时与关键路径"""
+        total = max((r.finished for r in self.results.values()), default=0.0)
+        self.reporter(f"⏱️ 启动步骤耗时（总计 {total:.1f}s）：", 'cyan')
+        ordered = sorted(self.results.values(), key=lambda r: (r.started if r.status != 'skipped' else float('inf')))
+        for result in ordered:
+            if result.status == 'skipped':
+                self.reporter(f"   ⏭️  {self.steps[result.name].description}: 已跳过", 'yellow')
+                continue
+            icon = '✅' if result.status == 'success' else '❌'
+            self.reporter(f"   {icon} {self.steps[result.name].description}: "
+                          f"{result.started:6.1f}s → {result.finished:6.1f}s ({result.duration:.1f}s)", 'white')
+        path = self.critical_path()
+        if path:
+            self.reporter(f"   🧭 关键路径: {' → '.join(path)}", 'cyan')
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+结构化日志与阶段耗时（JSON Lines）
+
+各工具通过 span() / traced() 标记阶段，开始与结束各写一行 JSON：
+时间、所属运行、父 span、耗时、状态与属性。日志记录也可以经 handler() 写入同一文件，
+并带上当时所在的 span，便于把文字日志与阶段对应起来。
+
+同一次运行的 run 标识通过环境变量传给子进程，启动器拉起的脚本会归入同一次运行。
+span_report.py 读取该文件，输出每次运行的关键路径和跨运行最慢的阶段。
+
+Features:
+- 🧾 JSON Lines：一行一个事件，可直接用 jq / pandas 处理
+- 🌳 span 嵌套：父子关系随 contextvars 传递，线程池中运行的步骤也能挂到正确的父 span 下
+- ⏱️ 单调时钟计时，失败（返回 False）与异常分别记录
+- 🔕 TELEMETRY=0 关闭；TELEMETRY_FILE 指定输出文件
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+LOG_PATH = PROJECT_ROOT / 'logs' / 'telemetry.jsonl'
+# 超过该大小时在下次打开前轮换为 telemetry.jsonl.1
+MAX_LOG_BYTES = 10 * 1024 * 1024
+
+RUN_ENV = 'TELEMETRY_RUN'
+ENABLED = os.environ.get('TELEMETRY', '1') != '0'
+
+_current: contextvars.ContextVar = contextvars.ContextVar('telemetry_span', default=None)
+_lock = threading.Lock()
+_file = None
+_tool: Optional[str] = None
+
+
+def run_id() -> str:
+    """本次运行的标识；首次调用时生成并写入环境变量，由子进程继承"""
+    run = os.environ.get(RUN_ENV)
+    if not run:
+        run = os.environ[RUN_ENV] = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    return run
+
+
+def configure(tool: str = None, path=None):
+    """指定工具名与输出文件；不调用时工具名取脚本文件名"""
+    global _tool, LOG_PATH, _file
+    if tool:
+        _tool = tool
+    if path:
+        with _lock:
+            LOG_PATH = Path(path)
+            if _file is not None:
+                _file.close()
+                _file = None
+
+
+def _open():
+    global _file
+    path = Path(os.environ.get('TELEMETRY_FILE') or LOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if path.stat().st_size > MAX_LOG_BYTES:
+            os.replace(path, path.with_name(path.name + '.1'))
+    except OSError:
+        pass
+    # 行缓冲追加：多个进程同时写入时一行不会被拆开
+    _file = open(path, 'a', encoding='utf-8', buffering=1)
+    return _file
+
+
+def emit(event: str, **fields):
+    """写入一行事件；写入失败不影响调用方"""
+    if not ENABLED:
+        return
+    record = {'ts': round(time.time(), 6), 'event': event, 'run': run_id(),
+              'tool': _tool or Path(sys.argv[0]).stem or 'python', 'pid': os.getpid()}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    try:
+        with _lock:
+            (_file or _open()).write(line)
+    except OSError:
+        pass
+
+
+class Span:
+    """一个计时阶段；set() 可在阶段进行中补充属性"""
+
+    def __init__(self, name: str, parent: Optional['Span'], attrs: dict):
+        self.name = name
+        self.id = uuid.uuid4().hex[:12]
+        self.parent = parent
+        self.attrs = attrs
+        self.status = 'ok'
+        self.start = time.time()
+        self._clock = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def fail(self, error: str = None):
+        """标记为失败（不抛出异常的失败，如步骤返回 False）"""
+        self.status = 'failed'
+        if error:
+            self.attrs['error'] = error
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """计时阶段：with span('setup_database', compose='docker-compose.yml') as s: ..."""
+    parent = _current.get()
+    current = Span(name, parent, attrs)
+    token = _current.set(current)
+    emit('span_start', span=current.id, parent=parent and parent.id, name=name,
+         thread=threading.current_thread().name, attrs=attrs)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = 'error'
+        current.attrs['error'] = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _current.reset(token)
+        emit('span_end', span=current.id, parent=parent and parent.id, name=name,
+             start=round(current.start, 6), duration=round(time.perf_counter() - current._clock, 6),
+             status=current.status, thread=threading.current_thread().name, attrs=current.attrs)
+
+
+def traced(name: str = None, **attrs):
+    """把函数整体作为一个 span；函数返回 False 时记为失败
+
+    外层已经是同名 span 时（例如启动图以步骤名包装了同名方法）不再重复嵌套。
+    """
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _current.get()
+            if current is not None and current.name == span_name:
+                return func(*args, **kwargs)
+            with span(span_name, **attrs) as s:
+                result = func(*args, **kwargs)
+                if result is False:
+                    s.fail()
+                return result
+        return wrapper
+    return decorate
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+class JsonLinesHandler(logging.Handler):
+    """把日志记录作为 log 事件写入同一文件，并带上当前 span"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            current = _current.get()
+            emit('log', level=record.levelname, logger=record.name, message=record.getMessage(),
+                 span=current and current.id)
+        except Exception:
+            self.handleError(record)
+
+
+def handler(level: int = logging.INFO) -> logging.Handler:
+    """供各工具加入自己的 logger / basicConfig handlers"""
+    return JsonLinesHandler(level)
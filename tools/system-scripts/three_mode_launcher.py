@@ -18,7 +18,6 @@ Features:
 - 🌐 跨平台支持
 """
 
-import os
 import sys
 import time
 import subprocess
@@ -27,8 +26,8 @@ import platform
 import signal
 from datetime import datetime
 from pathlib import Path
-import logging
-import psutil
+from launcher import services, sounds, tools
+from launcher.console import Console
 
 class ThreeModeSystemLauncher:
     def __init__(self):
@@ -36,39 +35,22 @@ class ThreeModeSystemLauncher:
         self.os_type = platform.system()
         self.project_root = Path(__file__).parent.parent.parent  # 回到项目根目录
         self.scripts_dir = Path(__file__).parent
-        self.setup_logging()
+        self.console = Console('three_mode_launcher', self.project_root / 'logs')
+        self.logger = self.console.logger
         self.running_processes = []
-        
-    def setup_logging(self):
-        """设置日志系统"""
-        log_dir = self.project_root / 'logs'
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_dir / 'three_mode_launcher.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        self._process_logs = None
+
+    @property
+    def process_logs(self):
+        """本地前端输出写入 logs/<service>.log（仅混合模式需要，按需创建）"""
+        if self._process_logs is None:
+            from process_logs import ProcessLogMultiplexer
+            self._process_logs = ProcessLogMultiplexer(self.project_root / 'logs')
+        return self._process_logs
 
     def print_color(self, message: str, color: str = 'white'):
         """彩色输出"""
-        colors = {
-            'red': '\033[91m',
-            'green': '\033[92m',
-            'yellow': '\033[93m',
-            'blue': '\033[94m',
-            'purple': '\033[95m',
-            'cyan': '\033[96m',
-            'white': '\033[97m',
-            'reset': '\033[0m'
-        }
-        
-        print(f"{colors.get(color, '')}{message}{colors['reset']}")
-        self.logger.info(message)
+        self.console.print(message, color)
 
     def play_30s_mode_selection_music(self, mode_name: str):
         """播放30秒模式选择轻音乐"""
@@ -78,20 +60,18 @@ class ThreeModeSystemLauncher:
         
         def play_music():
             try:
-                if self.os_type == 'Darwin':  # macOS
-                    if hour >= 22 or hour <= 8:  # 深夜模式
+                if sounds.AVAILABLE:  # macOS
+                    if sounds.late_night(hour):  # 深夜模式
                         self.print_color("🌙 深夜模式：系统启动中，播放轻柔提醒...", 'purple')
                         for i in range(6):
-                            subprocess.run(['afplay', '/System/Library/Sounds/Tink.aiff'], 
-                                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                            sounds.play('Tink')
                             time.sleep(2.0)
                         self._speak(f"{mode_name}模式系统启动完成，深夜模式", 'Sin-ji', 120)
                     else:
                         if mode_name == "本地开发":
                             self.print_color("🎼 播放30秒本地开发模式古典轻音乐...", 'green')
                             for i in range(10):
-                                subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                sounds.play('Glass')
                                 time.sleep(2.5)
                                 if i == 3:
                                     self._speak("本地开发模式启动中", 'Ting-Ting', 160)
@@ -100,8 +80,7 @@ class ThreeModeSystemLauncher:
                         elif mode_name == "Docker容器":
                             self.print_color("🎹 播放30秒Docker容器模式钢琴轻音乐...", 'blue')
                             for i in range(12):
-                                subprocess.run(['afplay', '/System/Library/Sounds/Purr.aiff'], 
-                                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                sounds.play('Purr')
                                 time.sleep(2.0)
                                 if i == 4:
                                     self._speak("Docker容器化部署启动", 'Mei-Jia', 150)
@@ -110,8 +89,7 @@ class ThreeModeSystemLauncher:
                         elif mode_name == "混合":
                             self.print_color("🎶 播放30秒混合模式自然轻音乐...", 'yellow')
                             for i in range(11):
-                                subprocess.run(['afplay', '/System/Library/Sounds/Blow.aiff'], 
-                                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                sounds.play('Blow')
                                 time.sleep(2.2)
                                 if i == 3:
                                     self._speak("混合模式启动中", 'Sin-ji', 150)
@@ -127,15 +105,13 @@ class ThreeModeSystemLauncher:
     def _speak(self, text: str, voice: str = None, rate: int = 140):
         """语音提醒"""
         try:
-            if self.os_type == 'Darwin' and voice:
-                subprocess.run(['say', text, '--voice', voice, '--rate', str(rate)], 
-                             check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            sounds.speak(text, voice, rate)
         except Exception as e:
             self.logger.warning(f"语音播放失败: {e}")
 
     def display_main_banner(self):
         """显示主横幅"""
-        os.system('clear' if self.os_type != 'Windows' else 'cls')
+        self.console.clear()
         
         banner = f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -187,125 +163,49 @@ class ThreeModeSystemLauncher:
 
     def _check_local_mode_env(self) -> bool:
         """检查本地模式环境"""
-        required_tools = ['node', 'npm']
-        missing_tools = []
-        
-        for tool in required_tools:
-            if not self._check_command(tool):
-                missing_tools.append(tool)
-                self.print_color(f"❌ {tool} 未安装", 'red')
-            else:
-                version = self._get_tool_version(tool)
-                self.print_color(f"✅ {tool} 已安装: {version}", 'green')
-        
-        if missing_tools:
-            self.print_color(f"❌ 本地模式需要安装: {', '.join(missing_tools)}", 'red')
-            return False
-        
-        return True
+        return not tools.check_tools(self.console, ['node', 'npm'], '本地模式')
 
     def _check_docker_mode_env(self) -> bool:
         """检查Docker模式环境"""
-        required_tools = ['docker', 'docker-compose', 'node', 'npm']
-        missing_tools = []
-        
-        for tool in required_tools:
-            if not self._check_command(tool):
-                missing_tools.append(tool)
-                self.print_color(f"❌ {tool} 未安装", 'red')
-            else:
-                version = self._get_tool_version(tool)
-                self.print_color(f"✅ {tool} 已安装: {version}", 'green')
-        
-        if missing_tools:
-            self.print_color(f"❌ Docker模式需要安装: {', '.join(missing_tools)}", 'red')
+        if tools.check_tools(self.console, ['docker', 'docker-compose', 'node', 'npm'], 'Docker模式'):
             return False
         
         # 检查Docker服务是否运行
-        try:
-            subprocess.run(['docker', 'ps'], check=True, 
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self.print_color("✅ Docker服务正在运行", 'green')
-        except subprocess.CalledProcessError:
+        if not tools.docker_running():
             self.print_color("❌ Docker服务未运行，请启动Docker Desktop", 'red')
             return False
-        
+        self.print_color("✅ Docker服务正在运行", 'green')
         return True
 
     def _check_hybrid_mode_env(self) -> bool:
         """检查混合模式环境"""
-        # 混合模式需要本地和Docker的组合
-        return self._check_local_mode_env() and self._check_docker_mode_env()
-
-    def _check_command(self, command: str) -> bool:
-        """检查命令是否存在"""
-        try:
-            subprocess.run([command, '--version'], 
-                         check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-
-    def _get_tool_version(self, tool: str) -> str:
-        """获取工具版本"""
-        try:
-            result = subprocess.run([tool, '--version'], 
-                                  capture_output=True, text=True, check=True)
-            return result.stdout.strip().split('\n')[0]
-        except:
-            return "未知版本"
+        # Docker模式的检查已包含 node/npm
+        return self._check_docker_mode_env()
 
     def launch_mode_a(self):
-        """启动a模式 - 本地部署方式"""
+        """启动a模式 - 本地部署方式（在当前进程内运行本地启动器）"""
         self.print_color("🏠 启动a模式：本地部署方式", 'green')
         self.play_30s_mode_selection_music("本地开发")
-        
-        # 调用现有的本地启动脚本
-        local_script = self.scripts_dir / 'start_local_system.py'
-        
-        if not local_script.exists():
-            self.print_color("❌ 本地启动脚本不存在", 'red')
-            return False
-        
-        try:
-            self.print_color("🚀 正在调用本地系统启动器...", 'blue')
-            process = subprocess.Popen([sys.executable, str(local_script)])
-            self.running_processes.append(('local_system', process))
-            
-            self.print_color("✅ a模式（本地部署）启动成功！", 'green')
-            self.display_mode_info("a", "本地部署方式", "http://localhost:3000", "http://localhost:8000")
-            
-            return True
-            
-        except Exception as e:
-            self.print_color(f"❌ a模式启动失败: {e}", 'red')
-            return False
+        return self._run_in_process('a')
 
     def launch_mode_b(self):
-        """启动b模式 - Docker镜像模式"""
+        """启动b模式 - Docker镜像模式（在当前进程内运行Docker启动器）"""
         self.print_color("🐳 启动b模式：Docker镜像模式", 'blue')
         self.play_30s_mode_selection_music("Docker容器")
-        
-        # 调用现有的Docker启动脚本
-        docker_script = self.scripts_dir / 'launch_system.py'
-        
-        if not docker_script.exists():
-            self.print_color("❌ Docker启动脚本不存在", 'red')
-            return False
-        
+        return self._run_in_process('b')
+
+    def _run_in_process(self, mode: str) -> bool:
+        from launcher.modes import MODES, run_mode
+        title = MODES[mode].title
         try:
-            self.print_color("🚀 正在调用Docker系统启动器...", 'blue')
-            process = subprocess.Popen([sys.executable, str(docker_script)])
-            self.running_processes.append(('docker_system', process))
-            
-            self.print_color("✅ b模式（Docker镜像）启动成功！", 'green')
-            self.display_mode_info("b", "Docker镜像模式", "http://localhost:3000", "http://localhost:8000")
-            
-            return True
-            
+            self.print_color(f"🚀 正在启动{title}...", 'blue')
+            success = run_mode(mode)
         except Exception as e:
-            self.print_color(f"❌ b模式启动失败: {e}", 'red')
+            self.print_color(f"❌ {mode}模式启动失败: {e}", 'red')
             return False
+        if success:
+            self.print_color(f"✅ {mode}模式（{title}）运行结束", 'green')
+        return success
 
     def launch_mode_c(self):
         """启动c模式 - 混合模式"""
@@ -313,14 +213,15 @@ class ThreeModeSystemLauncher:
         self.play_30s_mode_selection_music("混合")
         
         try:
-            # 第一步：启动Docker后端服务
-            self.print_color("🐳 第一步：启动Docker后端服务...", 'blue')
-            if not self._start_docker_backend():
-                return False
-            
-            # 第二步：启动本地前端服务
-            self.print_color("🎨 第二步：启动本地前端服务...", 'blue')
-            if not self._start_local_frontend():
+            # Docker后端与本地前端互不依赖，并行启动
+            self.print_color("🐳 启动Docker后端服务 + 🎨 本地前端服务（并行）...", 'blue')
+            from startup_dag import StartupGraph
+            graph = StartupGraph(max_workers=2, reporter=self.console.reporter)
+            graph.add('docker_backend', self._start_docker_backend, description='Docker后端服务')
+            graph.add('local_frontend', self._start_local_frontend, description='本地前端服务')
+            success = graph.run()
+            graph.report_timings()
+            if not success:
                 return False
             
             self.print_color("✅ c模式（混合模式）启动成功！", 'green')
@@ -335,20 +236,16 @@ class ThreeModeSystemLauncher:
     def _start_docker_backend(self) -> bool:
         """启动Docker后端服务"""
         try:
-            os.chdir(self.project_root)
-            
-            # 停止现有容器
-            subprocess.run(['docker-compose', 'down'], 
-                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            # 停止现有容器（使用 cwd 而非 os.chdir，前端步骤在另一线程并行运行）
+            tools.compose(['down'], cwd=self.project_root)
             
             # 启动后端相关服务
             self.print_color("🗄️ 启动数据库和后端API容器...", 'cyan')
-            result = subprocess.run(['docker-compose', 'up', '-d', 'postgres', 'redis', 'backend'], 
-                                  check=True, capture_output=True, text=True)
+            tools.compose(['up', '-d', 'postgres', 'redis', 'backend'], cwd=self.project_root, check=True)
             
             # 等待服务就绪
             self.print_color("⏳ 等待后端服务就绪...", 'yellow')
-            time.sleep(15)
+            services.wait_databases(self.console, timeout=90, extra={'后端API': 'http://localhost:8000'})
             
             return True
             
@@ -365,27 +262,34 @@ class ThreeModeSystemLauncher:
                 self.print_color("❌ 前端目录不存在", 'red')
                 return False
             
-            # 安装依赖
-            self.print_color("📦 安装前端依赖...", 'cyan')
-            subprocess.run(['npm', 'install'], cwd=frontend_dir, 
-                         check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            # 安装依赖（package-lock 与 Node 版本未变化时跳过）
+            self.print_color("📦 检查前端依赖...", 'cyan')
+            if not services.install_packages(self.console, [frontend_dir]):
+                return False
             
             # 修改前端配置以使用3001端口
             self._configure_frontend_for_hybrid()
             
             # 启动前端开发服务器
             self.print_color("🚀 启动前端开发服务器...", 'cyan')
-            frontend_process = subprocess.Popen(
-                ['npm', 'run', 'dev', '--', '--port', '3001'],
-                cwd=frontend_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            frontend_process = self.process_logs.spawn(
+                'frontend', ['npm', 'run', 'dev', '--', '--port', '3001'], cwd=frontend_dir)
             
             self.running_processes.append(('frontend', frontend_process))
             
-            # 等待前端服务启动
-            time.sleep(8)
+            # 等待前端服务启动（进程提前退出时立即失败）
+            import readiness
+            elapsed = readiness.wait_for(
+                lambda: frontend_process.poll() is not None or readiness.probe_http('http://localhost:3001'),
+                timeout=90)
+            if frontend_process.poll() is not None:
+                self.print_color(f"❌ 前端进程已退出 (exit {frontend_process.returncode})", 'red')
+                for line in self.process_logs.tail('frontend', 15):
+                    print(f"   {line}")
+                self.print_color(f"📋 完整日志: {self.process_logs.log_path('frontend')}", 'cyan')
+                return False
+            if elapsed is not None:
+                self.print_color(f"✅ 前端服务已就绪 ({elapsed:.1f}s)", 'green')
             
             return True
             
@@ -460,13 +364,14 @@ VITE_MODE=hybrid
             except Exception as e:
                 self.print_color(f"❌ 停止 {service_name} 服务失败: {e}", 'red')
         
+        if self._process_logs is not None:
+            self._process_logs.close()
+        
         # 停止Docker容器（如果有的话）
         try:
-            os.chdir(self.project_root)
-            subprocess.run(['docker-compose', 'down'], 
-                         check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            tools.compose(['down'], cwd=self.project_root)
             self.print_color("🐳 Docker容器已停止", 'green')
-        except:
+        except OSError:
             pass
 
     def run_interactive_launcher(self):
@@ -510,8 +415,30 @@ VITE_MODE=hybrid
                 self.print_color("\n👋 收到停止信号...", 'yellow')
                 self.cleanup()
 
-def main():
+def run_mode(launcher: ThreeModeSystemLauncher, mode: str) -> bool:
+    """检查环境后启动指定模式；有本地进程时等待 Ctrl+C 并清理"""
+    if not launcher.check_environment_for_mode(mode):
+        return False
+    success = {'a': launcher.launch_mode_a, 'b': launcher.launch_mode_b, 'c': launcher.launch_mode_c}[mode]()
+    if success and launcher.running_processes:
+        try:
+            launcher.print_color("\n🔄 系统正在运行中，按 Ctrl+C 停止服务", 'cyan')
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            launcher.print_color("\n👋 收到停止信号...", 'yellow')
+            launcher.cleanup()
+    return success
+
+
+def launch_hybrid() -> bool:
+    """c模式入口（供 launcher.modes 调用）"""
+    return run_mode(ThreeModeSystemLauncher(), 'c')
+
+
+def main(argv=None):
     """主函数"""
+    argv = sys.argv[1:] if argv is None else argv
     launcher = ThreeModeSystemLauncher()
     
     def signal_handler(signum, frame):
@@ -521,17 +448,11 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    if len(sys.argv) > 1:
+    if argv:
         # 命令行模式
-        mode = sys.argv[1].lower()
+        mode = argv[0].lower()
         if mode in ['a', 'b', 'c']:
-            if launcher.check_environment_for_mode(mode):
-                if mode == 'a':
-                    launcher.launch_mode_a()
-                elif mode == 'b':
-                    launcher.launch_mode_b()
-                elif mode == 'c':
-                    launcher.launch_mode_c()
+            run_mode(launcher, mode)
         else:
             print("❌ 无效模式，请使用 a、b 或 c")
             sys.exit(1)
@@ -540,4 +461,4 @@ def main():
         launcher.run_interactive_launcher()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()